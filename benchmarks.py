@@ -0,0 +1,740 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import galeragate
+
+# Helpers
+def percentile(samples, pct): # Nearest-rank percentile of a list of numbers
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+def latency_summary(seconds): # Latency samples (in seconds) summarized in milliseconds
+    return {
+        "mean_ms": statistics.mean(seconds) * 1000,
+        "p50_ms": percentile(seconds, 50) * 1000,
+        "p99_ms": percentile(seconds, 99) * 1000,
+    }
+
+def use_database(path): # Point galeragate at a fresh database file
+    galeragate.close_db()
+    galeragate.init_db(path)
+
+def timed(function, *args): # (result, seconds taken)
+    begin = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - begin
+
+def register_tourists(count): # Minimal tourists for benchmarks that need existing IDs
+    with galeragate.transaction() as db:
+        db.executemany("INSERT INTO tourists (name, age, entry_date, exit_date) VALUES (?, ?, ?, ?)",
+                       [(f"Tourist {i}", 30, galeragate.day_number("2024-05-01"), galeragate.day_number("2024-05-04"))
+                        for i in range(count)])
+        last_id = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tourists'").fetchone()[0]
+    return range(last_id - count + 1, last_id + 1)
+
+def sample_selections(count): # Item IDs of `count` catalog options, cycling through the categories
+    catalog = galeragate.get_catalog()
+    item_ids = [item_id for options in zip(*catalog.categories.values()) for item_id in options]
+    return item_ids[:count]
+
+# Reservations: one commit per statement (the old category_selection) versus one unit-of-work commit
+def legacy_reservation(tourist_id, selections, payment):
+    for item_id in selections:
+        with galeragate.transaction() as db:
+            db.execute(galeragate.INSERT_SELECTION_SQL, (tourist_id, item_id))
+    with galeragate.transaction() as db:
+        db.execute(galeragate.INSERT_PAYMENT_SQL, (tourist_id,) + galeragate.stored_payment(payment))
+    return len(selections) + 1 # Commits issued
+
+def unit_of_work_reservation(tourist_id, selections, payment):
+    reservation = galeragate.Reservation(tourist_id)
+    for item_id in selections:
+        reservation.add_selection(item_id)
+    reservation.set_payment(*payment)
+    reservation.commit()
+    return 1
+
+def bench_reservations(workdir, count=500, selections_per_reservation=4):
+    payment = ("Cash", 1500.0, "2024-05-01")
+    results = {}
+    for name, reserve in (("per_statement", legacy_reservation), ("unit_of_work", unit_of_work_reservation)):
+        use_database(os.path.join(workdir, f"reservations_{name}.db"))
+        tourist_ids = register_tourists(count)
+        selections = sample_selections(selections_per_reservation)
+        latencies, commits = [], 0
+        started = time.perf_counter()
+        for tourist_id in tourist_ids:
+            begin = time.perf_counter()
+            commits += reserve(tourist_id, selections, payment)
+            latencies.append(time.perf_counter() - begin)
+        elapsed = time.perf_counter() - started
+        results[name] = dict(reservations=count, commits=commits, seconds=elapsed,
+                             reservations_per_sec=count / elapsed, commits_per_sec=commits / elapsed,
+                             **latency_summary(latencies))
+    return results
+
+# Visitor trends: pure-Python sweep versus the NumPy sweep over the same stays
+def insert_random_stays(count, seed=2024): # Stays spread over one year, 0-14 nights each, as stored day numbers
+    import random
+    from datetime import date
+    rng = random.Random(seed)
+    year_start = date(2024, 1, 1).toordinal()
+    nationalities = ["Filipino", "Korean", "American", "Chinese", "Japanese", "German", "Australian"]
+    rows = []
+    for i in range(count):
+        entry_day = year_start + rng.randrange(366)
+        rows.append((f"Tourist {i}", 30, rng.choice(nationalities), entry_day, entry_day + rng.randrange(15)))
+    with galeragate.transaction() as db:
+        db.executemany("INSERT INTO tourists (name, age, nationality, entry_date, exit_date) VALUES (?, ?, ?, ?, ?)", rows)
+
+def bench_trends(workdir, stays=200_000, repeats=3):
+    use_database(os.path.join(workdir, "trends.db"))
+    insert_random_stays(stays)
+    try:
+        import numpy  # noqa: F401
+        variants = [("python", False), ("numpy", True)]
+    except ImportError:
+        variants = [("python", False)]
+    results = {}
+    for name, use_numpy in variants:
+        timings = []
+        for _ in range(repeats):
+            begin = time.perf_counter()
+            trends = galeragate.visitor_trends("2024-01-01", "2024-12-31", use_numpy=use_numpy)
+            timings.append(time.perf_counter() - begin)
+        results[name] = dict(stays=stays, days=len(trends["occupancy"]), seconds=min(timings),
+                             stays_per_sec=stays / min(timings))
+    return results
+
+# Receipts: three queries per tourist (the old proceed_to_reservation), one query per tourist, and a streamed export
+def insert_paid_tourists(count): # Tourists with a few selections and one payment each
+    tourist_ids = register_tourists(count)
+    selections = sample_selections(4)
+    with galeragate.transaction() as db:
+        db.executemany(galeragate.INSERT_SELECTION_SQL,
+                       [(tourist_id, item_id) for tourist_id in tourist_ids for item_id in selections])
+        db.executemany(galeragate.INSERT_PAYMENT_SQL,
+                       [(tourist_id,) + galeragate.stored_payment(("Cash", 1500.0, "2024-05-01")) for tourist_id in tourist_ids])
+    return tourist_ids
+
+def three_query_receipt(tourist_id):
+    with galeragate.connection() as db:
+        tourist = db.execute(galeragate.TOURIST_BY_ID_SQL, (tourist_id,)).fetchone()
+        selections = db.execute(galeragate.SELECTIONS_BY_TOURIST_SQL, (tourist_id,)).fetchall()
+        payment = db.execute("SELECT payment_method, amount_paid, payment_date FROM payment_methods WHERE tourist_id = ?",
+                             (tourist_id,)).fetchone()
+    return tourist, selections, payment
+
+def bench_receipts(workdir, count=20_000):
+    use_database(os.path.join(workdir, "receipts.db"))
+    tourist_ids = insert_paid_tourists(count)
+    results = {}
+    for name, fetch in (("three_queries", three_query_receipt), ("single_query", galeragate.fetch_receipt)):
+        begin = time.perf_counter()
+        for tourist_id in tourist_ids:
+            fetch(tourist_id)
+        elapsed = time.perf_counter() - begin
+        results[name] = dict(receipts=count, seconds=elapsed, receipts_per_sec=count / elapsed)
+    for output_format in ("text", "json"):
+        written, elapsed = galeragate.export_receipts(os.path.join(workdir, f"receipts.{output_format}"), output_format)
+        results[f"export_{output_format}"] = dict(receipts=written, seconds=elapsed, receipts_per_sec=written / elapsed)
+    return results
+
+# Tracing: cost of the query tracer on the cheapest hot path (single-row receipts), switched off and on
+def bench_tracing(workdir, count=20_000, repeats=3):
+    use_database(os.path.join(workdir, "tracing.db"))
+    tourist_ids = insert_paid_tourists(count)
+    results = {}
+    for name, enable in (("disabled", galeragate.disable_tracing), ("enabled", galeragate.enable_tracing)):
+        enable()
+        timings = []
+        for _ in range(repeats):
+            begin = time.perf_counter()
+            for tourist_id in tourist_ids:
+                galeragate.fetch_receipt(tourist_id)
+            timings.append(time.perf_counter() - begin)
+        results[name] = dict(receipts=count, seconds=min(timings), receipts_per_sec=count / min(timings))
+    galeragate.disable_tracing()
+    galeragate.tracer.reset()
+    results["enabled"]["overhead_pct"] = (results["enabled"]["seconds"] / results["disabled"]["seconds"] - 1) * 100
+    return results
+
+# Admin session: memory should stay flat over one long scripted session through the admin panel
+REPORT_TOURISTS = 10 # Fits on one report page, so View All Tourists never asks for the next page
+ADMIN_SESSION_SCRIPT = [
+    ["1", "", "", ""],  # View All Tourists, no filters
+    ["3"],              # Count All Tourists
+    ["5"],              # View Payment Methods
+    ["8"],              # Dashboard
+]
+
+def scripted_admin_session(actions, on_action, script=ADMIN_SESSION_SCRIPT): # An input() replacement that runs `actions` admin commands, then exits
+    def answers():
+        for i in range(actions):
+            on_action(i)
+            yield from script[i % len(script)]
+        yield galeragate.ADMIN_EXIT
+    pending = answers()
+    return lambda prompt="": next(pending)
+
+def bench_admin_session(workdir, actions=10_000, checkpoints=10):
+    import contextlib
+    import io
+    import tracemalloc
+    use_database(os.path.join(workdir, "admin_session.db"))
+    insert_paid_tourists(REPORT_TOURISTS)
+    output = io.StringIO()
+    memory_kb = []
+    def checkpoint(action): # Drop the captured output, and sample traced memory every actions/checkpoints commands
+        output.seek(0)
+        output.truncate()
+        if action % (actions // checkpoints) == 0:
+            memory_kb.append(tracemalloc.get_traced_memory()[0] / 1024)
+    galeragate.input = scripted_admin_session(actions, checkpoint)
+    tracemalloc.start()
+    try:
+        begin = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            galeragate.admin_menu()
+        elapsed = time.perf_counter() - begin
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+        del galeragate.input
+    return {"admin_menu": dict(actions=actions, seconds=elapsed, actions_per_sec=actions / elapsed,
+                               first_checkpoint_kb=memory_kb[1], last_checkpoint_kb=memory_kb[-1], peak_kb=peak_kb)}
+
+# Synthetic data: a deterministic generator with realistic distributions, streamed through the manifest import path
+NATIONALITY_WEIGHTS = {"Filipino": 55, "Korean": 12, "Chinese": 9, "American": 7, "Japanese": 5, "Australian": 4,
+                       "German": 3, "British": 3, "French": 2}
+MONTH_WEIGHTS = [8, 8, 11, 14, 12, 6, 5, 5, 4, 5, 7, 15] # Peaks around Holy Week (Mar-May) and the Christmas holidays
+STAY_NIGHT_WEIGHTS = {1: 10, 2: 22, 3: 24, 4: 16, 5: 10, 6: 6, 7: 6, 10: 3, 14: 3}
+SELECTION_COUNT_WEIGHTS = {0: 10, 1: 15, 2: 25, 3: 25, 4: 20, 5: 5} # Selections per tourist
+PAYMENT_MIX = {"Cash": 50, "Credit Card": 35, "PayPal": 15}
+PAID_SHARE = 0.85 # Tourists who completed their reservation with a payment
+NIGHTLY_RATES = [1500, 2500, 4000, 7500]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Min-jun", "Ji-woo", "Wei", "Li", "John", "Emily", "Haruto", "Yui",
+               "Jack", "Olivia", "Lukas", "Emma", "Oliver", "Chloe", "Paolo", "Bea"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Kim", "Park", "Wang", "Chen", "Smith", "Brown", "Sato", "Tanaka", "Muller",
+              "Wilson", "Martin", "Garcia", "Lopez", "Bautista", "Lee", "Taylor", "Dubois"]
+
+def synthetic_rows(count, seed=2024, year=2024): # Yield (tourist values, selection item IDs, payment values or None)
+    import random
+    from datetime import date
+    rng = random.Random(seed)
+    categories = list(galeragate.get_catalog().categories.values())
+    month_starts = [date(year, month, 1).toordinal() for month in range(1, 13)] + [date(year + 1, 1, 1).toordinal()]
+    nationalities, nationality_weights = zip(*NATIONALITY_WEIGHTS.items())
+    nights_choices, nights_weights = zip(*STAY_NIGHT_WEIGHTS.items())
+    selection_counts, selection_weights = zip(*SELECTION_COUNT_WEIGHTS.items())
+    methods, method_weights = zip(*PAYMENT_MIX.items())
+    for _ in range(count):
+        month = rng.choices(range(12), MONTH_WEIGHTS)[0]
+        entry_day = rng.randrange(month_starts[month], month_starts[month + 1])
+        nights = rng.choices(nights_choices, nights_weights)[0]
+        entry_date = date.fromordinal(entry_day).isoformat()
+        tourist = (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.randint(18, 75), rng.choice(["Male", "Female"]),
+                   rng.choices(nationalities, nationality_weights)[0], f"09{rng.randrange(10 ** 9):09d}",
+                   entry_date, date.fromordinal(entry_day + nights).isoformat())
+        picked = rng.sample(categories, min(len(categories), rng.choices(selection_counts, selection_weights)[0]))
+        selections = [rng.choice(options) for options in picked]
+        payment = None
+        if rng.random() < PAID_SHARE:
+            payment = (rng.choices(methods, method_weights)[0], float(nights * rng.choice(NIGHTLY_RATES) + 120), entry_date)
+        yield tourist, selections, payment
+
+def generate_dataset(count, seed=2024, chunk_size=10_000): # Fill the current database with `count` synthetic tourists
+    begin = time.perf_counter()
+    chunk, tourists, selections, payments = [], 0, 0, 0
+    for tourist, picked, payment in synthetic_rows(count, seed):
+        chunk.append((None, tourist, picked, payment))
+        selections += len(picked)
+        payments += payment is not None
+        if len(chunk) == chunk_size:
+            tourists += len(galeragate.insert_manifest_chunk(chunk))
+            chunk = []
+    if chunk:
+        tourists += len(galeragate.insert_manifest_chunk(chunk))
+    elapsed = time.perf_counter() - begin
+    return dict(seed=seed, tourists=tourists, selections=selections, payments=payments, seconds=elapsed,
+                tourists_per_sec=tourists / elapsed)
+
+# Headless driver: runs the interactive flows in galeragate.py from scripted answers, with their output discarded
+class HeadlessDriver:
+    def __init__(self):
+        self.answers = []
+
+    def input(self, prompt=""):
+        if not self.answers:
+            raise RuntimeError(f"script ran out of answers at prompt {prompt!r}")
+        return self.answers.pop()
+
+    def run(self, flow, answers, *args): # Call flow(*args) answering its prompts with `answers` in order; returns (result, seconds)
+        import contextlib
+        self.answers = list(reversed(answers))
+        galeragate.input = self.input
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+                begin = time.perf_counter()
+                result = flow(*args)
+                return result, time.perf_counter() - begin
+        finally:
+            del galeragate.input
+
+def registration_answers(tourist): # tourist_menu() prompts: name, age, sex, nationality, contact, entry date, exit date
+    return [str(value) for value in tourist]
+
+def selection_answers(selections, payment): # category_selection(): pick each option, review, pay, then go back
+    catalog = galeragate.get_catalog()
+    categories = list(catalog.categories)
+    answers = []
+    for item_id in selections:
+        category, _, position = catalog.items[item_id]
+        answers += [str(categories.index(category) + 1), str(position)]
+    payment_choice = {method: choice for choice, method in galeragate.PAYMENT_METHODS.items()}[payment[0]]
+    answers += [str(len(categories) + 1), "1", payment_choice, str(payment[1]), payment[2], str(len(categories) + 3)]
+    return answers
+
+def time_flow(driver, calls): # Run (flow, answers, args) calls and summarize their latencies
+    latencies = [driver.run(flow, answers, *args)[1] for flow, answers, args in calls]
+    return dict(calls=len(latencies), seconds=sum(latencies), per_sec=len(latencies) / sum(latencies),
+                **latency_summary(latencies))
+
+def bench_flows(workdir, scale=100_000, seed=2024, calls=200):
+    import random
+    use_database(os.path.join(workdir, f"flows_{scale}.db"))
+    results = {"dataset": generate_dataset(scale, seed)}
+    rng = random.Random(seed)
+    driver = HeadlessDriver()
+    new_rows = [row for row in synthetic_rows(calls, seed + 1) if row[1] and row[2]] # Tourists who select and pay
+    results["registration"] = time_flow(driver, [(galeragate.tourist_menu, registration_answers(tourist), ())
+                                                 for tourist, _, _ in new_rows])
+    with galeragate.connection() as db:
+        last_id = db.execute("SELECT MAX(tourist_id) FROM tourists").fetchone()[0]
+    tourist_ids = range(last_id - len(new_rows) + 1, last_id + 1)
+    results["selection_and_payment"] = time_flow(driver, [
+        (galeragate.category_selection, selection_answers(selections, payment), (tourist_id,))
+        for tourist_id, (_, selections, payment) in zip(tourist_ids, new_rows)])
+    results["receipt"] = time_flow(driver, [(galeragate.proceed_to_reservation, [], (rng.randint(1, last_id),))
+                                            for _ in range(calls)])
+    results["admin_view_all_first_page"] = time_flow(driver, [(galeragate.view_all_tourists, ["", "", "", "q"], ())] * 20)
+    results["admin_view_all_filtered"] = time_flow(driver, [(galeragate.view_all_tourists, ["Korean", "2024-04-01", "2024-04-30", "q"], ())] * 20)
+    results["admin_count"] = time_flow(driver, [(galeragate.count_tourist, [], ())] * calls)
+    results["admin_payments"] = time_flow(driver, [(galeragate.payment_report, [], ())] * 3)
+    results["reset_tables"] = time_flow(driver, [(galeragate.reset_tables, ["yes"], ())])
+    return results
+
+# Search: name prefixes, misspelled names, nationalities and contact number prefixes over generated tourists
+SEARCH_QUERIES = {
+    "name_prefix": ["maria santos", "mar san", "john", "yui tan", "olivia gar"],
+    "misspelled": ["mria santso", "jhon", "olivai garsia", "haruot sato", "emmaa wilsn"],
+    "nationality": ["filipino", "korean", "german lee"],
+    "contact": ["0912", "09175", "0918 123", "9123456"],
+}
+
+def bench_search(workdir, scale=100_000, seed=2024, repeats=5):
+    use_database(os.path.join(workdir, f"search_{scale}.db"))
+    results = {"dataset": generate_dataset(scale, seed)}
+    for kind, queries in SEARCH_QUERIES.items():
+        latencies, found = [], 0
+        for _ in range(repeats):
+            for text in queries:
+                begin = time.perf_counter()
+                found += len(galeragate.search_tourists(text))
+                latencies.append(time.perf_counter() - begin)
+        results[kind] = dict(searches=len(latencies), results=found // repeats, **latency_summary(latencies))
+    return results
+
+# Rendering: the old print() per field against the buffered ReportWriter, writing the whole payment report to a file
+def legacy_payment_report(rows): # The Payments report as it used to be printed
+    for payment in rows:
+        payment_id, name, amount_paid, payment_method, payment_date, total_per_method, transaction_count = payment
+        print(f"\033[1;33mPayment ID: \033[0m{payment_id}")
+        print(f"\033[1;34mTourist Name: \033[0m{name}")
+        print(f"\033[1;34mAmount: \033[0m₱{amount_paid}")
+        print(f"\033[1;34mPayment Type: \033[0m{payment_method}")
+        print(f"\033[1;34mDate: \033[0m{payment_date}")
+        print(f"\033[1;35mTotal for {payment_method}: \033[0m₱{total_per_method} "
+              f"(\033[1;33m{transaction_count} Transactions\033[0m)")
+        print("=" * 80)
+
+def buffered_payment_report(output_format):
+    def render(rows):
+        with galeragate.ReportWriter(galeragate.PAYMENT_REPORT_HEADERS, galeragate.payment_record,
+                                     output_format=output_format) as report:
+            for payment in rows:
+                report.write(payment)
+    return render
+
+def bench_render(workdir, scale=100_000, seed=2024):
+    import contextlib
+    use_database(os.path.join(workdir, "render.db"))
+    generate_dataset(scale, seed)
+    with galeragate.connection() as db:
+        rows = db.execute(galeragate.PAYMENT_REPORT_SQL).fetchall() # Fetched once, so only rendering and I/O are timed
+    results = {}
+    variants = [("print_per_field", legacy_payment_report)] + [
+        (f"buffered_{output_format}", buffered_payment_report(output_format)) for output_format in galeragate.OUTPUT_FORMATS]
+    for name, render in variants:
+        path = os.path.join(workdir, f"render_{name}.txt")
+        with open(path, "w", encoding="utf-8") as f, contextlib.redirect_stdout(f):
+            begin = time.perf_counter()
+            render(rows)
+            sys.stdout.flush()
+            elapsed = time.perf_counter() - begin
+        results[name] = dict(rows=len(rows), seconds=elapsed, rows_per_sec=len(rows) / elapsed, bytes=os.path.getsize(path))
+    return results
+
+# Change-data export: a full export, then an incremental one after a small batch of inserts, updates and deletes
+def bench_changes(workdir, scale=100_000, seed=2024, changes=3_000):
+    use_database(os.path.join(workdir, "changes.db"))
+    results = {"dataset": generate_dataset(scale, seed)}
+    outdir = os.path.join(workdir, "changes")
+    since, until, counts, seconds = galeragate.export_changes(outdir, full=True)
+    results["full_export"] = dict(records=sum(counts.values()), seconds=seconds, records_per_sec=sum(counts.values()) / seconds)
+
+    per_kind = changes // 3
+    galeragate.insert_manifest_chunk([(None,) + row for row in synthetic_rows(per_kind, seed + 1)])
+    with galeragate.transaction() as db:
+        db.execute("UPDATE tourists SET age = age + 1 WHERE tourist_id <= ?", (per_kind,))
+        for tourist_id in range(per_kind + 1, 2 * per_kind + 1):
+            db.execute(galeragate.DELETE_TOURIST_SQL, (tourist_id,))
+    since, until, counts, seconds = galeragate.export_changes(outdir)
+    results["incremental_export"] = dict(changes=until - since, records=sum(counts.values()), seconds=seconds)
+    return results
+
+# Archival and reset: move departed tourists out in batches, compact, then empty the tables the old row-by-row way
+# (on a copy) and the truncating way
+def legacy_reset():
+    with galeragate.transaction() as db:
+        for table in ("tourists", "selections", "payment_methods"):
+            db.execute(f"DELETE FROM {table}")
+            db.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+
+def bench_archive(workdir, scale=100_000, seed=2024, cutoff="2024-07-01"):
+    main_path, copy_path = os.path.join(workdir, "archive.db"), os.path.join(workdir, "archive_copy.db")
+    use_database(main_path)
+    results = {"dataset": generate_dataset(scale, seed)}
+    archived = galeragate.archive_departed(cutoff)
+    results["archive"] = dict(tourists=archived["tourists"], selections=archived["selections"], payments=archived["payments"],
+                              seconds=archived["seconds"], tourists_per_sec=archived["tourists"] / archived["seconds"])
+    (before, after), seconds = timed(galeragate.compact_database)
+    results["compact"] = dict(mb_before=before / 1e6, mb_after=after / 1e6, seconds=seconds)
+    copy = galeragate.sqlite3.connect(copy_path)
+    with galeragate.connection() as db:
+        db.backup(copy) # The archived, compacted database, so both resets start from the same rows
+    copy.close()
+    _, seconds = timed(galeragate.clear_tables)
+    results["truncating_reset"] = dict(seconds=seconds)
+    use_database(copy_path)
+    _, seconds = timed(legacy_reset)
+    results["row_by_row_reset"] = dict(seconds=seconds)
+    return results
+
+# Analytics snapshot: memory against the same rows as a list of tuples, windowed dashboards against SQL group-bys,
+# and an incremental refresh
+SQL_WINDOW_DASHBOARD = [ # The snapshot's windowed dashboard as SQL, for comparison
+    "SELECT nationality, COUNT(*) FROM tourists WHERE entry_date BETWEEN ? AND ? GROUP BY 1 ORDER BY 2 DESC LIMIT 10",
+    "SELECT entry_date, COUNT(*) FROM tourists WHERE entry_date BETWEEN ? AND ? GROUP BY 1 ORDER BY 1 DESC LIMIT 10",
+    "SELECT payment_method, SUM(amount_paid), COUNT(*) FROM payment_methods WHERE payment_date BETWEEN ? AND ? GROUP BY 1",
+    """SELECT s.item_id, COUNT(*) FROM tourists t JOIN selections s ON s.tourist_id = t.tourist_id
+       WHERE t.entry_date BETWEEN ? AND ? GROUP BY 1 ORDER BY 2 DESC LIMIT 10""",
+]
+
+def sql_window_dashboard(date_from, date_to):
+    window = (galeragate.day_number(date_from), galeragate.day_number(date_to))
+    with galeragate.connection() as db:
+        return [db.execute(sql, window).fetchall() for sql in SQL_WINDOW_DASHBOARD]
+
+def bench_snapshot(workdir, scale=100_000, seed=2024, repeats=5, window=("2024-03-01", "2024-05-31")):
+    import tracemalloc
+    use_database(os.path.join(workdir, "snapshot.db"))
+    results = {"dataset": generate_dataset(scale, seed)}
+    tracemalloc.start()
+    with galeragate.connection() as db:
+        rows = {name: db.execute(galeragate.snapshot_rows_sql(name)).fetchall() for name in galeragate.SNAPSHOT_TABLES}
+    tuple_bytes = tracemalloc.get_traced_memory()[0]
+    del rows
+    before = tracemalloc.get_traced_memory()[0]
+    traced = galeragate.AnalyticsSnapshot()
+    traced.refresh()
+    snapshot_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del traced
+    snapshot, seconds = timed(galeragate.get_snapshot) # Timed separately, since tracemalloc slows every allocation
+    results["load"] = dict(rows=snapshot.rows(), seconds=seconds, tuples_mb=tuple_bytes / 1e6, snapshot_mb=snapshot_bytes / 1e6,
+                           memory_ratio=snapshot_bytes / tuple_bytes)
+
+    variants = [("sql_window", lambda: sql_window_dashboard(*window)),
+                ("python_window", lambda: snapshot.dashboard(10, *window, use_numpy=False)),
+                ("python_all", lambda: snapshot.dashboard(10, use_numpy=False))]
+    try:
+        import numpy  # noqa: F401
+        variants += [("numpy_window", lambda: snapshot.dashboard(10, *window, use_numpy=True)),
+                     ("numpy_all", lambda: snapshot.dashboard(10, use_numpy=True))]
+    except ImportError:
+        pass
+    for name, query in variants:
+        latencies = []
+        for _ in range(repeats):
+            _, seconds = timed(query)
+            latencies.append(seconds)
+        results[name] = latency_summary(latencies)
+
+    galeragate.insert_manifest_chunk([(None,) + row for row in synthetic_rows(1_000, seed + 1)])
+    changes, seconds = timed(snapshot.refresh)
+    results["refresh"] = dict(changes=changes, seconds=seconds, reloads=snapshot.loads - 1)
+    return results
+
+# Profile cache: kiosk sessions that keep re-reading the same tourists, with the cache off and on
+def kiosk_lookups(tourist_ids, rng, sessions, update_every): # One worker's sessions; returns profile lookups made
+    lookups = 0
+    for session in range(sessions):
+        tourist_id = rng.choice(tourist_ids)
+        galeragate.Reservation(tourist_id) # Selection menu
+        for _ in range(3): # Receipt, then back through the menus
+            galeragate.fetch_receipt(tourist_id)
+        lookups += 4
+        if session % update_every == update_every - 1: # An occasional edit drops the profile again
+            with galeragate.transaction() as db:
+                db.execute("UPDATE tourists SET age = age WHERE tourist_id = ?", (tourist_id,))
+            galeragate.profiles.invalidate(tourist_id)
+    return lookups
+
+def bench_profiles(workdir, scale=100_000, seed=2024, sessions=4_000, active=500, threads=8, update_every=20):
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    use_database(os.path.join(workdir, "profiles.db"))
+    results = {"dataset": generate_dataset(scale, seed)}
+    tourist_ids = random.Random(seed).sample(range(1, scale + 1), active) # Tourists currently at the kiosks
+    for workers in (1, threads):
+        for name, size in (("off", 0), ("on", galeragate.PROFILE_CACHE_SIZE)):
+            galeragate.profiles = galeragate.ProfileCache(size)
+            with ThreadPoolExecutor(workers) as pool:
+                begin = time.perf_counter()
+                lookups = sum(pool.map(kiosk_lookups, [tourist_ids] * workers,
+                                       [random.Random(seed + worker) for worker in range(workers)],
+                                       [sessions // workers] * workers, [update_every] * workers))
+                elapsed = time.perf_counter() - begin
+            stats = galeragate.profiles.stats()
+            results[f"{name}_{workers}_threads"] = dict(lookups=lookups, seconds=elapsed, lookups_per_sec=lookups / elapsed,
+                                                        hit_rate=stats["hit_rate"], invalidations=stats["invalidations"])
+    galeragate.profiles = galeragate.ProfileCache()
+    return results
+
+# Group commit: many gate kiosks checking tourists in at once, each waiting for its own commit versus the write-behind writer
+def gate_checkins(count, selections, payment): # One producer's check-ins; returns their latencies
+    latencies = []
+    for n in range(count):
+        tourist = (f"Gate {n}", 30, "Female", "Filipino", "09120000000", "2024-05-01", "2024-05-04")
+        _, seconds = timed(galeragate.commit_write, galeragate.insert_tourist, tourist, selections, payment)
+        latencies.append(seconds)
+    return latencies
+
+def bench_group_commit(workdir, producers=64, checkins=10_000):
+    from concurrent.futures import ThreadPoolExecutor
+    payment = ("Cash", 1500.0, "2024-05-01")
+    results = {}
+    for name, write_behind in (("synchronous", False), ("write_behind", True)):
+        use_database(os.path.join(workdir, f"group_commit_{name}.db"))
+        selections = sample_selections(3)
+        galeragate.WRITE_BEHIND = write_behind
+        try:
+            with ThreadPoolExecutor(producers) as pool:
+                begin = time.perf_counter()
+                latencies = [seconds for batch in pool.map(gate_checkins, [checkins // producers] * producers,
+                                                           [selections] * producers, [payment] * producers)
+                             for seconds in batch]
+                elapsed = time.perf_counter() - begin
+            stats = galeragate.writer.stats() if galeragate.writer else {}
+        finally:
+            galeragate.WRITE_BEHIND = False
+            galeragate.stop_writer()
+        results[name] = dict(producers=producers, checkins=len(latencies), seconds=elapsed,
+                             checkins_per_sec=len(latencies) / elapsed, **latency_summary(latencies),
+                             commits=stats.get("groups", len(latencies)), checkins_per_commit=stats.get("writes_per_group", 1.0))
+    return results
+
+# Typed storage: the tourists and payments tables (with their indexes) as stored now versus the old text layout,
+# built from the same generated rows, compared by file size and date-range query latency
+LEGACY_LAYOUT = [
+    ("tourists", "tourist_id INTEGER PRIMARY KEY, name TEXT, age INTEGER, sex TEXT, nationality TEXT, "
+                 "contact_number TEXT, entry_date TEXT, exit_date TEXT",
+     "tourist_id, name, age, sex, nationality, '0' || substr(contact_number, 4), "
+     "date(entry_date + 1721424.5), date(exit_date + 1721424.5)"),
+    ("payment_methods", "payment_id INTEGER PRIMARY KEY, tourist_id INTEGER, payment_method TEXT, amount_paid REAL, payment_date TEXT",
+     "payment_id, tourist_id, payment_method, amount_paid / 100.0, date(payment_date + 1721424.5)"),
+]
+LAYOUT_INDEXES = [
+    "CREATE INDEX idx_tourists_entry_date ON tourists (entry_date)",
+    "CREATE INDEX idx_tourists_stays ON tourists (exit_date, entry_date, nationality)",
+    "CREATE INDEX idx_tourists_contact ON tourists (contact_number)",
+    "CREATE INDEX idx_payments_tourist ON payment_methods (tourist_id)",
+    "CREATE INDEX idx_payments_date ON payment_methods (payment_date)",
+]
+RANGE_QUERIES = {
+    "stays_in_window": "SELECT nationality, COUNT(*) FROM tourists WHERE exit_date >= ? AND entry_date <= ? GROUP BY 1",
+    "arrivals_by_day": "SELECT entry_date, COUNT(*) FROM tourists WHERE entry_date BETWEEN ? AND ? GROUP BY 1",
+    "payments_in_window": "SELECT COUNT(*), SUM(amount_paid) FROM payment_methods WHERE payment_date BETWEEN ? AND ?",
+}
+
+def copy_layout(source, path, legacy): # The tourists and payments tables of `source` alone in a compacted file
+    import sqlite3
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute("ATTACH DATABASE ? AS source", (source,))
+    db.execute("BEGIN")
+    for table, columns, select in LEGACY_LAYOUT:
+        if legacy:
+            db.execute(f"CREATE TABLE {table} ({columns})")
+            db.execute(f"INSERT INTO {table} SELECT {select} FROM source.{table}")
+        else:
+            db.execute(db.execute("SELECT sql FROM source.sqlite_master WHERE name = ?", (table,)).fetchone()[0])
+            db.execute(f"INSERT INTO {table} SELECT * FROM source.{table}")
+    for statement in LAYOUT_INDEXES:
+        db.execute(statement)
+    db.execute("COMMIT")
+    db.execute("DETACH DATABASE source")
+    db.execute("VACUUM")
+    db.execute("ANALYZE")
+    return db
+
+def bench_typed(workdir, scale=100_000, seed=2024, repeats=20, window=("2024-03-01", "2024-05-31")):
+    source = os.path.join(workdir, "typed_source.db")
+    use_database(source)
+    results = {"dataset": generate_dataset(scale, seed)}
+    galeragate.close_db()
+    for name, legacy in (("legacy_text", True), ("typed", False)):
+        path = os.path.join(workdir, f"typed_{name}.db")
+        db = copy_layout(source, path, legacy)
+        params = window if legacy else tuple(galeragate.day_number(day) for day in window)
+        results[name] = {"file_mb": os.path.getsize(path) / 1e6}
+        for query, sql in RANGE_QUERIES.items():
+            latencies = [timed(lambda: db.execute(sql, params[::-1] if query == "stays_in_window" else params).fetchall())[1]
+                         for _ in range(repeats)]
+            results[name][f"{query}_p50_ms"] = percentile(latencies, 50) * 1000
+        db.close()
+    return results
+
+# Report replica: kiosks check in for `seconds` while an admin runs the full payment and tourist reports, with the
+# reports reading the live database and then a replica refreshed through the backup API. On the live file the paged
+# tourist report keeps finding the tourists checked in behind it, so it only finishes once the kiosks stop
+def checkins_until(stop, selections, payment): # Check tourists in until `stop` is set; returns their latencies
+    latencies = []
+    while not stop.is_set():
+        tourist = ("Gate Rush", 30, "Female", "Filipino", "09120000000", "2024-05-01", "2024-05-04")
+        latencies.append(timed(galeragate.commit_write, galeragate.insert_tourist, tourist, selections, payment)[1])
+    return latencies
+
+def run_reports(): # Run the payment and tourist reports once; returns their latencies
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        return [timed(galeragate.write_report, report, None, None, None, devnull)[1] for report in ("payments", "tourists")]
+
+def bench_replica(workdir, scale=100_000, seed=2024, kiosks=8, seconds=10.0, max_age=5.0):
+    import shutil
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    payment = ("Cash", 1500.0, "2024-05-01")
+    source = os.path.join(workdir, "replica_source.db")
+    use_database(source)
+    results = {"dataset": generate_dataset(scale, seed)}
+    galeragate.close_db()
+    for name, use_replica in (("live_reports", False), ("replica_reports", True)):
+        path = os.path.join(workdir, f"replica_{name}.db")
+        shutil.copyfile(source, path)
+        use_database(path)
+        selections = sample_selections(3)
+        galeragate.REPORT_REPLICA, galeragate.REPLICA_MAX_AGE_SECONDS = use_replica, max_age
+        stop = threading.Event()
+        try:
+            with ThreadPoolExecutor(kiosks + 1) as pool:
+                begin = time.perf_counter()
+                reports = pool.submit(run_reports)
+                checkins = [pool.submit(checkins_until, stop, selections, payment) for _ in range(kiosks)]
+                wal_bytes = 0
+                while time.perf_counter() - begin < seconds: # Long reads on the live file hold back checkpoints, so the WAL grows
+                    wal_bytes = max(wal_bytes, os.path.getsize(path + "-wal") if os.path.exists(path + "-wal") else 0)
+                    time.sleep(0.05)
+                stop.set()
+                latencies = [latency for future in checkins for latency in future.result()]
+                elapsed = time.perf_counter() - begin
+                report_latencies = reports.result()
+            replica = galeragate.replica.stats() if galeragate.replica else {}
+        finally:
+            galeragate.REPORT_REPLICA = False
+            galeragate.close_db()
+        results[name] = dict(checkins=len(latencies), seconds=elapsed, checkins_per_sec=len(latencies) / elapsed,
+                             **latency_summary(latencies), payments_report_ms=report_latencies[0] * 1000,
+                             tourists_report_ms=report_latencies[1] * 1000,
+                             max_wal_mb=wal_bytes / 1e6, replica_copies=replica.get("refreshes", 0),
+                             copy_seconds=replica.get("copy_seconds", 0.0))
+    return results
+
+BENCHMARKS = {
+    "reservations": bench_reservations,
+    "trends": bench_trends,
+    "receipts": bench_receipts,
+    "admin_session": bench_admin_session,
+    "flows": bench_flows,
+    "tracing": bench_tracing,
+    "search": bench_search,
+    "render": bench_render,
+    "changes": bench_changes,
+    "archive": bench_archive,
+    "snapshot": bench_snapshot,
+    "profiles": bench_profiles,
+    "group_commit": bench_group_commit,
+    "typed": bench_typed,
+    "replica": bench_replica,
+}
+SCALED_BENCHMARKS = {"flows", "search", "render", "changes", "archive", "snapshot", "profiles", "typed", "replica"} # Benchmarks that take --scale and --seed
+
+def print_results(name, results):
+    print(f"\n== {name} ==")
+    for variant, stats in results.items():
+        print(f"  {variant}")
+        for key, value in stats.items():
+            print(f"    {key:<22} {value:,.2f}" if isinstance(value, float) else f"    {key:<22} {value:,}")
+
+def environment(): # What the numbers were measured on, so saved runs can be compared fairly
+    import platform
+    return dict(python=platform.python_version(), sqlite=galeragate.sqlite3.sqlite_version, platform=platform.platform(),
+                started=time.strftime("%Y-%m-%dT%H:%M:%S%z"))
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="benchmarks.py", description="Benchmark GaleraGate's database paths.")
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results to FILE as JSON")
+    parser.add_argument("--scale", type=int, default=100_000, help=f"synthetic tourists for the {', '.join(sorted(SCALED_BENCHMARKS))} benchmarks (default: 100000)")
+    parser.add_argument("--seed", type=int, default=2024, help="seed for the synthetic data (default: 2024)")
+    parser.add_argument("--generate", metavar="DB", help="only fill DB with --scale synthetic tourists and exit")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    if args.generate:
+        use_database(args.generate)
+        print_results("generate", {"dataset": generate_dataset(args.scale, args.seed)})
+        galeragate.close_db()
+        return 0
+
+    report = {"environment": environment(), "results": {}}
+    with tempfile.TemporaryDirectory() as workdir: # Real files, so commit and fsync costs are included
+        for name in args.benchmarks or BENCHMARKS:
+            options = dict(scale=args.scale, seed=args.seed) if name in SCALED_BENCHMARKS else {}
+            report["results"][name] = BENCHMARKS[name](workdir, **options)
+            print_results(name, report["results"][name])
+        galeragate.close_db()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
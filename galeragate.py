@@ -1,595 +1,3964 @@
-import sqlite3
-
-# Database setup
-conn = sqlite3.connect('galeragate.db') # Connect to SQLite database (or create it if it doesn't exist)
-cursor = conn.cursor() # Create a cursor object to execute SQL commands
-
-# Create the 'tourists' table to store tourist information
-cursor.execute(''' 
-CREATE TABLE IF NOT EXISTS tourists (
-    tourist_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name VARCHAR (300) NOT NULL,
-    age INTEGER,
-    sex VARCHAR (10),
-    nationality VARCHAR (100),
-    contact_number INTEGER,
-    entry_date DATE,
-    exit_date DATE
-)
-''')
-
-# Create the 'selections' table to store tourist selections (e.g., attractions, services)
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS selections (
-    tourist_id INTEGER,
-    category VARCHAR (100),
-    choice VARCHAR (100),
-    PRIMARY KEY (tourist_id, category, choice),  
-    FOREIGN KEY (tourist_id) REFERENCES tourists(tourist_id)
-)
-''')
-
-# Create the 'payment_methods' table to store payment details
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS payment_methods (
-    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    tourist_id INTEGER,
-    payment_method VARCHAR (100),
-    amount_paid INT,
-    payment_date DATE,
-    FOREIGN KEY (tourist_id) REFERENCES tourists(tourist_id)
-)
-''')
-
-conn.commit() # Save the changes to the database
-
-# Functions
-def welcome_screen():
-    import time  # Import the time module to determine the current time for the greeting
-    current_hour = time.localtime().tm_hour # Get the current hour of the day
-    if 5 <= current_hour < 12:
-        greeting = "Good Morning"
-    elif 12 <= current_hour < 18:
-        greeting = "Good Afternoon"
-    else:
-        greeting = "Good Evening"
-        
-
-    # Display the welcome menu
-    print("\n" + "=" * 80)
-    print("\033[1;35m" + f" " * 20 + f"✨ {greeting}! Welcome to GaleraGate ✨" + "\033[0m")
-    print("\033[1;36m" + " " * 20 + "Your Gateway to Puerto Galera's Paradise!" + "\033[0m")
-    print("=" * 80)
-    
-    print("\033[1;37m"+ " " * 20 + "Please choose an option to proceed:\033[0m")
-    print("\033[1;33m[1] 🏖 Tourist - Explore attractions, make reservations, and more.\033[0m")
-    print("\033[1;35m[2] 🛠 Admin - Manage tourist data and view reports.\033[0m")
-    print("\033[1;36m[3] 💬 FAQ's - Learn how to use the system and find answers.\033[0m")
-    print("\033[1;31m[4] ❌ Exit - Close the application.\033[0m")
-    
-    print("-" * 80)
-    valid_choices = {'1', '2', '3', '4'} # Validate user input
-    choice = input("\033[1;37mEnter your choice: \033[0m").strip().upper()
-    
-    while choice not in valid_choices: # Check if the input is valid; if not, prompt the user to try again
-        print("\033[1;31mInvalid choice. Please try again.\033[0m")
-        choice = input("\033[1;37mEnter your choice: \033[0m").strip().upper()
-    
-    print("=" * 80)
-    return choice
-
-def tourist_menu():
-    print("\033[1;32m" + " " * 25 + "🌴 Welcome, dear Tourist! 🌴" + "\033[0m")
-    print("\033[1;36m" + " " * 10 + "Get ready to immerse yourself in the beauty of Puerto Galera. \033[0m")
-    print("=" * 80)
-    
-    print("\033[1;33m" + "Please provide your personal information below to proceed." + "\033[0m")
-    print("-" * 80)
-    
-    name = input("👤 Name: ").strip()
-   # Age input validation
-    while True:
-        try:
-            age = int(input("🎂 Age: ").strip())
-            if age <= 0:
-                print("\033[1;31mAge must be a positive number. Please enter a valid age.\033[0m")
-                continue
-            break
-        except ValueError as e: # Handle case where input is not a valid number
-            print(f"\033[1;31mInvalid input for age. Please enter a valid number. \n{e}\033[0m")
-    sex = input("⚤ Sex (Male/Female): ").strip()
-    nationality = input("🌍 Nationality: ").strip()
-    contact = input("📞 Contact Number: ").strip()
-    entry_date = input("📅 Entry Date (YYYY-MM-DD): ").strip()
-    exit_date = input("📅 Exit Date (YYYY-MM-DD): ").strip()
-    try:  # Insert the tourist data into the database
-        cursor.execute(''' 
-        INSERT INTO tourists (name, age, sex, nationality, contact_number, entry_date, exit_date)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (name, age, sex, nationality, contact, entry_date, exit_date))
-        conn.commit()
-    except sqlite3.Error as e:   # Handle any SQLite errors
-        print(f"Error occurred: {e}")
-    
-    tourist_id = cursor.lastrowid # Get the last inserted tourist's ID
-    print("\n\033[1;32m" + f"🎉 Your Tourist ID is: {str(tourist_id).zfill(4)} 🎉" + "\033[0m")
-    print("=" * 80)
-    
-    return tourist_id
-
-def edit_personal_info(tourist_id):
-    print("\n" + "=" * 80)
-    print("\033[1;34m" + "Edit Your Personal Information".center(80) + "\033[0m")
-    print("=" * 80)
-    
-    # Retrieve the tourist's current information from the database
-    cursor.execute("SELECT * FROM tourists WHERE tourist_id = ?", (tourist_id,))
-    tourist = cursor.fetchone()
-    
-    if tourist:
-        print("\033[1;32m" + "Current Information".center(80) + "\033[0m")
-        print("-" * 80)
-        print(f"\033[1mTourist ID   : {tourist_id:04}\033[0m")
-        print(f"Name         : {tourist[1]}")
-        print(f"Age          : {tourist[2]}")
-        print(f"Sex          : {tourist[3]}")
-        print(f"Nationality  : {tourist[4]}")
-        print(f"Contact No.  : {tourist[5]}")
-        print(f"Entry Date   : {tourist[6]}")
-        print(f"Exit Date    : {tourist[7]}")
-        print("-" * 80)
-        
-        # Prompt the user to enter new details or press Enter to keep the current values
-        print("\n\033[1;33m" + "Enter new details or press Enter to keep the current value:".center(80) + "\033[0m")
-        
-        name = input(f"Name [{tourist[1]}]: ") or tourist[1]
-        age = input(f"Age [{tourist[2]}]: ")
-        age = int(age) if age.isdigit() else tourist[2]
-        sex = input(f"Sex [{tourist[3]}]: ") or tourist[3]
-        nationality = input(f"Nationality [{tourist[4]}]: ") or tourist[4]
-        contact = input(f"Contact Number [{tourist[5]}]: ") or tourist[5]
-        entry_date = input(f"Entry Date [{tourist[6]}]: ") or tourist[6]
-        exit_date = input(f"Exit Date [{tourist[7]}]: ") or tourist[7]
-        
-        print("\n\033[1;36mProcessing...\033[0m")
-        print("=" * 80)
-        
-        # Update the tourist's information in the database
-        cursor.execute('''
-            UPDATE tourists 
-            SET name = ?, age = ?, sex = ?, nationality = ?, contact_number = ?, entry_date = ?, exit_date = ?
-            WHERE tourist_id = ?
-        ''', (name, age, sex, nationality, contact, entry_date, exit_date, tourist_id))
-        conn.commit()
-        
-        print("\033[1;32mInformation updated successfully!\033[0m")
-    else:
-        print("\033[1;31mTourist not found. Please try again.\033[0m")
-    print("=" * 80)
-
-def category_selection(tourist_id):
-    # Dictionary holding categories and their respective options
-    categories = {
-        "Resort": ["Mermaid Resort", "Blue Crystal Beach Resort", "Edgewater Dive & Spa", "Arkipelago Beach Resort", "Steps and Garden Resort"],
-        "Restaurant": ["Atlantis Restaurant", "Aplayang Munti Resto", "Badladz", "Fisherman's Cove", "Jalyn's Resto"],
-        "Activities": ["Snorkeling", "Scuba Diving", "Island Hopping", "Sunset Cruise", "Water Sports"],
-        "Places": ["White Beach", "Sabang Beach", "Tamaraw Falls", "Mangrove Forest", "Coral Garden"]
-    }
-
-    while True:
-        print("=" * 80)
-        print("\033[1;36m" + " " * 20 + "🗺️ Categories: Choose your options below!" + "\033[0m")
-        print("=" * 80)
-        # Show the available categories (Resort, Restaurant, Activities, Places)
-        for i, category in enumerate(categories.keys(), start=1):
-            print(f"\033[1;33m[{i}] {category} 🏖️\033[0m")
-        
-        print("\033[1;35m[5] Overall Selection 📋\033[0m")
-        print("\033[1;31m[6] Delete Selection ❌\033[0m")
-        print("\033[1;32m[7] Back to Main Menu ↩️\033[0m")
-
-        choice = input("Enter your choice: ").strip()
-        
-        if choice in "1234": # User selects a category, show available options within that category
-            category = list(categories.keys())[int(choice) - 1]
-            print(f"\n\033[1;34m{category} Options 🏖️\033[0m")
-            print("-" * 80)
-            
-            for i, option in enumerate(categories[category], start=1):
-                print(f"\033[1;32m[{i}] {option}\033[0m")
-            
-            selection = int(input("Enter your choice: ")) - 1
-            selected_item = categories[category][selection]
-            
-            cursor.execute("INSERT INTO selections (tourist_id, category, choice) VALUES (?, ?, ?)",
-                           (tourist_id, category, selected_item))
-            conn.commit()
-            print(f"\n\033[1;32mAdded: {selected_item} under {category} ✅\033[0m")
-        
-        elif choice == "5": # View the overall selections made by the tourist
-            cursor.execute("SELECT category, choice FROM selections WHERE tourist_id = ?", (tourist_id,))
-            selections = cursor.fetchall()
-            if selections:
-                print("\n\033[1;36mOverall Selections 📋\033[0m")
-                print("=" * 80)
-                for category, choice in selections:
-                    index = categories[category].index(choice) + 1
-                    print(f"[{index}] {category}: {choice}")
-                print("\033[1;33m[1] Proceed to Reservation 📅\033[0m")
-                print("\033[1;31m[2] Exit ❌\033[0m")
-                option = input("Enter your choice: ").strip()
-                print("=" * 80)
-                if option == "1":
-                    print("\033[1;33mProceeding to payment...\033[0m")
-                    print("\033[1;31mUpon arriving at Puerto Galera's Balatero Pier\nmake sure to pay the Environmental User Fee of 120 pesos per tourist.\nFrom there, trikes are readily available to transport you to your resort.\033[0m")
-                    print("=" * 80)
-                    
-                    # Payment Method Input
-                    print("\033[1;34mPayment Options 🛒\033[0m")
-                    print("\033[1;35m1. Credit Card\033[0m")
-                    print("\033[1;35m2. Cash\033[0m")
-                    print("\033[1;35m3. PayPal\033[0m")
-                    payment_choice = input("Choose a payment method: ").strip()
-                    payment_methods = { "1": "Credit Card", "2": "Cash", "3": "PayPal" }
-                    
-                    if payment_choice in payment_methods: # Record the payment details in the database
-                        payment_method = payment_methods[payment_choice]
-                        amount_paid = float(input("Enter the total amount paid: "))
-                        payment_date = input("Enter the payment date (YYYY-MM-DD): ").strip()
-                        
-                        cursor.execute(
-                            "INSERT INTO payment_methods (tourist_id, payment_method, amount_paid, payment_date) VALUES (?, ?, ?, ?)",
-                            (tourist_id, payment_method, amount_paid, payment_date)
-                        )
-                        conn.commit()
-                        print("\n\033[1;32mPayment completed successfully! ✅\033[0m")
-                        proceed_to_reservation(tourist_id)
-                    else:
-                        print("\n\033[1;31mInvalid payment method selected.❌\033[0m")
-                elif option == "2":
-                    break
-            else:
-                print("\n\033[1;31mNo selections made yet. Please make a selection first!❌\033[0m")
-        
-        elif choice == "6": # Delete a selection made by the tourist
-            cursor.execute("SELECT rowid, category, choice FROM selections WHERE tourist_id = ?", (tourist_id,))
-            selections = cursor.fetchall()
-            if selections:
-                print("\n\033[1;31mYour Selections to Delete❌\033[0m")
-                print("=" * 80)
-        
-                for rowid, category, choice in selections:
-                    category_index = list(categories.keys()).index(category) + 1
-                    choice_index = categories[category].index(choice) + 1
-                    print(f"[{category_index}] {category}: {choice}")
-        
-                choice_index = int(input(f"Enter the option number to delete under {category}: ").strip()) - 1
-                selected_choice = categories[category][choice_index]
-                
-                confirmation = input(f"\n\033[1;33mAre you sure you want to delete this selection: {selected_choice}? \nType 'yes' to confirm: \033[0m").strip().lower()
-                
-                if confirmation == 'yes':
-                    cursor.execute("DELETE FROM selections WHERE tourist_id = ? AND category = ? AND choice = ?",
-                                (tourist_id, category, selected_choice))
-                    conn.commit()
-                    print("\n\033[1;32mSelection deleted successfully. ✅\033[0m")
-                else:
-                    print("\n\033[1;31mDeletion cancelled. No changes were made.❌\033[0m")
-            else:
-                print("\n\033[1;31mNo selections to delete.❌\033[0m")
-                
-        elif choice == "7":
-            break
-
-def proceed_to_reservation(tourist_id):
-    print("\n\033[1;36m" + " " * 30 + "Generating Receipt..." "\033[0m\n")
-    # Fetch Tourist Details
-    cursor.execute("SELECT * FROM tourists WHERE tourist_id = ?", (tourist_id,))
-    tourist = cursor.fetchone()
-    
-    print("=" * 80)
-    print("\033[1;35m" + " " * 30 + "===== Tourist Receipt =====" + "\033[0m")
-    print("=" * 80)
-    
-    # Tourist Info with formatting
-    print(f"\033[1;33mTourist ID: \033[0m{str(tourist_id).zfill(4)}")
-    print(f"\033[1;33mName: \033[0m{tourist[1]}")
-    print(f"\033[1;33mAge: \033[0m{tourist[2]}")
-    print(f"\033[1;33mSex: \033[0m{tourist[3]}")
-    print(f"\033[1;33mNationality: \033[0m{tourist[4]}")
-    print(f"\033[1;33mContact: \033[0m{tourist[5]}")
-    print(f"\033[1;33mEntry Date: \033[0m{tourist[6]}")
-    print(f"\033[1;33mExit Date: \033[0m{tourist[7]}")
-    
-    # Display Selections
-    print("\n\033[1;36mSelections:\033[0m")
-    print("=" * 80)
-    cursor.execute("SELECT category, choice FROM selections WHERE tourist_id = ?", (tourist_id,))
-    selections = cursor.fetchall()
-    
-    if selections:
-        for category, choice in selections:
-            print(f"\033[1;34m{category}: \033[0m{choice}")
-    else:
-        print("\033[1;31mNo selections made yet.\033[0m")
-    
-    # Fetch and Display Payment Information
-    print("\n\033[1;36mPayment Details:\033[0m")
-    print("=" * 80)
-    cursor.execute("SELECT payment_method, amount_paid, payment_date FROM payment_methods WHERE tourist_id = ?", (tourist_id,))
-    payment = cursor.fetchone()
-    
-    if payment:
-        print(f"\033[1;33mPayment Method: \033[0m{payment[0]}")
-        print(f"\033[1;33mAmount Paid: \033[0m₱{payment[1]:,.2f}")
-        print(f"\033[1;33mPayment Date: \033[0m{payment[2]}")
-    else:
-        print("\033[1;31mNo payment information found.\033[0m")
-    
-    # Footer Message
-    print("=" * 80)
-    print("\033[1;32mThank you for your reservation! We hope you have a great time at Puerto Galera! 🌞\033[0m")
-
-def login():
-    print("\033[1;36m" + " " * 33 + "🔒 Admin Login\033[0m")
-    print("=" * 80)
-    
-     # Prompt user for email and password input
-    email = input("\033[1;33m📧 Enter email: \033[0m")
-    password = input("\033[1;33m🔑 Enter password: \033[0m")
-    
-    # Retry mechanism in case of incorrect credentials
-    retry_count = 3
-    while retry_count > 0: # Check credentials and grant access
-        if email == "admin@galeragate.com" and password == "admin123":
-            print("\n\033[1;32m✅ Login successful! Redirecting to Admin Panel... 🌟\033[0m")
-            admin_menu()
-            break
-        else:
-            retry_count -= 1
-            if retry_count > 0:
-                print(f"\033[1;31m❌ Invalid email or password. {retry_count} attempts left. Please try again. 🔄\033[0m")
-                email = input("\033[1;33m📧 Enter email: \033[0m")
-                password = input("\033[1;33m🔑 Enter password: \033[0m")
-            else:
-                print("\033[1;31m❌ Too many failed attempts. Please try again later. 🔒\033[0m")
-                break
-            
-def count_tourist(): # Query to count the total number of tourists in the database
-    query = "SELECT COUNT(*) AS total_tourists FROM tourists;"
-    cursor.execute(query)
-    result = cursor.fetchone()
-    print("\033[1;32m" + " " * 20 + "🎉 Total Number of Tourists: \033[1;33m" + str(result[0]) + "\033[0m")
-    print("=" * 80)
-        
-def reset_tables():
-    print("=" * 80)
-    print("\033[1;31m🧹 Resetting tables... ⚠️ This will delete all data and reset IDs.\033[0m")  # Print a message warning the user about resetting the tables and deleting all data
-    confirm = input("\033[1;33mAre you sure? Type 'yes' to confirm: \033[0m").strip().lower()
-    
-    if confirm == 'yes':
-        print("\n\033[1;36m🔄 Resetting tables...\033[0m")
-        
-         # Execute SQL queries to delete all records from relevant tables
-        cursor.execute("DELETE FROM tourists")
-        cursor.execute("DELETE FROM selections")
-        cursor.execute("DELETE FROM payment_methods")  # Clear payment_methods table
-        conn.commit()
-
-        # Reset AUTOINCREMENT for all tables
-        cursor.execute("DELETE FROM sqlite_sequence WHERE name='tourists'")
-        cursor.execute("DELETE FROM sqlite_sequence WHERE name='selections'")
-        cursor.execute("DELETE FROM sqlite_sequence WHERE name='payment_methods'")  # Reset payment_methods
-        conn.commit()
-
-        print("\n\033[1;32m✅ Tables cleared and IDs reset successfully! 🎉\033[0m")
-    else:
-        print("\n\033[1;31m❌ Reset canceled. No changes made.\033[0m")
-    print("=" * 80)
-
-def admin_menu():
-    print("\n" + "=" * 80)
-    print("\033[1;35m"+ " " * 30 + "✨ Admin Panel ✨\033[0m")
-    print("=" * 80)
-    print("\033[1;33m[1] 👀 View All Tourists\033[0m")
-    print("\033[1;34m[2] ✏️ Update Tourist Info\033[0m")
-    print("\033[1;35m[3] 🧑 Count All Tourists\033[0m")
-    print("\033[1;31m[4] 🗑️ Delete Tourist\033[0m")
-    print("\033[1;32m[5] 💳 View Payment Methods\033[0m")
-    print("\033[1;36m[6] 🔄 Reset Tables\033[0m")
-    print("\033[1;32m[7] 🚪 Exit\033[0m")
-    choice = input("\nEnter your choice: ").strip()
-    print("=" * 80)
-    
-    if choice == "1":  # Query to fetch all tourists along with their selections from the database
-        cursor.execute("""
-        SELECT tourists.tourist_id, tourists.name, tourists.age, tourists.nationality,
-               tourists.contact_number, tourists.entry_date, tourists.exit_date,
-               selections.category, selections.choice
-        FROM tourists
-        LEFT JOIN selections ON tourists.tourist_id = selections.tourist_id
-        """)
-    
-        tourists = cursor.fetchall()
-        print("\n\033[1;32mAll Tourists:\033[0m")
-        print("=" * 80)
-    
-        current_tourist_id = None
-        for row in tourists: # Loop through the fetched tourist data
-            tourist_id, name, age, nationality, contact_number, entry_date, exit_date, category, choice = row # Unpack the row into respective variables
-        
-            if tourist_id != current_tourist_id:  # Display tourist info for each new tourist ID (avoiding duplicates)
-                if current_tourist_id is not None:
-                    print("=" * 80)
-            
-                print(f"\033[1;33mTourist ID: \033[0m{str(tourist_id).zfill(4)}")
-                print(f"\033[1;34mName:\033[0m \033[1;36m{name}\033[0m")
-                print(f"\033[1;34mAge:\033[0m \033[1;33m{age}\033[0m")
-                print(f"\033[1;34mNationality:\033[0m \033[1;32m{nationality}\033[0m")
-                print(f"\033[1;34mContact Number:\033[0m \033[1;31m{contact_number}\033[0m")
-                print(f"\033[1;34mEntry Date:\033[0m \033[1;36m{entry_date}\033[0m")
-                print(f"\033[1;34mExit Date:\033[0m \033[1;38m{exit_date}\033[0m")
-        
-            if category and choice:
-                print(f"\033[1;32mSelections:\033[0m")
-                print(f"\033[1;34m{category}: \033[0m\033[1;33m{choice}\033[0m")
-        
-            current_tourist_id = tourist_id
-
-        print("=" * 80)
-        admin_menu()
-
-    elif choice == "2":
-        tourist_id = int(input("\033[1;33mEnter Tourist ID to update: \033[0m"))
-        edit_personal_info(tourist_id)
-        admin_menu()
-
-    elif choice == "3":
-        count_tourist()
-        admin_menu()
-
-    elif choice == "4":
-        tourist_id = int(input("\033[1;31mEnter Tourist ID to delete: \033[0m"))
-        cursor.execute("DELETE FROM tourists WHERE tourist_id = ?", (tourist_id,)) # Execute SQL query to delete the tourist record from the database using the entered ID 
-        conn.commit()
-        print("\n\033[1;31mTourist deleted successfully. 🗑️\033[0m")
-        admin_menu()
-
-    elif choice == "5":  # View Payment Methods
-        # Advanced SQL query to fetch detailed payment records and aggregated summaries
-        cursor.execute("""
-        SELECT 
-            pm.payment_id, 
-            t.name, 
-            pm.amount_paid, 
-            pm.payment_method, 
-            pm.payment_date,
-            SUM(pm.amount_paid) OVER (PARTITION BY pm.payment_method) AS TotalPerMethod,
-            COUNT(pm.payment_id) OVER (PARTITION BY pm.payment_method) AS TransactionCount
-        FROM payment_methods pm
-        JOIN tourists t ON pm.tourist_id = t.tourist_id
-        ORDER BY pm.payment_date DESC;
-        """)
-        payments = cursor.fetchall()
-
-        # Display payment records   
-        print("\033[1;32m" + " " * 30 + "All Payment Records: " + "\033[0m")
-        print("-" * 80)
-        for payment in payments:
-            payment_id, name, amount_paid, payment_method, payment_date, total_per_method, transaction_count = payment
-            print(f"\033[1;33mPayment ID: \033[0m{payment_id}")
-            print(f"\033[1;34mTourist Name: \033[0m{name}")
-            print(f"\033[1;34mAmount: \033[0m₱{amount_paid}")
-            print(f"\033[1;34mPayment Type: \033[0m{payment_method}")
-            print(f"\033[1;34mDate: \033[0m{payment_date}")
-            print(f"\033[1;35mTotal for {payment_method}: \033[0m₱{total_per_method} "
-                  f"(\033[1;33m{transaction_count} Transactions\033[0m)")
-            print("=" * 80)
-        admin_menu()
-
-    elif choice == "6":
-        reset_tables()
-        admin_menu()
-
-    elif choice == "7":
-        print("\033[1;36mGoodbye! 👋\033[0m")
-        return
-
-    else:
-        print("\033[1;31mInvalid choice. Please try again. ❌\033[0m")
-    print("=" * 80)
-    
-def faq():
-    print("\033[1;36m"+ " " * 20 + "💬 Frequently Asked Questions (FAQ) 💬" + "\033[0m")
-    print("=" * 80)
-    print("\033[1;33m[1] How do I register as a tourist?\033[0m")
-    print("\033[1;34m[2] What is the Tourist ID and how is it generated?\033[0m")
-    print("\033[1;35m[3] How do I make selections for resorts, restaurants, and activities?\033[0m")
-    print("\033[1;32m[4] Can I edit my personal information after registration?\033[0m")
-    print("\033[1;31m[5] How do I delete my selections?\033[0m")
-    print("\033[1;37m[6] How can I view my reservation and selections?\033[0m")
-    print("\033[1;36m[7] What should I do if I forgot my Tourist ID?\033[0m")
-    print("\033[38;5;208m[8] Back to Main Menu ↩️\033[0m")
-    print("=" * 80)
-
-    choice = input("Enter the number of your question: ").strip()
-
-    if choice == "1":
-        print("\n\033[1;36mHow do I register as a tourist?\033[0m")
-        print("=" * 80)
-        print("To register as a tourist, simply choose the 'Tourist' option from the main menu\nand provide your personal information (Name, Age, Sex, Nationality, etc.).\nOnce you submit, you'll receive a unique Tourist ID for your records.")
-    elif choice == "2":
-        print("\n\033[1;36mWhat is the Tourist ID and how is it generated?\033[0m")
-        print("=" * 80)
-        print("The Tourist ID is a unique identifier assigned to each tourist.\nIt is generated automatically when you register with your\ndetails, ensuring no two tourists have the same ID.")
-    elif choice == "3":
-        print("\n\033[1;36mHow do I make selections for resorts, restaurants, and activities?\033[0m")
-        print("=" * 80)
-        print("Once you're registered, you'll be able to choose from different categories\nlike Resorts, Restaurants, Activities, and Places. Simply\nselect your preferred options, and they will be saved to your profile.")
-    elif choice == "4":
-        print("\n\033[1;36mCan I edit my personal information after registration?\033[0m")
-        print("=" * 80)
-        print("Yes! You can always edit your personal information after registration.\nJust visit the 'Edit Personal Information' section and\n update any details like name, age, contact number, etc.")
-    elif choice == "5":
-        print("\n\033[1;36mHow do I delete my selections?\033[0m")
-        print("=" * 80)
-        print("To delete any selection, simply go to your overall selections and\nchoose the 'Delete Selection' option. You can remove resorts,\nrestaurants, or activities you no longer wish to select.")
-    elif choice == "6":
-        print("\n\033[1;36mHow can I view my reservation and selections?\033[0m")
-        print("=" * 80)
-        print("You can view your reservation and overall selections by selecting\n'Overall Selection' from the menu. This will show all the\nresorts, restaurants, activities, and places you have chosen.")
-    elif choice == "7":
-        print("\n\033[1;36mWhat should I do if I forgot my Tourist ID?\033[0m")
-        print("=" * 80)
-        print("If you forgot your Tourist ID, you can always contact the admin\nto retrieve your ID or check any emails or messages confirming your registration.")
-    elif choice == "8":
-        print("\nReturning to Main Menu...\n")
-        return  # Goes back to the main menu or previous function
-    else:
-        print("\033[1;31mInvalid selection. Please choose a valid question number.\033[0m")
-
-    # Prompt user if they want to check more FAQs
-    more_faq = input("\n\033[1;33m" + " " * 15 + "Would you like to see more FAQs? (y/n): " + "\033[0m").strip().lower()
-    if more_faq == "y":
-        faq()  # Calls the FAQ function again if user wants to see more FAQs
-    else:
-        print("\033[1;32m" + " " * 15 + "Thank you for using the FAQ service! 😊" + "\033[0m")
-        
-def main():
-# Main program
-    while True:
-        choice = welcome_screen()
-        if choice == "1":
-            tourist_id = tourist_menu()
-            while True:
-                print("=" * 80)
-                print("\033[1;33m[1] 🚪 Proceed to Selection\033[0m")
-                print("\033[1;34m[2] ✏️ Edit My Personal Information\033[0m")
-                print("\033[1;32m[3] ↩️ Back to Main Menu\033[0m")
-                sub_choice = input("Enter your choice: ").strip()
-                print("=" * 80)
-            
-                if sub_choice == "1":
-                    category_selection(tourist_id)
-                elif sub_choice == "2":
-                    edit_personal_info(tourist_id)
-                elif sub_choice == "3":
-                    break
-                else:
-                    print("\033[1;31mInvalid choice, please try again. ❌\033[0m")
-    
-        elif choice == "2":
-            login()
-        
-        elif choice == "3":
-            faq()
-        
-        elif choice == "4":
-            print("\033[1;32m" + " " * 20 +"Thank you for using GaleraGate! Goodbye! 👋" + "\033[0m")
-            print("=" * 80)
-            break
-        else:
-            print("\033[1;31mInvalid option. Please choose a valid option. ❌\033[0m")
-            
-if __name__ == "__main__":
-    main()
+import bisect
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from array import array
+from contextlib import contextmanager
+from datetime import date
+
+# Schema migrations
+def index_selections_by_tourist(db): # Databases created before selections had its composite primary key need a tourist_id index
+    if not any(column[1] == "tourist_id" and column[5] == 1 for column in db.execute("PRAGMA table_info(selections)")):
+        db.execute("CREATE INDEX IF NOT EXISTS idx_selections_tourist ON selections (tourist_id)")
+
+# Summary tables for the admin dashboard, kept current by triggers so reads are single-row lookups instead of full scans.
+# Group keys use COALESCE(..., '') because NULLs never collide on a primary key, so they could not be upserted.
+# SUMMARY_SCHEMA is what migration 5 created and must not change; migration 13 replaces daily_arrivals and its triggers.
+SUMMARY_TABLES = ["summary_totals", "nationality_counts", "payment_method_totals", "daily_arrivals"]
+SUMMARY_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS summary_totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS nationality_counts (nationality TEXT PRIMARY KEY, tourists INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS payment_method_totals (payment_method TEXT PRIMARY KEY, total_amount REAL NOT NULL, transactions INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS daily_arrivals (arrival_date TEXT PRIMARY KEY, tourists INTEGER NOT NULL)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS tourists_summary_insert AFTER INSERT ON tourists BEGIN
+        INSERT INTO summary_totals VALUES ('tourists', 1) ON CONFLICT (name) DO UPDATE SET value = value + 1;
+        INSERT INTO nationality_counts VALUES (COALESCE(new.nationality, ''), 1)
+            ON CONFLICT (nationality) DO UPDATE SET tourists = tourists + 1;
+        INSERT INTO daily_arrivals VALUES (COALESCE(new.entry_date, ''), 1)
+            ON CONFLICT (arrival_date) DO UPDATE SET tourists = tourists + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS tourists_summary_delete AFTER DELETE ON tourists BEGIN
+        UPDATE summary_totals SET value = value - 1 WHERE name = 'tourists';
+        UPDATE nationality_counts SET tourists = tourists - 1 WHERE nationality = COALESCE(old.nationality, '');
+        DELETE FROM nationality_counts WHERE nationality = COALESCE(old.nationality, '') AND tourists <= 0;
+        UPDATE daily_arrivals SET tourists = tourists - 1 WHERE arrival_date = COALESCE(old.entry_date, '');
+        DELETE FROM daily_arrivals WHERE arrival_date = COALESCE(old.entry_date, '') AND tourists <= 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS tourists_summary_update AFTER UPDATE OF nationality, entry_date ON tourists
+    WHEN old.nationality IS NOT new.nationality OR old.entry_date IS NOT new.entry_date BEGIN
+        UPDATE nationality_counts SET tourists = tourists - 1 WHERE nationality = COALESCE(old.nationality, '');
+        DELETE FROM nationality_counts WHERE nationality = COALESCE(old.nationality, '') AND tourists <= 0;
+        INSERT INTO nationality_counts VALUES (COALESCE(new.nationality, ''), 1)
+            ON CONFLICT (nationality) DO UPDATE SET tourists = tourists + 1;
+        UPDATE daily_arrivals SET tourists = tourists - 1 WHERE arrival_date = COALESCE(old.entry_date, '');
+        DELETE FROM daily_arrivals WHERE arrival_date = COALESCE(old.entry_date, '') AND tourists <= 0;
+        INSERT INTO daily_arrivals VALUES (COALESCE(new.entry_date, ''), 1)
+            ON CONFLICT (arrival_date) DO UPDATE SET tourists = tourists + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS payments_summary_insert AFTER INSERT ON payment_methods BEGIN
+        INSERT INTO payment_method_totals VALUES (COALESCE(new.payment_method, ''), COALESCE(new.amount_paid, 0), 1)
+            ON CONFLICT (payment_method) DO UPDATE
+            SET total_amount = total_amount + COALESCE(new.amount_paid, 0), transactions = transactions + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS payments_summary_delete AFTER DELETE ON payment_methods BEGIN
+        UPDATE payment_method_totals
+        SET total_amount = total_amount - COALESCE(old.amount_paid, 0), transactions = transactions - 1
+        WHERE payment_method = COALESCE(old.payment_method, '');
+        DELETE FROM payment_method_totals WHERE payment_method = COALESCE(old.payment_method, '') AND transactions <= 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS payments_summary_update AFTER UPDATE OF payment_method, amount_paid ON payment_methods BEGIN
+        UPDATE payment_method_totals
+        SET total_amount = total_amount - COALESCE(old.amount_paid, 0), transactions = transactions - 1
+        WHERE payment_method = COALESCE(old.payment_method, '');
+        DELETE FROM payment_method_totals WHERE payment_method = COALESCE(old.payment_method, '') AND transactions <= 0;
+        INSERT INTO payment_method_totals VALUES (COALESCE(new.payment_method, ''), COALESCE(new.amount_paid, 0), 1)
+            ON CONFLICT (payment_method) DO UPDATE
+            SET total_amount = total_amount + COALESCE(new.amount_paid, 0), transactions = transactions + 1;
+    END
+    ''',
+]
+
+# Migration 13 keys daily_arrivals by day number instead, with NULL for tourists without an entry date, so its triggers
+# update the matching row (arrival_date IS ... matches NULL too) and insert one only when there was none
+ARRIVALS_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS daily_arrivals (arrival_date INTEGER UNIQUE, tourists INTEGER NOT NULL)",
+    '''
+    CREATE TRIGGER IF NOT EXISTS tourists_summary_insert AFTER INSERT ON tourists BEGIN
+        INSERT INTO summary_totals VALUES ('tourists', 1) ON CONFLICT (name) DO UPDATE SET value = value + 1;
+        INSERT INTO nationality_counts VALUES (COALESCE(new.nationality, ''), 1)
+            ON CONFLICT (nationality) DO UPDATE SET tourists = tourists + 1;
+        UPDATE daily_arrivals SET tourists = tourists + 1 WHERE arrival_date IS new.entry_date;
+        INSERT INTO daily_arrivals SELECT new.entry_date, 1
+            WHERE NOT EXISTS (SELECT 1 FROM daily_arrivals WHERE arrival_date IS new.entry_date);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS tourists_summary_delete AFTER DELETE ON tourists BEGIN
+        UPDATE summary_totals SET value = value - 1 WHERE name = 'tourists';
+        UPDATE nationality_counts SET tourists = tourists - 1 WHERE nationality = COALESCE(old.nationality, '');
+        DELETE FROM nationality_counts WHERE nationality = COALESCE(old.nationality, '') AND tourists <= 0;
+        UPDATE daily_arrivals SET tourists = tourists - 1 WHERE arrival_date IS old.entry_date;
+        DELETE FROM daily_arrivals WHERE arrival_date IS old.entry_date AND tourists <= 0;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS tourists_summary_update AFTER UPDATE OF nationality, entry_date ON tourists
+    WHEN old.nationality IS NOT new.nationality OR old.entry_date IS NOT new.entry_date BEGIN
+        UPDATE nationality_counts SET tourists = tourists - 1 WHERE nationality = COALESCE(old.nationality, '');
+        DELETE FROM nationality_counts WHERE nationality = COALESCE(old.nationality, '') AND tourists <= 0;
+        INSERT INTO nationality_counts VALUES (COALESCE(new.nationality, ''), 1)
+            ON CONFLICT (nationality) DO UPDATE SET tourists = tourists + 1;
+        UPDATE daily_arrivals SET tourists = tourists - 1 WHERE arrival_date IS old.entry_date;
+        DELETE FROM daily_arrivals WHERE arrival_date IS old.entry_date AND tourists <= 0;
+        UPDATE daily_arrivals SET tourists = tourists + 1 WHERE arrival_date IS new.entry_date;
+        INSERT INTO daily_arrivals SELECT new.entry_date, 1
+            WHERE NOT EXISTS (SELECT 1 FROM daily_arrivals WHERE arrival_date IS new.entry_date);
+    END
+    ''',
+]
+
+def summary_snapshot(db): # Every summary row, for spotting drift between the triggers and the base tables
+    return {table: set(db.execute(f"SELECT * FROM {table}")) for table in SUMMARY_TABLES}
+
+def rebuild_summaries(db, arrival_key="entry_date"): # Recompute every summary table from the base tables; returns how many rows were wrong or missing
+    # arrival_key is the daily_arrivals key: LEGACY_ARRIVAL_KEY while the table is still as migration 5 created it
+    before = summary_snapshot(db)
+    for table in SUMMARY_TABLES:
+        db.execute(f"DELETE FROM {table}")
+    db.execute("INSERT INTO summary_totals SELECT 'tourists', COUNT(*) FROM tourists")
+    db.execute("INSERT INTO nationality_counts SELECT COALESCE(nationality, ''), COUNT(*) FROM tourists GROUP BY 1")
+    db.execute(f"INSERT INTO daily_arrivals SELECT {arrival_key}, COUNT(*) FROM tourists GROUP BY 1")
+    db.execute('''
+    INSERT INTO payment_method_totals
+    SELECT COALESCE(payment_method, ''), COALESCE(SUM(amount_paid), 0), COUNT(*) FROM payment_methods GROUP BY 1
+    ''')
+    after = summary_snapshot(db)
+    return sum(len(before[table] ^ after[table]) for table in SUMMARY_TABLES) # Stale rows and their corrections
+
+LEGACY_ARRIVAL_KEY = "COALESCE(entry_date, '')" # daily_arrivals key before migration 13
+
+def create_summary_tables(db):
+    for statement in SUMMARY_SCHEMA:
+        db.execute(statement)
+    rebuild_summaries(db, LEGACY_ARRIVAL_KEY) # Seed the summaries from existing data
+
+# Catalog of categories and their options, seeded into the categories/catalog_items tables by migration 8
+DEFAULT_CATALOG = {
+    "Resort": ["Mermaid Resort", "Blue Crystal Beach Resort", "Edgewater Dive & Spa", "Arkipelago Beach Resort", "Steps and Garden Resort"],
+    "Restaurant": ["Atlantis Restaurant", "Aplayang Munti Resto", "Badladz", "Fisherman's Cove", "Jalyn's Resto"],
+    "Activities": ["Snorkeling", "Scuba Diving", "Island Hopping", "Sunset Cruise", "Water Sports"],
+    "Places": ["White Beach", "Sabang Beach", "Tamaraw Falls", "Mangrove Forest", "Coral Garden"]
+}
+CATALOG_TABLES = ["categories", "catalog_items", "catalog_version"]
+
+def create_catalog_tables(db): # Move the catalog into tables and store selections by catalog item ID
+    db.execute("CREATE TABLE categories (category_id INTEGER PRIMARY KEY, name VARCHAR (100) NOT NULL UNIQUE)")
+    db.execute('''
+    CREATE TABLE catalog_items (
+        item_id INTEGER PRIMARY KEY,
+        category_id INTEGER NOT NULL REFERENCES categories(category_id),
+        name VARCHAR (100) NOT NULL,
+        UNIQUE (category_id, name)
+    )
+    ''')
+    # Bumped by triggers on every catalog change so caches in other processes can tell theirs is stale
+    db.execute("CREATE TABLE catalog_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)")
+    db.execute("INSERT INTO catalog_version VALUES (1, 0)")
+    for table in ("categories", "catalog_items"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            db.execute(f"""
+            CREATE TRIGGER {table}_{event.lower()}_version AFTER {event} ON {table} BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END
+            """)
+
+    for category, choices in DEFAULT_CATALOG.items():
+        category_id = db.execute("INSERT INTO categories (name) VALUES (?)", (category,)).lastrowid
+        db.executemany("INSERT INTO catalog_items (category_id, name) VALUES (?, ?)", [(category_id, choice) for choice in choices])
+    # Keep selections of options that are no longer in the default catalog by adding those options to it
+    db.execute("INSERT OR IGNORE INTO categories (name) SELECT DISTINCT category FROM selections WHERE category IS NOT NULL")
+    db.execute('''
+    INSERT OR IGNORE INTO catalog_items (category_id, name)
+    SELECT DISTINCT c.category_id, s.choice FROM selections s JOIN categories c ON c.name = s.category WHERE s.choice IS NOT NULL
+    ''')
+
+    db.execute('''
+    CREATE TABLE selections_by_item (
+        tourist_id INTEGER NOT NULL REFERENCES tourists(tourist_id),
+        item_id INTEGER NOT NULL REFERENCES catalog_items(item_id),
+        PRIMARY KEY (tourist_id, item_id)
+    ) WITHOUT ROWID
+    ''')
+    db.execute('''
+    INSERT OR IGNORE INTO selections_by_item (tourist_id, item_id)
+    SELECT s.tourist_id, i.item_id
+    FROM selections s
+    JOIN categories c ON c.name = s.category
+    JOIN catalog_items i ON i.category_id = c.category_id AND i.name = s.choice
+    ''')
+    db.execute("DROP TABLE selections")
+    db.execute("ALTER TABLE selections_by_item RENAME TO selections")
+
+# Full-text search over tourist names and nationalities. tourist_search is an external-content FTS5 index: it stores
+# only the index and reads the text from tourists, and the triggers below keep it in step with every insert, update
+# and delete. tourist_search_terms exposes the indexed vocabulary, which typo-tolerant search matches against.
+SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tourist_search USING fts5(
+        name, nationality, content = 'tourists', content_rowid = 'tourist_id',
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tourist_search_terms USING fts5vocab(tourist_search, 'row')",
+    """
+    CREATE TRIGGER IF NOT EXISTS tourists_search_insert AFTER INSERT ON tourists BEGIN
+        INSERT INTO tourist_search (rowid, name, nationality) VALUES (new.tourist_id, new.name, new.nationality);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tourists_search_delete AFTER DELETE ON tourists BEGIN
+        INSERT INTO tourist_search (tourist_search, rowid, name, nationality) VALUES ('delete', old.tourist_id, old.name, old.nationality);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tourists_search_update AFTER UPDATE OF name, nationality ON tourists BEGIN
+        INSERT INTO tourist_search (tourist_search, rowid, name, nationality) VALUES ('delete', old.tourist_id, old.name, old.nationality);
+        INSERT INTO tourist_search (rowid, name, nationality) VALUES (new.tourist_id, new.name, new.nationality);
+    END
+    """,
+    "INSERT INTO tourist_search (tourist_search, rank) VALUES ('rank', 'bm25(10.0, 1.0)')", # A name hit outranks a nationality hit
+    "INSERT INTO tourist_search (tourist_search) VALUES ('rebuild')", # Index the tourists that are already there
+    "CREATE INDEX IF NOT EXISTS idx_tourists_contact ON tourists (CAST(contact_number AS TEXT))",
+]
+
+# Change log for incremental exports: triggers record every insert, update and delete on the exported tables, so
+# the kiosk, admin, import and API write paths all feed it without knowing about it. change_id only ever grows
+# (AUTOINCREMENT never reuses an ID, even after pruning), and each export consumer's watermark is the last change_id
+# it has seen. Selections are keyed by (tourist_id, item_id), so item_id is NULL for the other tables.
+CHANGE_LOG_TABLES = {"tourists": ("tourist_id", None), "selections": ("tourist_id", "item_id"),
+                     "payment_methods": ("payment_id", None)} # Table -> (row_id column, item_id column)
+CHANGE_LOG_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        item_id INTEGER,
+        operation TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS export_watermarks (
+        name TEXT PRIMARY KEY,
+        change_id INTEGER NOT NULL,
+        exported_at TEXT NOT NULL
+    )
+    """,
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_changes_{operation} AFTER {operation.upper()} ON {table} BEGIN
+        INSERT INTO change_log (table_name, row_id, item_id, operation)
+        VALUES ('{table}', {ref}.{row_id}, {f"{ref}.{item_id}" if item_id else "NULL"}, '{operation}');
+    END
+    """
+    for table, (row_id, item_id) in CHANGE_LOG_TABLES.items()
+    for operation, ref in (("insert", "new"), ("update", "new"), ("delete", "old"))
+]
+# Keeps change_log bounded whether or not anyone exports: every 10,000th entry trims it to the newest 1,000,000
+# (CHANGE_LOG_RETENTION), whichever process or write path logged it. Consumers left behind get a full export.
+CHANGE_LOG_RETENTION_SCHEMA = [
+    """
+    CREATE TRIGGER IF NOT EXISTS change_log_retention AFTER INSERT ON change_log WHEN new.change_id % 10000 = 0 BEGIN
+        DELETE FROM change_log WHERE change_id <= new.change_id - 1000000;
+    END
+    """,
+]
+
+# Deleting a tourist deletes their selections and payments. The tables were created without ON DELETE CASCADE, which
+# SQLite cannot add to an existing table, so a trigger cascades instead; foreign_keys is on for every connection, so
+# nothing else can point at a missing tourist. Rows orphaned by deletes before this migration are removed first
+# (through the logged, summary-maintaining delete path), and selections gain the item_id index that foreign key
+# checks on catalog deletes need.
+CASCADE_SCHEMA = [
+    "DELETE FROM selections WHERE NOT EXISTS (SELECT 1 FROM tourists t WHERE t.tourist_id = selections.tourist_id)",
+    "DELETE FROM payment_methods WHERE NOT EXISTS (SELECT 1 FROM tourists t WHERE t.tourist_id = payment_methods.tourist_id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS tourists_cascade_delete BEFORE DELETE ON tourists BEGIN
+        DELETE FROM selections WHERE tourist_id = old.tourist_id;
+        DELETE FROM payment_methods WHERE tourist_id = old.tourist_id;
+    END
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_selections_item ON selections (item_id)",
+]
+
+# Typed storage: dates become day numbers (date.toordinal()), amounts integer centavos and contact numbers normalized
+# text. Column affinity differs between databases (the first schemas declared contact_number INTEGER, some files
+# declare dates TEXT), so tourists and payment_methods are rebuilt with typed columns, copied over in batches of
+# TYPED_COPY_BATCH rows, and their indexes and triggers recreated. The copy fires no triggers; rows whose shown value
+# changed (a normalized contact number, or a date or amount that could not be read and is now NULL) are logged to
+# change_log by hand so export consumers pick them up.
+TYPED_COPY_BATCH = 10_000
+TYPED_TABLES = {
+    "tourists": ("tourist_id", """
+        tourist_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR (300) NOT NULL,
+        age INTEGER,
+        sex VARCHAR (10),
+        nationality VARCHAR (100),
+        contact_number TEXT,
+        entry_date INTEGER CHECK (typeof(entry_date) IN ('integer', 'null')),
+        exit_date INTEGER CHECK (typeof(exit_date) IN ('integer', 'null'))
+    """, "tourist_id, IFNULL(name, ''), age, sex, nationality, contact_number, entry_date, exit_date"),
+    "payment_methods": ("payment_id", """
+        payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tourist_id INTEGER REFERENCES tourists(tourist_id),
+        payment_method VARCHAR (100),
+        amount_paid INTEGER CHECK (typeof(amount_paid) IN ('integer', 'null')),
+        payment_date INTEGER CHECK (typeof(payment_date) IN ('integer', 'null'))
+    """, "payment_id, tourist_id, payment_method, amount_paid, payment_date"),
+}
+
+def typed_tourist_row(row): # A tourists row as stored before migration 12 -> (typed row, whether its shown value changed)
+    tourist_id, name, age, sex, nationality, contact, entry, exit_ = row
+    typed = (tourist_id, name, age, sex, nationality, legacy_contact(contact), legacy_day(entry), legacy_day(exit_))
+    shown = (typed[5], iso_day(typed[6]), iso_day(typed[7]))
+    return typed, shown != (contact, entry, exit_)
+
+def typed_payment_row(row):
+    payment_id, tourist_id, method, amount, paid_on = row
+    typed = (payment_id, tourist_id, method, legacy_centavos(amount), legacy_day(paid_on))
+    shown = (None if typed[3] is None else typed[3] / 100, iso_day(typed[4]))
+    return typed, shown != (amount, paid_on)
+
+def store_typed_values(db):
+    db.execute("PRAGMA legacy_alter_table = ON") # Rename the copies into place without re-checking other tables' triggers
+    try:
+        for table, convert in (("payment_methods", typed_payment_row), ("tourists", typed_tourist_row)):
+            rebuild_typed_table(db, table, convert)
+    finally:
+        db.execute("PRAGMA legacy_alter_table = OFF")
+    rebuild_summaries(db, LEGACY_ARRIVAL_KEY) # Arrival dates and payment totals are now keyed and summed in the stored units
+
+def key_arrivals_by_day(db): # daily_arrivals was keyed by text: day numbers sorted as strings, next to a '' row for no date
+    for trigger in ("tourists_summary_insert", "tourists_summary_delete", "tourists_summary_update"):
+        db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    db.execute("DROP TABLE IF EXISTS daily_arrivals")
+    for statement in ARRIVALS_SCHEMA:
+        db.execute(statement)
+    rebuild_summaries(db)
+
+def rebuild_typed_table(db, table, convert):
+    key, columns, source = TYPED_TABLES[table]
+    seq = db.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    dependents = db.execute("SELECT name, sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+                            "AND sql IS NOT NULL ORDER BY type", (table,)).fetchall() # Indexes before triggers
+    db.execute(f"CREATE TABLE {table}_typed ({columns})")
+    last = -1
+    while True:
+        rows = db.execute(f"SELECT {source} FROM {table} WHERE {key} > ? ORDER BY {key} LIMIT ?", (last, TYPED_COPY_BATCH)).fetchall()
+        if not rows:
+            break
+        converted = [convert(row) for row in rows]
+        db.executemany(f"INSERT INTO {table}_typed VALUES ({', '.join('?' * len(rows[0]))})", [typed for typed, _ in converted])
+        db.executemany("INSERT INTO change_log (table_name, row_id, item_id, operation) VALUES (?, ?, NULL, 'update')",
+                       [(table, typed[0]) for typed, changed in converted if changed])
+        last = rows[-1][0]
+    db.execute(f"DROP TABLE {table}")
+    db.execute(f"ALTER TABLE {table}_typed RENAME TO {table}")
+    for name, sql in dependents:
+        if name == "idx_tourists_contact": # Contact numbers are text now, so the index no longer needs the CAST
+            sql = "CREATE INDEX idx_tourists_contact ON tourists (contact_number)"
+        db.execute(sql)
+    if seq is not None: # Keep AUTOINCREMENT from handing out IDs of rows deleted before the rebuild
+        db.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+        db.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, seq[0]))
+
+# Ordered (version, description, step) entries; a step is a list of SQL statements or a function taking the connection.
+# PRAGMA user_version records the last version applied, so existing entries must never change; append new ones instead.
+MIGRATIONS = [
+    (1, "Create tourists, selections and payment_methods tables", [
+        # Create the 'tourists' table to store tourist information
+        '''
+        CREATE TABLE IF NOT EXISTS tourists (
+            tourist_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR (300) NOT NULL,
+            age INTEGER,
+            sex VARCHAR (10),
+            nationality VARCHAR (100),
+            contact_number INTEGER,
+            entry_date DATE,
+            exit_date DATE
+        )
+        ''',
+        # Create the 'selections' table to store tourist selections (e.g., attractions, services)
+        '''
+        CREATE TABLE IF NOT EXISTS selections (
+            tourist_id INTEGER,
+            category VARCHAR (100),
+            choice VARCHAR (100),
+            PRIMARY KEY (tourist_id, category, choice),
+            FOREIGN KEY (tourist_id) REFERENCES tourists(tourist_id)
+        )
+        ''',
+        # Create the 'payment_methods' table to store payment details
+        '''
+        CREATE TABLE IF NOT EXISTS payment_methods (
+            payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tourist_id INTEGER,
+            payment_method VARCHAR (100),
+            amount_paid INT,
+            payment_date DATE,
+            FOREIGN KEY (tourist_id) REFERENCES tourists(tourist_id)
+        )
+        ''',
+    ]),
+    (2, "Index payments by tourist, date and method", [
+        "CREATE INDEX IF NOT EXISTS idx_payments_tourist ON payment_methods (tourist_id)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_date ON payment_methods (payment_date)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_method ON payment_methods (payment_method, amount_paid)",
+    ]),
+    (3, "Index tourists by nationality and stay dates", [
+        "CREATE INDEX IF NOT EXISTS idx_tourists_nationality ON tourists (nationality)",
+        "CREATE INDEX IF NOT EXISTS idx_tourists_entry_date ON tourists (entry_date)",
+        "CREATE INDEX IF NOT EXISTS idx_tourists_exit_date ON tourists (exit_date)",
+    ]),
+    (4, "Index selections by tourist on older databases", index_selections_by_tourist),
+    (5, "Add trigger-maintained dashboard summary tables", create_summary_tables),
+    (6, "Drop the payment method index now that per-method totals come from payment_method_totals", [
+        "DROP INDEX IF EXISTS idx_payments_method",
+    ]),
+    (7, "Cover stay-window scans with an (exit_date, entry_date, nationality) index", [
+        "CREATE INDEX IF NOT EXISTS idx_tourists_stays ON tourists (exit_date, entry_date, nationality)",
+        "DROP INDEX IF EXISTS idx_tourists_exit_date", # A prefix of idx_tourists_stays
+    ]),
+    (8, "Move the attraction catalog into tables and store selections by catalog item ID", create_catalog_tables),
+    (9, "Add a full-text name/nationality search index and a contact number index", SEARCH_SCHEMA),
+    (10, "Log inserts, updates and deletes for incremental exports", CHANGE_LOG_SCHEMA),
+    (11, "Cascade tourist deletes to their selections and payments", CASCADE_SCHEMA),
+    (12, "Store dates as day numbers, amounts as centavos and contact numbers normalized", store_typed_values),
+    (13, "Key daily arrivals by day number, with NULL for tourists without an entry date", key_arrivals_by_day),
+    (14, "Trim the change log to its newest million entries as it grows", CHANGE_LOG_RETENTION_SCHEMA),
+]
+
+def schema_version(db):
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(db): # Apply any pending migrations, each in its own transaction; returns the resulting schema version
+    db.execute("PRAGMA foreign_keys = OFF") # Table rebuilds in older migrations copy rows that predate enforcement
+    try:
+        return apply_migrations(db)
+    finally:
+        db.execute("PRAGMA foreign_keys = ON")
+
+def apply_migrations(db):
+    for version, description, step in MIGRATIONS:
+        if version <= schema_version(db):
+            continue
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if version > schema_version(db): # Another process may have applied it while we waited for the write lock
+                if callable(step):
+                    step(db)
+                else:
+                    for statement in step:
+                        db.execute(statement)
+                db.execute(f"PRAGMA user_version = {version}")
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+    return schema_version(db)
+
+# Database setup
+DB_PATH = os.environ.get("GALERAGATE_DB", "galeragate.db") # Default database file; ":memory:" gives a private throwaway database
+POOL_SIZE = 8 # Most connections open at once; callers beyond this wait for one to be returned
+BUSY_TIMEOUT_MS = 5000 # How long a writer waits for another writer's lock before "database is locked"
+
+def open_connection(path): # A connection set up as the pool's are; the pool opens these, and archiving one of its own
+    # Autocommit mode: reads never hold a transaction open, and writes use explicit BEGIN IMMEDIATE in transaction()
+    db = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+    db.execute("PRAGMA journal_mode = WAL") # Readers see a consistent snapshot and never block the writer (or vice versa)
+    db.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    db.execute("PRAGMA synchronous = NORMAL") # In WAL mode this stays corruption-safe and only fsyncs at checkpoints
+    db.execute("PRAGMA foreign_keys = ON") # Off by default in SQLite, per connection
+    return db
+
+class ConnectionPool: # Bounded pool of SQLite connections shared by kiosk and admin threads
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = 1 if path == ":memory:" else size # Every ":memory:" connection is a separate database, so share just one
+        self.closed = False
+        self._idle = queue.LifoQueue() # Most recently used first, so a warm connection (and its page cache) is reused
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return open_connection(self.path)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if not can_open:
+            return self._idle.get() # Pool exhausted: wait for another thread to release a connection
+        try:
+            return self._connect()
+        except BaseException:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def release(self, db):
+        if db.in_transaction: # Never hand the next caller someone else's half-finished transaction
+            db.rollback()
+        if self.closed:
+            db.close()
+            with self._lock:
+                self._opened -= 1
+        else:
+            self._idle.put(db)
+
+    def close(self): # Close the idle connections; connections still checked out are closed when released
+        self.closed = True
+        while True:
+            try:
+                db = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            db.close()
+            with self._lock:
+                self._opened -= 1
+
+pool = None # Created by init_db() on first use, so importing this module never touches the disk
+_init_lock = threading.Lock()
+
+def init_db(path=None, pool_size=POOL_SIZE): # Open the connection pool and migrate the schema, once per process
+    global pool
+    with _init_lock:
+        if pool is None:
+            new_pool = ConnectionPool(path or DB_PATH, pool_size)
+            db = new_pool.acquire()
+            try:
+                migrate(db) # Create the tables or upgrade an existing database file
+            finally:
+                new_pool.release(db)
+            pool = new_pool
+        elif path and path != pool.path:
+            raise ValueError(f"Database already initialized at {pool.path!r}; call close_db() before switching to {path!r}")
+        return pool
+
+def close_db(): # Close the pool so the next database access (or init_db call) starts fresh
+    global pool
+    stop_writer() # Commit anything still queued for the background writer first
+    stop_replica()
+    with _init_lock:
+        if pool is not None:
+            pool.close()
+            pool = None
+    invalidate_catalog() # Cached catalog IDs belong to the database that was just closed
+    invalidate_snapshot()
+    profiles.clear()
+
+@contextmanager
+def connection(): # Borrow a pooled connection for one operation; every execute() on it gets its own cursor
+    db_pool = pool or init_db()
+    db = db_pool.acquire()
+    traced = TracedConnection(db) if tracer.enabled else None
+    try:
+        yield traced or db
+    finally:
+        if traced:
+            traced.finish()
+        db_pool.release(db)
+
+@contextmanager
+def transaction(): # Borrow a connection inside a write transaction that commits on success and rolls back on error
+    with connection() as db:
+        db.execute("BEGIN IMMEDIATE") # Take the write lock up front so the busy timeout applies instead of a deadlock error
+        try:
+            yield db
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+# Query tracing: while enabled, connection() hands out a thin wrapper that times every statement (execute plus the
+# fetches that stream its rows) into per-query and per-flow histograms, and keeps a log of slow statements with their
+# query plans. While disabled, connection() returns the raw sqlite3 connection, so the only cost is one flag check.
+TRACE_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000) # Histogram upper bounds
+SLOW_QUERY_MS = 100 # Statements at least this slow go to the slow-query log
+SLOW_LOG_SIZE = 100 # Most recent slow statements kept
+
+class LatencyHistogram: # Fixed-bucket latency histogram; percentiles are reported as the upper bound of their bucket
+    def __init__(self):
+        self.buckets = [0] * (len(TRACE_BUCKETS_MS) + 1) # The last bucket counts everything above the largest bound
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(TRACE_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(TRACE_BUCKETS_MS, self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "count": self.count, "total_ms": self.total_ms, "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50), "p99_ms": self.percentile(99), "max_ms": self.max_ms,
+            "buckets": {f"<={bound}": count for bound, count in zip(TRACE_BUCKETS_MS, self.buckets)} | {"more": self.buckets[-1]},
+        }
+
+class QueryTracer: # Process-wide statement and flow statistics; see enable_tracing()
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = SLOW_QUERY_MS
+        self.queries = {} # Normalized SQL -> LatencyHistogram
+        self.flows = {} # Flow name -> LatencyHistogram of the database time spent in the flow
+        self.flow_statements = {} # Flow name -> statements issued
+        self.slow_log = deque(maxlen=SLOW_LOG_SIZE)
+        self._keys = {} # Raw SQL -> normalized SQL, so each distinct statement is normalized once
+        self._lock = threading.Lock()
+        self._local = threading.local() # .flows: this thread's active flows, outermost first
+
+    def key(self, sql): # Collapse whitespace and IN (?, ?, ...) lists so batches of any size share one entry
+        key = self._keys.get(sql)
+        if key is None:
+            import re
+            key = self._keys[sql] = re.sub(r"IN \(\?(?:\s*,\s*\?)*\)", "IN (?, ...)", " ".join(sql.split()))
+        return key
+
+    def record(self, db, sql, params, seconds): # Account one finished statement to its query and to the active flows
+        ms = seconds * 1000
+        key = self.key(sql)
+        flows = getattr(self._local, "flows", ())
+        for flow in flows:
+            flow[1] += ms
+            flow[2] += 1
+        with self._lock:
+            self.queries.setdefault(key, LatencyHistogram()).add(ms)
+        if ms >= self.slow_ms:
+            try:
+                plan = [row[3] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", params if isinstance(params, (tuple, list, dict)) else ())]
+            except sqlite3.Error as e: # E.g. BEGIN/COMMIT, or executemany parameters
+                plan = [f"(no plan: {e})"]
+            self.slow_log.append({"at": time.strftime("%Y-%m-%d %H:%M:%S"), "ms": ms, "sql": key,
+                                  "params": repr(params)[:200], "flow": flows[-1][0] if flows else None, "plan": plan})
+
+    def reset(self):
+        with self._lock:
+            self.queries.clear()
+            self.flows.clear()
+            self.flow_statements.clear()
+            self.slow_log.clear()
+
+    def snapshot(self): # Everything recorded so far, as plain data
+        with self._lock:
+            return {
+                "enabled": self.enabled, "slow_ms": self.slow_ms,
+                "queries": {key: histogram.as_dict() for key, histogram in self.queries.items()},
+                "flows": {name: dict(histogram.as_dict(), statements=self.flow_statements[name])
+                          for name, histogram in self.flows.items()},
+                "slow_queries": list(self.slow_log),
+            }
+
+tracer = QueryTracer()
+
+def enable_tracing(slow_ms=None, slow_log_size=None):
+    if slow_ms is not None:
+        tracer.slow_ms = slow_ms
+    if slow_log_size is not None:
+        tracer.slow_log = deque(tracer.slow_log, maxlen=slow_log_size)
+    tracer.enabled = True
+
+def disable_tracing():
+    tracer.enabled = False
+
+@contextmanager
+def traced_flow(name): # Attribute the statements issued inside the block (on this thread) to a named flow
+    if not tracer.enabled:
+        yield
+        return
+    flows = getattr(tracer._local, "flows", None)
+    if flows is None:
+        flows = tracer._local.flows = []
+    flow = [name, 0.0, 0] # name, database ms, statements
+    flows.append(flow)
+    try:
+        yield
+    finally:
+        flows.remove(flow)
+        with tracer._lock:
+            tracer.flows.setdefault(name, LatencyHistogram()).add(flow[1])
+            tracer.flow_statements[name] = tracer.flow_statements.get(name, 0) + flow[2]
+
+class TracedCursor: # Times a statement's execute and every fetch from it; recorded once the rows run out or the connection is returned
+    def __init__(self, db, cursor, sql, params, seconds):
+        self._db, self._cursor, self._sql, self._params, self._seconds = db, cursor, sql, params, seconds
+        self._done = False
+
+    def finish(self):
+        if not self._done:
+            self._done = True
+            tracer.record(self._db, self._sql, self._params, self._seconds)
+
+    def _fetch(self, fetch, *args):
+        begin = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            self._seconds += time.perf_counter() - begin
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return self._fetch(self._cursor.__next__)
+        except StopIteration:
+            self.finish()
+            raise
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        if row is None:
+            self.finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = size or self._cursor.arraysize
+        rows = self._fetch(self._cursor.fetchmany, size)
+        if len(rows) < size:
+            self.finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(self._cursor.fetchall)
+        self.finish()
+        return rows
+
+    def __getattr__(self, name): # lastrowid, rowcount, description, ...
+        return getattr(self._cursor, name)
+
+class TracedConnection: # Wraps a pooled connection for the length of one connection() block
+    def __init__(self, db):
+        self._db = db
+        self._open = [] # Cursors that may still have rows to fetch
+
+    def execute(self, sql, params=()):
+        begin = time.perf_counter()
+        cursor = self._db.execute(sql, params)
+        traced = TracedCursor(self._db, cursor, sql, params, time.perf_counter() - begin)
+        if cursor.description is None: # No result rows (INSERT, UPDATE, BEGIN, ...): already complete
+            traced.finish()
+        else:
+            self._open.append(traced)
+        return traced
+
+    def executemany(self, sql, seq_of_params):
+        begin = time.perf_counter()
+        cursor = self._db.executemany(sql, seq_of_params)
+        tracer.record(self._db, sql, None, time.perf_counter() - begin)
+        return cursor
+
+    def commit(self):
+        begin = time.perf_counter()
+        self._db.commit()
+        tracer.record(self._db, "COMMIT", None, time.perf_counter() - begin)
+
+    def rollback(self):
+        begin = time.perf_counter()
+        self._db.rollback()
+        tracer.record(self._db, "ROLLBACK", None, time.perf_counter() - begin)
+
+    def finish(self): # Record statements whose rows were never fully fetched
+        for cursor in self._open:
+            cursor.finish()
+        self._open.clear()
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+def dump_trace_stats(path): # Write the tracer's statistics and slow-query log to a JSON file
+    import json
+    with open(path, "w", encoding="utf-8") as f:
+        stats = dict(tracer.snapshot(), profile_cache=profiles.stats())
+        if writer is not None:
+            stats["group_commit"] = writer.stats()
+        if replica is not None:
+            stats["report_replica"] = replica.stats()
+        json.dump(stats, f, indent=2, ensure_ascii=False)
+
+PAYMENT_METHODS = {"1": "Credit Card", "2": "Cash", "3": "PayPal"}
+
+# Typed storage (migration 12): dates are stored as day numbers (date.toordinal()), amounts as integer centavos and
+# contact numbers normalized by normalize_contact(). Values are converted once on the way in; queries filter, sort
+# and index the stored values, and display_value() turns them back into YYYY-MM-DD text and pesos in what they return.
+DAY_COLUMNS = {"entry_date", "exit_date", "payment_date", "arrival_date"}
+CENTAVO_COLUMNS = {"amount_paid", "total_amount"}
+DAY_ZERO_JULIAN = 1721424.5 # julianday() of day number 0
+DEFAULT_COUNTRY_CODE = "63" # Contact numbers typed without a country code are Philippine numbers
+
+def display_value(column): # A stored column as a select-list entry in the form the app shows: dates as text, amounts in pesos
+    name = column.rsplit(".", 1)[-1]
+    if name in DAY_COLUMNS:
+        return f"date({column} + {DAY_ZERO_JULIAN}) AS {name}"
+    if name in CENTAVO_COLUMNS:
+        return f"{column} / 100.0 AS {name}"
+    return column
+
+def day_number(value, field="date"): # A YYYY-MM-DD date as its stored day number; None stays None
+    return None if value is None else date.fromisoformat(parse_date(value, field)).toordinal()
+
+def iso_day(day): # A stored day number as YYYY-MM-DD text
+    return None if day is None else date.fromordinal(day).isoformat()
+
+def centavos(amount): # Pesos as stored integer centavos
+    return None if amount is None else round(float(amount) * 100)
+
+def normalize_contact(value): # "0917 123 4567", "+63-917-123-4567" and "639171234567" are all stored as "+639171234567"
+    text = str(value or "").strip()
+    if not text:
+        return None
+    number = text.translate(str.maketrans("", "", " -.()"))
+    digits = number[1:] if number.startswith("+") else number
+    if not (digits.isascii() and digits.isdigit() and 7 <= len(digits) <= 15):
+        raise ValueError(f"contact_number must be a phone number, got {value!r}")
+    if number.startswith("+"):
+        return number
+    if digits.startswith("00"): # International call prefix
+        return "+" + digits[2:]
+    if digits.startswith("0"): # National trunk prefix
+        return "+" + DEFAULT_COUNTRY_CODE + digits[1:]
+    if digits.startswith(DEFAULT_COUNTRY_CODE) and len(digits) == 12:
+        return "+" + digits
+    if len(digits) == 10 and digits.startswith("9"): # A mobile number that lost its leading 0 to INTEGER affinity
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    return digits # Too short to tell which country it is in: kept as typed
+
+def contact_prefixes(text): # Stored-form prefixes a partly typed contact number can match
+    number = text.translate(str.maketrans("", "", " -.()"))
+    digits = number.lstrip("+")
+    if number.startswith("+"):
+        normalized = number
+    elif digits.startswith("00"):
+        normalized = "+" + digits[2:]
+    elif digits.startswith("0"):
+        normalized = "+" + DEFAULT_COUNTRY_CODE + digits[1:]
+    elif digits.startswith(DEFAULT_COUNTRY_CODE):
+        normalized = "+" + digits
+    else:
+        normalized = "+" + DEFAULT_COUNTRY_CODE + digits
+    return normalized, digits # The second matches numbers too short to normalize
+
+def stored_tourist(tourist): # (name, age, sex, nationality, contact, entry date, exit date) as stored
+    name, age, sex, nationality, contact, entry_date, exit_date = tourist
+    return (name, age, sex, nationality, normalize_contact(contact),
+            day_number(entry_date, "entry_date"), day_number(exit_date, "exit_date"))
+
+def stored_payment(payment): # (method, amount in pesos, date) as stored
+    payment_method, amount_paid, payment_date = payment
+    return payment_method, centavos(amount_paid), day_number(payment_date, "payment_date")
+
+def legacy_day(value): # A date as written before migration 12 (whatever was typed), or None if it cannot be read
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10].replace("/", "-")).toordinal()
+    except ValueError:
+        return None
+
+def legacy_centavos(value):
+    try:
+        return None if value is None else centavos(value)
+    except ValueError:
+        return None
+
+def legacy_contact(value):
+    try:
+        return normalize_contact(value)
+    except ValueError:
+        return str(value).strip() # Kept as typed rather than lost
+
+# Queries issued by the app, kept in one place so check_query_plans() explains exactly what the app runs
+TOURIST_BY_ID_SQL = "SELECT * FROM tourists WHERE tourist_id = ?"
+UPDATE_TOURIST_SQL = '''
+UPDATE tourists
+SET name = ?, age = ?, sex = ?, nationality = ?, contact_number = ?, entry_date = ?, exit_date = ?
+WHERE tourist_id = ?
+'''
+DELETE_TOURIST_SQL = "DELETE FROM tourists WHERE tourist_id = ?"
+SELECTIONS_BY_TOURIST_SQL = "SELECT item_id FROM selections WHERE tourist_id = ?"
+INSERT_TOURIST_SQL = """
+INSERT INTO tourists (name, age, sex, nationality, contact_number, entry_date, exit_date)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_PAYMENT_SQL = "INSERT INTO payment_methods (tourist_id, payment_method, amount_paid, payment_date) VALUES (?, ?, ?, ?)"
+INSERT_SELECTION_SQL = "INSERT OR IGNORE INTO selections (tourist_id, item_id) VALUES (?, ?)"
+DELETE_SELECTION_SQL = "DELETE FROM selections WHERE tourist_id = ? AND item_id = ?"
+CATALOG_SQL = """
+SELECT categories.name, catalog_items.item_id, catalog_items.name
+FROM catalog_items JOIN categories USING (category_id)
+ORDER BY categories.category_id, catalog_items.item_id
+"""
+CATALOG_VERSION_SQL = "SELECT version FROM catalog_version WHERE id = 1"
+CATALOG_ITEM_SQL = "SELECT 1 FROM catalog_items WHERE item_id = ?"
+# Receipts: the tourist, their selections (as catalog item IDs) and a payment, in one row per receipt
+RECEIPT_COLUMNS = f"""
+t.tourist_id, t.name, t.age, t.sex, t.nationality, t.contact_number, {display_value("t.entry_date")}, {display_value("t.exit_date")},
+(SELECT GROUP_CONCAT(s.item_id) FROM selections s WHERE s.tourist_id = t.tourist_id) AS item_ids,
+pm.payment_id, pm.payment_method, {display_value("pm.amount_paid")}, {display_value("pm.payment_date")}
+"""
+def receipts_by_id_sql(count): # Receipts for `count` tourist IDs, each with the tourist's latest payment (if any)
+    return f"""
+    SELECT {RECEIPT_COLUMNS}
+    FROM tourists t
+    LEFT JOIN payment_methods pm
+        ON pm.payment_id = (SELECT MAX(payment_id) FROM payment_methods WHERE tourist_id = t.tourist_id)
+    WHERE t.tourist_id IN ({", ".join("?" * count)})
+    ORDER BY t.tourist_id
+    """
+# One receipt per payment made in a date window, streamed in payment order straight off idx_payments_date
+RECEIPTS_BY_PAYMENT_DATE_SQL = f"""
+SELECT {RECEIPT_COLUMNS}
+FROM payment_methods pm
+CROSS JOIN tourists t ON t.tourist_id = pm.tourist_id
+WHERE pm.payment_date BETWEEN ? AND ?
+ORDER BY pm.payment_date, pm.payment_id
+"""
+# Tourist search: ranked full-text matches on name/nationality, and contact number prefixes through idx_tourists_contact
+SEARCH_COLUMNS = f"t.tourist_id, t.name, t.nationality, t.contact_number, {display_value('t.entry_date')}, {display_value('t.exit_date')}"
+SEARCH_BY_NAME_SQL = f"""
+SELECT {SEARCH_COLUMNS}
+FROM tourist_search
+JOIN tourists t ON t.tourist_id = tourist_search.rowid
+WHERE tourist_search MATCH ?
+ORDER BY rank
+LIMIT ?
+"""
+# Ranking sorts every match, so words shared by a large share of tourists (a nationality) list the newest matches
+# instead, straight off the index in rowid order
+SEARCH_BY_NAME_NEWEST_SQL = f"""
+SELECT {SEARCH_COLUMNS}
+FROM tourist_search
+JOIN tourists t ON t.tourist_id = tourist_search.rowid
+WHERE tourist_search MATCH ?
+ORDER BY tourist_search.rowid DESC
+LIMIT ?
+"""
+# Two prefix ranges over idx_tourists_contact: the typed prefix normalized, and as typed (see contact_prefixes())
+SEARCH_BY_CONTACT_SQL = f"""
+SELECT {SEARCH_COLUMNS}
+FROM tourists t
+WHERE (t.contact_number >= ? AND t.contact_number < ?)
+   OR (t.contact_number >= ? AND t.contact_number < ?)
+LIMIT ?
+"""
+SEARCH_TERMS_SQL = "SELECT term, doc FROM tourist_search_terms WHERE term >= ? AND term < ?"
+SEARCH_TERM_DOCS_SQL = "SELECT TOTAL(doc) FROM tourist_search_terms WHERE term >= ? AND term < ?"
+# Change-data export watermarks; the change log is pruned up to the oldest one, which every consumer has already seen,
+# and a trigger (CHANGE_LOG_RETENTION_SCHEMA), archive and compact trim it to the newest CHANGE_LOG_RETENTION entries
+WATERMARK_SQL = "SELECT change_id FROM export_watermarks WHERE name = ?"
+SET_WATERMARK_SQL = """
+INSERT INTO export_watermarks (name, change_id, exported_at) VALUES (?, ?, datetime('now'))
+ON CONFLICT (name) DO UPDATE SET change_id = excluded.change_id, exported_at = excluded.exported_at
+"""
+PRUNE_CHANGE_LOG_SQL = "DELETE FROM change_log WHERE change_id <= (SELECT MIN(change_id) FROM export_watermarks)"
+TRIM_CHANGE_LOG_SQL = "DELETE FROM change_log WHERE change_id <= (SELECT MAX(change_id) FROM change_log) - ?"
+# Tourists whose profile (details, selections or payments) changed in a change_id window
+CHANGED_TOURISTS_SQL = """
+SELECT DISTINCT CASE WHEN c.table_name = 'payment_methods' THEN p.tourist_id ELSE c.row_id END
+FROM change_log AS c
+LEFT JOIN payment_methods AS p ON c.table_name = 'payment_methods' AND p.payment_id = c.row_id
+WHERE c.change_id > ? AND c.change_id <= ?
+"""
+# Archival: departed tourists, oldest stay first straight off idx_tourists_stays, then copies of their rows for a batch
+# collected in temp.archive_batch
+ARCHIVE_CANDIDATES_SQL = "SELECT tourist_id FROM tourists WHERE exit_date < ? ORDER BY exit_date LIMIT ?"
+ARCHIVE_TOURISTS_SQL = f"""
+INSERT INTO archive.tourists (tourist_id, name, age, sex, nationality, contact_number, entry_date, exit_date, archived_at)
+SELECT t.tourist_id, t.name, t.age, t.sex, t.nationality, t.contact_number, {display_value("t.entry_date")}, {display_value("t.exit_date")}, ?
+FROM temp.archive_batch AS b JOIN tourists AS t ON t.tourist_id = b.tourist_id
+"""
+ARCHIVE_IDS_SQL = """
+UPDATE temp.archive_batch SET archive_id = (
+    SELECT a.archive_id FROM archive.tourists AS a WHERE a.tourist_id = archive_batch.tourist_id AND a.archive_id >= ?
+)
+"""
+ARCHIVE_SELECTIONS_SQL = """
+INSERT INTO archive.selections (archive_id, item_id, category, choice)
+SELECT b.archive_id, s.item_id, c.name, i.name
+FROM temp.archive_batch AS b
+JOIN selections AS s ON s.tourist_id = b.tourist_id
+LEFT JOIN catalog_items AS i ON i.item_id = s.item_id
+LEFT JOIN categories AS c ON c.category_id = i.category_id
+"""
+# Drops batch tourists already in the archive (same tourist ID, name and stay): a run stopped between a batch's copy
+# and its delete left them in both databases, and deleting them is all that is left to do
+ARCHIVE_SKIP_COPIED_SQL = f"""
+DELETE FROM temp.archive_batch WHERE EXISTS (
+    SELECT 1 FROM tourists AS t JOIN archive.tourists AS a ON a.tourist_id = t.tourist_id
+    WHERE t.tourist_id = archive_batch.tourist_id AND a.name = t.name
+    AND a.entry_date IS date(t.entry_date + {DAY_ZERO_JULIAN}) AND a.exit_date IS date(t.exit_date + {DAY_ZERO_JULIAN})
+)
+"""
+ARCHIVE_DELETE_SQL = "DELETE FROM tourists WHERE tourist_id IN (SELECT value FROM json_each(?))" # A batch's IDs as a JSON array
+ARCHIVE_PAYMENTS_SQL = f"""
+INSERT INTO archive.payment_methods (archive_id, payment_id, payment_method, amount_paid, payment_date)
+SELECT b.archive_id, p.payment_id, p.payment_method, {display_value("p.amount_paid")}, {display_value("p.payment_date")}
+FROM temp.archive_batch AS b JOIN payment_methods AS p ON p.tourist_id = b.tourist_id
+"""
+COUNT_TOURISTS_SQL = "SELECT value AS total_tourists FROM summary_totals WHERE name = 'tourists';"
+# Per-method totals are a primary key lookup in payment_method_totals, and the CROSS JOINs pin the join order,
+# so rows stream straight off idx_payments_date without a temp B-tree sort of every payment
+PAYMENT_REPORT_SQL = f"""
+SELECT
+    pm.payment_id,
+    t.name,
+    {display_value("pm.amount_paid")},
+    pm.payment_method,
+    {display_value("pm.payment_date")},
+    {display_value("totals.total_amount")},
+    totals.transactions
+FROM payment_methods pm
+CROSS JOIN tourists t ON pm.tourist_id = t.tourist_id
+CROSS JOIN payment_method_totals totals ON totals.payment_method = pm.payment_method
+ORDER BY pm.payment_date DESC;
+"""
+DASHBOARD_NATIONALITIES_SQL = "SELECT nationality, tourists FROM nationality_counts ORDER BY tourists DESC LIMIT ?"
+DASHBOARD_PAYMENTS_SQL = f"""
+SELECT payment_method, {display_value("total_amount")}, transactions FROM payment_method_totals ORDER BY payment_method_totals.total_amount DESC
+"""
+# The latest days straight off daily_arrivals' key index; tourists without an entry date (the NULL row) are left out
+DASHBOARD_ARRIVALS_SQL = f"""
+SELECT {display_value("arrival_date")}, tourists FROM daily_arrivals
+WHERE daily_arrivals.arrival_date IS NOT NULL ORDER BY daily_arrivals.arrival_date DESC LIMIT ?
+"""
+# Stays overlapping a window, with dates as stored day numbers; the last condition drops backwards stays
+STAYS_IN_WINDOW_SQL = """
+SELECT entry_date AS entry_day, exit_date AS exit_day, nationality
+FROM tourists
+WHERE entry_date <= ? AND exit_date >= ? AND exit_date >= entry_date
+"""
+
+# Functions
+def welcome_screen():
+    import time  # Import the time module to determine the current time for the greeting
+    current_hour = time.localtime().tm_hour # Get the current hour of the day
+    if 5 <= current_hour < 12:
+        greeting = "Good Morning"
+    elif 12 <= current_hour < 18:
+        greeting = "Good Afternoon"
+    else:
+        greeting = "Good Evening"
+        
+
+    # Display the welcome menu
+    print("\n" + "=" * 80)
+    print("\033[1;35m" + f" " * 20 + f"✨ {greeting}! Welcome to GaleraGate ✨" + "\033[0m")
+    print("\033[1;36m" + " " * 20 + "Your Gateway to Puerto Galera's Paradise!" + "\033[0m")
+    print("=" * 80)
+    
+    print("\033[1;37m"+ " " * 20 + "Please choose an option to proceed:\033[0m")
+    print("\033[1;33m[1] 🏖 Tourist - Explore attractions, make reservations, and more.\033[0m")
+    print("\033[1;35m[2] 🛠 Admin - Manage tourist data and view reports.\033[0m")
+    print("\033[1;36m[3] 💬 FAQ's - Learn how to use the system and find answers.\033[0m")
+    print("\033[1;31m[4] ❌ Exit - Close the application.\033[0m")
+    
+    print("-" * 80)
+    valid_choices = {'1', '2', '3', '4'} # Validate user input
+    choice = input("\033[1;37mEnter your choice: \033[0m").strip().upper()
+    
+    while choice not in valid_choices: # Check if the input is valid; if not, prompt the user to try again
+        print("\033[1;31mInvalid choice. Please try again.\033[0m")
+        choice = input("\033[1;37mEnter your choice: \033[0m").strip().upper()
+    
+    print("=" * 80)
+    return choice
+
+def input_checked(prompt, check, current=None, can_keep=False): # Ask until check() accepts the answer; returns what check() returns
+    while True:
+        text = input(prompt).strip()
+        if not text and can_keep: # Enter keeps the current value as it is, even one stored before it was validated
+            return current
+        try:
+            return check(text)
+        except ValueError as e:
+            print(f"\033[1;31m{e}. Please try again.\033[0m")
+
+def tourist_menu():
+    print("\033[1;32m" + " " * 25 + "🌴 Welcome, dear Tourist! 🌴" + "\033[0m")
+    print("\033[1;36m" + " " * 10 + "Get ready to immerse yourself in the beauty of Puerto Galera. \033[0m")
+    print("=" * 80)
+    
+    print("\033[1;33m" + "Please provide your personal information below to proceed." + "\033[0m")
+    print("-" * 80)
+    
+    name = input("👤 Name: ").strip()
+   # Age input validation
+    while True:
+        try:
+            age = int(input("🎂 Age: ").strip())
+            if age <= 0:
+                print("\033[1;31mAge must be a positive number. Please enter a valid age.\033[0m")
+                continue
+            break
+        except ValueError as e: # Handle case where input is not a valid number
+            print(f"\033[1;31mInvalid input for age. Please enter a valid number. \n{e}\033[0m")
+    sex = input("⚤ Sex (Male/Female): ").strip()
+    nationality = input("🌍 Nationality: ").strip()
+    contact = input_checked("📞 Contact Number: ", normalize_contact)
+    entry_date = input_checked("📅 Entry Date (YYYY-MM-DD): ", lambda text: parse_date(text, "Entry date"))
+    exit_date = input_checked("📅 Exit Date (YYYY-MM-DD): ", lambda text: parse_date(text, "Exit date"))
+    tourist_id = None
+    try:  # Insert the tourist data into the database and get the inserted tourist's ID
+        tourist_id = commit_write(insert_tourist, (name, age, sex, nationality, contact, entry_date, exit_date))
+    except sqlite3.Error as e:   # Handle any SQLite errors
+        print(f"Error occurred: {e}")
+    
+    if tourist_id is not None:
+        print("\n\033[1;32m" + f"🎉 Your Tourist ID is: {str(tourist_id).zfill(4)} 🎉" + "\033[0m")
+    print("=" * 80)
+    
+    return tourist_id
+
+def edit_personal_info(tourist_id):
+    print("\n" + "=" * 80)
+    print("\033[1;34m" + "Edit Your Personal Information".center(80) + "\033[0m")
+    print("=" * 80)
+    
+    # Retrieve the tourist's current information (its first columns are those of the tourists table)
+    tourist = fetch_profile(tourist_id)
+    
+    if tourist:
+        print("\033[1;32m" + "Current Information".center(80) + "\033[0m")
+        print("-" * 80)
+        print(f"\033[1mTourist ID   : {tourist_id:04}\033[0m")
+        print(f"Name         : {tourist[1]}")
+        print(f"Age          : {tourist[2]}")
+        print(f"Sex          : {tourist[3]}")
+        print(f"Nationality  : {tourist[4]}")
+        print(f"Contact No.  : {tourist[5]}")
+        print(f"Entry Date   : {tourist[6]}")
+        print(f"Exit Date    : {tourist[7]}")
+        print("-" * 80)
+        
+        # Prompt the user to enter new details or press Enter to keep the current values
+        print("\n\033[1;33m" + "Enter new details or press Enter to keep the current value:".center(80) + "\033[0m")
+        
+        name = input(f"Name [{tourist[1]}]: ") or tourist[1]
+        age = input(f"Age [{tourist[2]}]: ")
+        age = int(age) if age.isdigit() else tourist[2]
+        sex = input(f"Sex [{tourist[3]}]: ") or tourist[3]
+        nationality = input(f"Nationality [{tourist[4]}]: ") or tourist[4]
+        contact = input_checked(f"Contact Number [{tourist[5]}]: ", normalize_contact, tourist[5], can_keep=True)
+        entry_date = input_checked(f"Entry Date [{tourist[6]}]: ", lambda text: parse_date(text, "Entry date"), tourist[6], can_keep=True)
+        exit_date = input_checked(f"Exit Date [{tourist[7]}]: ", lambda text: parse_date(text, "Exit date"), tourist[7], can_keep=True)
+        
+        print("\n\033[1;36mProcessing...\033[0m")
+        print("=" * 80)
+        
+        # Update the tourist's information in the database
+        # A new contact number comes back normalized and a kept one is written back as stored, so it is not re-checked
+        values = (name, age, sex, nationality, contact, day_number(entry_date, "entry_date"), day_number(exit_date, "exit_date"))
+        commit_write(lambda db: db.execute(UPDATE_TOURIST_SQL, values + (tourist_id,)), tourist_id=tourist_id)
+        
+        print("\033[1;32mInformation updated successfully!\033[0m")
+    else:
+        print("\033[1;31mTourist not found. Please try again.\033[0m")
+    print("=" * 80)
+
+# Attraction catalog
+CATALOG_RECHECK_SECONDS = 5 # How often the cached catalog checks for changes made by other processes
+
+class CatalogIndex: # In-memory copy of the catalog with O(1) lookups by item ID and by (category, name)
+    def __init__(self, rows, version):
+        self.version = version
+        self.categories = {} # Category name -> item IDs in display order (dicts keep the categories in order too)
+        self.items = {} # Item ID -> (category, name, position within its category, starting at 1)
+        self.ids = {} # (category, name) -> item ID
+        for category, item_id, name in rows:
+            options = self.categories.setdefault(category, [])
+            options.append(item_id)
+            self.items[item_id] = (category, name, len(options))
+            self.ids[(category, name)] = item_id
+
+    def label(self, item_id): # "Category: Name" for display
+        category, name, _ = self.items[item_id]
+        return f"{category}: {name}"
+
+_catalog = None
+_catalog_checked = 0.0
+_catalog_lock = threading.Lock()
+
+def get_catalog(): # The cached catalog index, reloaded only after the catalog has changed
+    global _catalog, _catalog_checked
+    with _catalog_lock:
+        now = time.monotonic()
+        if _catalog is None or now - _catalog_checked >= CATALOG_RECHECK_SECONDS:
+            with connection() as db:
+                version = db.execute(CATALOG_VERSION_SQL).fetchone()[0]
+                if _catalog is None or _catalog.version != version:
+                    _catalog = CatalogIndex(db.execute(CATALOG_SQL), version)
+            _catalog_checked = now
+        return _catalog
+
+def invalidate_catalog(): # Drop the cached index; the next get_catalog() reloads it
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+def add_catalog_item(category, name): # Add an option (and its category if new); returns the new item ID
+    with transaction() as db:
+        db.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category,))
+        category_id = db.execute("SELECT category_id FROM categories WHERE name = ?", (category,)).fetchone()[0]
+        item_id = db.execute("INSERT INTO catalog_items (category_id, name) VALUES (?, ?)", (category_id, name)).lastrowid
+    invalidate_catalog()
+    return item_id
+
+def remove_catalog_item(item_id): # Remove an option nobody has selected; returns False if it is still in use
+    with transaction() as db:
+        if db.execute("SELECT 1 FROM selections WHERE item_id = ? LIMIT 1", (item_id,)).fetchone():
+            return False
+        db.execute("DELETE FROM catalog_items WHERE item_id = ?", (item_id,))
+    invalidate_catalog()
+    return True
+
+def catalog_menu():
+    catalog = get_catalog()
+    print("\033[1;36m" + " " * 28 + "🗂️ Attraction Catalog\033[0m")
+    print("=" * 80)
+    for category, item_ids in catalog.categories.items():
+        print(f"\033[1;33m{category}\033[0m")
+        for item_id in item_ids:
+            print(f"  [{item_id}] {catalog.items[item_id][1]}")
+    print("-" * 80)
+    print("\033[1;32m[1] Add an option\033[0m")
+    print("\033[1;31m[2] Remove an option\033[0m")
+    print("\033[1;34m[3] Back\033[0m")
+    option = input("Enter your choice: ").strip()
+    if option == "1":
+        category = input("Category (existing or new): ").strip()
+        name = input("Option name: ").strip()
+        if not category or not name:
+            print("\033[1;31mCategory and option name are required.\033[0m")
+            return
+        try:
+            add_catalog_item(category, name)
+        except sqlite3.IntegrityError:
+            print(f"\033[1;31m{name} is already listed under {category}.\033[0m")
+            return
+        print(f"\033[1;32mAdded: {name} under {category} ✅\033[0m")
+    elif option == "2":
+        item_id = input("Option ID to remove: ").strip()
+        if not item_id.isdigit() or int(item_id) not in catalog.items:
+            print("\033[1;31mUnknown option ID.\033[0m")
+        elif remove_catalog_item(int(item_id)):
+            print("\033[1;32mOption removed. ✅\033[0m")
+        else:
+            print("\033[1;31mThat option is part of existing reservations and cannot be removed.\033[0m")
+    print("=" * 80)
+
+# Write-behind: with --write-behind (or GALERAGATE_WRITE_BEHIND=1), registrations, reservations, edits and deletes go to
+# one background writer thread instead of each caller taking the write lock and committing on its own. The writer
+# takes whatever has queued up while its last commit ran (up to GROUP_COMMIT_MAX_WRITES, waiting up to
+# GROUP_COMMIT_WAIT_MS for more) and commits it as one transaction, so many concurrent kiosks share one
+# BEGIN IMMEDIATE ... COMMIT. submit_write() returns a Future that resolves once the write's group has committed
+# (group commits run with synchronous = FULL, so a resolved write is on disk); the API awaits it without holding a
+# worker thread, and commit_write() blocks on it for the kiosk and editor. The gain is in throughput across concurrent
+# callers, not in any one caller's latency. Bulk writes that bypass the writer (import, archiving, Reset Tables) call
+# flush_writes() first, so they never commit ahead of a write queued before them.
+GROUP_COMMIT_MAX_WRITES = 500 # Most writes per group commit
+GROUP_COMMIT_WAIT_MS = 0 # Extra wait for more writes once a group has started; worth raising only where fsync is slow
+WRITE_BEHIND = os.environ.get("GALERAGATE_WRITE_BEHIND") == "1"
+
+def insert_tourist(db, tourist, selections=(), payment=None): # One check-in inside the caller's transaction; returns the tourist ID
+    tourist_id = db.execute(INSERT_TOURIST_SQL, stored_tourist(tourist)).lastrowid
+    db.executemany(INSERT_SELECTION_SQL, [(tourist_id, item_id) for item_id in selections])
+    if payment:
+        insert_payment(db, tourist_id, payment)
+    return tourist_id
+
+def insert_payment(db, tourist_id, payment): # payment is (method, amount, date); returns the payment ID
+    return db.execute(INSERT_PAYMENT_SQL, (tourist_id,) + stored_payment(payment)).lastrowid
+
+class GroupCommitWriter: # Background thread that runs queued writes in group commits
+    def __init__(self, max_writes=GROUP_COMMIT_MAX_WRITES, wait_ms=GROUP_COMMIT_WAIT_MS):
+        self.max_writes = max_writes
+        self.wait_ms = wait_ms
+        self.closed = False
+        self.groups = self.writes = self.failed = self.largest_group = 0
+        self._queue = queue.Queue() # (future, write, args, tourist ID to invalidate), or None to stop
+        self._lock = threading.Lock() # Orders submit() against close(), so nothing is queued behind the stop marker
+        self._thread = threading.Thread(target=self._run, name="galeragate-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, write, *args, tourist_id=None): # Queue write(db, *args); the Future resolves to its return value
+        from concurrent.futures import Future
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("the writer has been closed")
+            self._queue.put((future, write, args, tourist_id))
+        return future
+
+    def flush(self): # Wait until everything queued so far has committed
+        self.submit(lambda db: None).result()
+
+    def close(self): # Commit what is still queued, then stop the thread
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        return dict(groups=self.groups, writes=self.writes, failed=self.failed, largest_group=self.largest_group,
+                    writes_per_group=self.writes / self.groups if self.groups else 0.0, queued=self._queue.qsize())
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            group = [first]
+            deadline = time.monotonic() + self.wait_ms / 1000
+            while len(group) < self.max_writes:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None: # Stop once this last group has committed
+                    stopping = True
+                    break
+                group.append(item)
+            self._commit(group)
+
+    def _commit(self, group):
+        try:
+            with connection() as db:
+                db.execute("PRAGMA synchronous = FULL") # One fsync per group, so a resolved Future means the write is on disk
+                try:
+                    db.execute("BEGIN IMMEDIATE")
+                    results = [write(db, *args) for _, write, args, _ in group]
+                    db.commit()
+                finally:
+                    if db.in_transaction:
+                        db.rollback()
+                    db.execute("PRAGMA synchronous = NORMAL")
+        except Exception as e:
+            if len(group) > 1: # Commit the writes one by one, so only the bad one fails
+                for item in group:
+                    self._commit([item])
+                return
+            self.failed += 1
+            group[0][0].set_exception(e)
+            return
+        self.groups += 1
+        self.writes += len(group)
+        self.largest_group = max(self.largest_group, len(group))
+        profiles.invalidate(*{tourist_id for _, _, _, tourist_id in group if tourist_id is not None})
+        for (future, _, _, _), result in zip(group, results):
+            future.set_result(result)
+
+writer = None # Started by get_writer() on first use
+_writer_lock = threading.Lock()
+
+def get_writer(): # The background writer, started on first use and flushed when the process exits
+    global writer
+    with _writer_lock:
+        if writer is None:
+            import atexit
+            writer = GroupCommitWriter()
+            atexit.register(writer.close)
+        return writer
+
+def stop_writer(): # Commit pending writes and stop the writer, e.g. before the database is closed
+    global writer
+    with _writer_lock:
+        current, writer = writer, None
+    if current is not None:
+        current.close()
+
+def flush_writes(): # Wait for writes already queued for the background writer, if it is running
+    current = writer
+    if current is not None:
+        current.flush()
+
+def submit_write(write, *args, tourist_id=None): # Run write(db, *args) in a transaction; returns a Future of its result
+    # Through the background writer when write-behind is on; either way the tourist's cached profile is dropped once committed
+    if WRITE_BEHIND:
+        return get_writer().submit(write, *args, tourist_id=tourist_id)
+    from concurrent.futures import Future
+    future = Future()
+    try:
+        with transaction() as db:
+            result = write(db, *args)
+    except Exception as e:
+        future.set_exception(e)
+        return future
+    if tourist_id is not None:
+        profiles.invalidate(tourist_id)
+    future.set_result(result)
+    return future
+
+def commit_write(write, *args, tourist_id=None): # submit_write(), waiting for the commit; returns the write's result
+    return submit_write(write, *args, tourist_id=tourist_id).result()
+
+class Reservation: # Unit of work that stages a tourist's selections and payment, then writes them in one transaction
+    def __init__(self, tourist_id):
+        self.tourist_id = tourist_id
+        # Start from what is already committed for this tourist (a list of catalog item IDs)
+        self.selections = profile_item_ids(fetch_profile(tourist_id))
+        self._committed = set(self.selections)
+        self.payment = None
+
+    @property
+    def pending(self): # True when there are staged changes that commit() has not written yet
+        return self.payment is not None or set(self.selections) != self._committed
+
+    def add_selection(self, item_id):
+        if item_id not in self.selections:
+            self.selections.append(item_id)
+
+    def remove_selection(self, item_id):
+        if item_id in self.selections:
+            self.selections.remove(item_id)
+
+    def set_payment(self, payment_method, amount_paid, payment_date):
+        self.payment = (payment_method, amount_paid, payment_date)
+
+    def unavailable(self, is_available): # Staged options that fail is_available(item_id), i.e. were removed from the catalog
+        # Committed selections are never among them: the catalog refuses to remove an option that is part of a reservation
+        return [item_id for item_id in self.selections if item_id not in self._committed and not is_available(item_id)]
+
+    def drop_unavailable(self, available): # Unstage options not in `available`; returns their IDs
+        dropped = self.unavailable(available.__contains__)
+        self.selections = [item_id for item_id in self.selections if item_id not in dropped]
+        return dropped
+
+    def commit(self): # Write every staged change atomically: one BEGIN IMMEDIATE ... COMMIT (and one fsync) per reservation
+        # Returns the staged options left out because they left the catalog. Only once the write has committed does
+        # the unit of work forget them, so a failed attempt can be retried with everything the tourist chose.
+        dropped = commit_write(self.write, tourist_id=self.tourist_id)
+        self.selections = [item_id for item_id in self.selections if item_id not in dropped]
+        self._committed = set(self.selections)
+        self.payment = None
+        return dropped
+
+    def write(self, db): # The staged changes as statements in the caller's transaction; changes nothing on self
+        # Checked under the write lock, since the cached catalog can be a few seconds behind another process's removal
+        dropped = self.unavailable(lambda item_id: db.execute(CATALOG_ITEM_SQL, (item_id,)).fetchone() is not None)
+        selections = [item_id for item_id in self.selections if item_id not in dropped]
+        db.executemany(DELETE_SELECTION_SQL, [(self.tourist_id, item_id) for item_id in self._committed - set(selections)])
+        db.executemany(INSERT_SELECTION_SQL,
+                       [(self.tourist_id, item_id) for item_id in selections if item_id not in self._committed])
+        if self.payment:
+            insert_payment(db, self.tourist_id, self.payment)
+        return dropped
+
+    def discard(self): # Drop staged changes and go back to the committed state
+        self.selections = [selection for selection in self.selections if selection in self._committed]
+        self.selections.extend(self._committed - set(self.selections))
+        self.payment = None
+
+def category_selection(tourist_id):
+    reservation = Reservation(tourist_id) # Nothing is written until the tourist confirms the reservation with a payment
+
+    while True:
+        catalog = get_catalog()
+        categories = list(catalog.categories) # Category names in display order
+        dropped = reservation.drop_unavailable(catalog.items)
+        if dropped: # An admin removed an option while it was staged here
+            print(f"\033[1;33m{len(dropped)} selected option(s) are no longer offered and were removed from your selections.\033[0m")
+        print("=" * 80)
+        print("\033[1;36m" + " " * 20 + "🗺️ Categories: Choose your options below!" + "\033[0m")
+        print("=" * 80)
+        # Show the available categories (Resort, Restaurant, Activities, Places, ...)
+        for i, category in enumerate(categories, start=1):
+            print(f"\033[1;33m[{i}] {category} 🏖️\033[0m")
+        
+        overall_option, delete_option, back_option = (str(len(categories) + offset) for offset in (1, 2, 3))
+        print(f"\033[1;35m[{overall_option}] Overall Selection 📋\033[0m")
+        print(f"\033[1;31m[{delete_option}] Delete Selection ❌\033[0m")
+        print(f"\033[1;32m[{back_option}] Back to Main Menu ↩️\033[0m")
+
+        choice = input("Enter your choice: ").strip()
+        
+        if choice.isdigit() and 1 <= int(choice) <= len(categories): # User selects a category, show available options within that category
+            category = categories[int(choice) - 1]
+            options = catalog.categories[category]
+            print(f"\n\033[1;34m{category} Options 🏖️\033[0m")
+            print("-" * 80)
+            
+            for i, item_id in enumerate(options, start=1):
+                print(f"\033[1;32m[{i}] {catalog.items[item_id][1]}\033[0m")
+            
+            selection = int(input("Enter your choice: ")) - 1
+            item_id = options[selection]
+            
+            reservation.add_selection(item_id)
+            print(f"\n\033[1;32mAdded: {catalog.items[item_id][1]} under {category} ✅\033[0m")
+        
+        elif choice == overall_option: # View the overall selections made by the tourist
+            selections = reservation.selections
+            if selections:
+                print("\n\033[1;36mOverall Selections 📋\033[0m")
+                print("=" * 80)
+                for item_id in selections:
+                    category, name, index = catalog.items[item_id]
+                    print(f"[{index}] {category}: {name}")
+                print("\033[1;33m[1] Proceed to Reservation 📅\033[0m")
+                print("\033[1;31m[2] Exit ❌\033[0m")
+                option = input("Enter your choice: ").strip()
+                print("=" * 80)
+                if option == "1":
+                    print("\033[1;33mProceeding to payment...\033[0m")
+                    print("\033[1;31mUpon arriving at Puerto Galera's Balatero Pier\nmake sure to pay the Environmental User Fee of 120 pesos per tourist.\nFrom there, trikes are readily available to transport you to your resort.\033[0m")
+                    print("=" * 80)
+                    
+                    # Payment Method Input
+                    print("\033[1;34mPayment Options 🛒\033[0m")
+                    print("\033[1;35m1. Credit Card\033[0m")
+                    print("\033[1;35m2. Cash\033[0m")
+                    print("\033[1;35m3. PayPal\033[0m")
+                    payment_choice = input("Choose a payment method: ").strip()
+                    if payment_choice in PAYMENT_METHODS: # Record the payment details in the database
+                        payment_method = PAYMENT_METHODS[payment_choice]
+                        amount_paid = input_checked("Enter the total amount paid: ", lambda text: parse_amount(text, "Amount paid"))
+                        payment_date = input_checked("Enter the payment date (YYYY-MM-DD): ", lambda text: parse_date(text, "Payment date"))
+                        
+                        reservation.set_payment(payment_method, amount_paid, payment_date)
+                        try: # Selections and payment are saved together, or not at all
+                            dropped = reservation.commit()
+                        except sqlite3.Error as e:
+                            reservation.payment = None
+                            print(f"\n\033[1;31mReservation could not be saved: {e}❌\033[0m")
+                            continue
+                        if dropped:
+                            print(f"\n\033[1;33m{len(dropped)} selected option(s) were removed from the catalog meanwhile and were not reserved.\033[0m")
+                        print("\n\033[1;32mPayment completed successfully! ✅\033[0m")
+                        proceed_to_reservation(tourist_id)
+                    else:
+                        print("\n\033[1;31mInvalid payment method selected.❌\033[0m")
+                elif option == "2":
+                    break
+            else:
+                print("\n\033[1;31mNo selections made yet. Please make a selection first!❌\033[0m")
+        
+        elif choice == delete_option: # Delete a selection made by the tourist
+            selections = reservation.selections
+            if selections:
+                print("\n\033[1;31mYour Selections to Delete❌\033[0m")
+                print("=" * 80)
+        
+                for item_id in selections:
+                    category, name, _ = catalog.items[item_id]
+                    category_index = categories.index(category) + 1
+                    print(f"[{category_index}] {category}: {name}")
+        
+                choice_index = int(input(f"Enter the option number to delete under {category}: ").strip()) - 1
+                selected_item = catalog.categories[category][choice_index]
+                selected_choice = catalog.items[selected_item][1]
+                
+                confirmation = input(f"\n\033[1;33mAre you sure you want to delete this selection: {selected_choice}? \nType 'yes' to confirm: \033[0m").strip().lower()
+                
+                if confirmation == 'yes':
+                    reservation.remove_selection(selected_item)
+                    print("\n\033[1;32mSelection deleted successfully. ✅\033[0m")
+                else:
+                    print("\n\033[1;31mDeletion cancelled. No changes were made.❌\033[0m")
+            else:
+                print("\n\033[1;31mNo selections to delete.❌\033[0m")
+                
+        elif choice == back_option:
+            break
+
+    if reservation.pending: # Leaving without paying must not leave a half-made reservation behind
+        reservation.discard()
+        print("\033[1;33mSelections that were not reserved have been discarded.\033[0m")
+
+# Report rendering: reports build their output in memory and write it in large blocks instead of a print() per field.
+# On a terminal they keep their colored layout; redirected to a file or pipe they switch to plain text (receipts) or
+# tab-separated rows (tabular reports), unless GALERAGATE_OUTPUT or --output picks a format.
+OUTPUT_FORMATS = ["color", "plain", "csv", "tsv"]
+OUTPUT_FORMAT = os.environ.get("GALERAGATE_OUTPUT") # None picks a format from the output stream
+REPORT_CHUNK_ROWS = 1000 # Rows rendered per write
+
+def resolve_output_format(stream=None, tabular=True): # The format to write to `stream`; non-tabular output falls back to plain text
+    stream = stream or sys.stdout
+    chosen = OUTPUT_FORMAT or ("color" if stream.isatty() else "tsv" if tabular else "plain")
+    return "plain" if chosen in ("csv", "tsv") and not tabular else chosen
+
+def painter(color): # paint(code, text) wraps text in an ANSI color, or leaves it alone
+    return (lambda code, text: f"\033[{code}m{text}\033[0m") if color else (lambda code, text: text)
+
+class ReportWriter: # Buffers report rows and writes them REPORT_CHUNK_ROWS at a time
+    def __init__(self, headers, record, stream=None, output_format=None, heading=None):
+        # headers: column names for CSV/TSV; record(row, paint) renders one row as text for the color/plain layouts;
+        # heading(paint), if given, is written once before the first row of the color/plain layouts
+        self.stream = stream or sys.stdout
+        self.format = output_format or resolve_output_format(self.stream)
+        self.headers, self.record, self.heading = headers, record, heading
+        self.rows = 0
+        self._chunk = []
+        if self.format in ("csv", "tsv"):
+            import csv, io
+            self._text = io.StringIO()
+            self._csv = csv.writer(self._text, delimiter="," if self.format == "csv" else "\t", lineterminator="\n")
+            self._csv.writerow(headers)
+        else:
+            self._paint = painter(self.format == "color")
+            if heading:
+                self._chunk.append(heading(self._paint))
+
+    def write(self, row):
+        if self.format in ("csv", "tsv"):
+            self._csv.writerow(row)
+        else:
+            self._chunk.append(self.record(row, self._paint))
+        self.rows += 1
+        if self.rows % REPORT_CHUNK_ROWS == 0:
+            self.flush()
+
+    def flush(self): # Write what is buffered in one call; also call before prompting, so the prompt follows the rows
+        if self.format in ("csv", "tsv"):
+            text = self._text.getvalue()
+            self._text.seek(0)
+            self._text.truncate()
+        else:
+            text = "".join(self._chunk)
+            self._chunk.clear()
+        if text:
+            self.stream.write(text)
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+TOURIST_REPORT_HEADERS = ["tourist_id", "name", "age", "nationality", "contact_number", "entry_date", "exit_date", "selections"]
+
+def tourist_record(row, paint):
+    tourist_id, name, age, nationality, contact_number, entry_date, exit_date, selections = row
+    return (f"{paint('1;33', 'Tourist ID: ')}{str(tourist_id).zfill(4)}\n"
+            f"{paint('1;34', 'Name:')} {paint('1;36', name)}\n"
+            f"{paint('1;34', 'Age:')} {paint('1;33', age)}\n"
+            f"{paint('1;34', 'Nationality:')} {paint('1;32', nationality)}\n"
+            f"{paint('1;34', 'Contact Number:')} {paint('1;31', contact_number)}\n"
+            f"{paint('1;34', 'Entry Date:')} {paint('1;36', entry_date)}\n"
+            f"{paint('1;34', 'Exit Date:')} {paint('1;38', exit_date)}\n"
+            + (f"{paint('1;32', 'Selections:')} {paint('1;33', selections)}\n" if selections else "")
+            + "=" * 80 + "\n")
+
+PAYMENT_REPORT_HEADERS = ["payment_id", "name", "amount_paid", "payment_method", "payment_date", "total_for_method", "transactions_for_method"]
+
+def payment_record(row, paint):
+    payment_id, name, amount_paid, payment_method, payment_date, total_per_method, transaction_count = row
+    return (f"{paint('1;33', 'Payment ID: ')}{payment_id}\n"
+            f"{paint('1;34', 'Tourist Name: ')}{name}\n"
+            f"{paint('1;34', 'Amount: ')}₱{amount_paid}\n"
+            f"{paint('1;34', 'Payment Type: ')}{payment_method}\n"
+            f"{paint('1;34', 'Date: ')}{payment_date}\n"
+            f"{paint('1;35', f'Total for {payment_method}: ')}₱{total_per_method} ({paint('1;33', f'{transaction_count} Transactions')})\n"
+            + "=" * 80 + "\n")
+
+SEARCH_HEADERS = ["tourist_id", "name", "nationality", "contact_number", "entry_date", "exit_date", "match"]
+
+def search_heading(paint):
+    return paint("1;33", f"{'ID':<6}{'Name':<24}{'Nationality':<12}{'Contact':<14}{'Stay':<22}") + "\n"
+
+def search_record(row, paint):
+    tourist_id, name, nationality, contact_number, entry_date, exit_date, match = row
+    stay = f"{entry_date}..{exit_date}" if entry_date else ""
+    note = " " + paint("1;37", "~") if match == "similar" else "" # Matched a similarly spelled name
+    return (f"{str(tourist_id).zfill(4):<6}{(name or '')[:23]:<24}{(nationality or '')[:11]:<12}"
+            f"{str(contact_number or '')[:13]:<14}{stay:<22}{note}\n")
+
+# Tourist profile cache: a tourist's receipt row (their details, selection item IDs and latest payment) is read
+# again and again while they move around the kiosk menus, so the rows are kept in a bounded LRU shared by every
+# thread. Rows are immutable tuples, so they can be handed out without copying. Write paths in this process drop the
+# rows they change; changes made by other processes are found in the change log every PROFILE_RECHECK_SECONDS.
+PROFILE_CACHE_SIZE = 1024 # Profiles kept; 0 turns the cache off
+PROFILE_RECHECK_SECONDS = 2 # How stale a profile changed by another process can get
+
+class ProfileCache:
+    def __init__(self, size=PROFILE_CACHE_SIZE):
+        self.size = size
+        self._rows = OrderedDict() # Tourist ID -> receipt row, least recently used first
+        self._lock = threading.Lock()
+        self._generation = 0 # Bumped by every invalidation, so a load that raced with a write is not cached
+        self._change_id = None # Last change_log entry synced
+        self._checked = 0.0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, tourist_id, load): # The cached row, or load(tourist_id) on a miss; None (not found) is never cached
+        self.sync()
+        with self._lock:
+            row = self._rows.get(tourist_id)
+            if row is not None:
+                self._rows.move_to_end(tourist_id)
+                self.hits += 1
+                return row
+            self.misses += 1
+            generation = self._generation
+        row = load(tourist_id) # Outside the lock, so other threads' hits never wait on a query
+        if row is not None and self.size > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._rows[tourist_id] = row
+                    if len(self._rows) > self.size:
+                        self._rows.popitem(last=False)
+                        self.evictions += 1
+        return row
+
+    def invalidate(self, *tourist_ids): # Call after the write commits
+        with self._lock:
+            self._generation += 1
+            for tourist_id in tourist_ids:
+                if self._rows.pop(tourist_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self): # Drop every profile and start the change log sync afresh
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._rows)
+            self._rows.clear()
+            self._change_id = None
+            self._checked = 0.0
+
+    def sync(self): # Drop profiles changed by other processes since the last sync
+        if self.size <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked < PROFILE_RECHECK_SECONDS:
+                return
+            self._checked = now
+            since = self._change_id
+        with connection() as db:
+            until = last_change_id(db)
+            if since is None or until == since:
+                changed = []
+            elif until - since > self.size or db.execute(
+                    "SELECT COUNT(*) FROM change_log WHERE change_id > ?", (since,)).fetchone()[0] != until - since:
+                changed = None # Too much changed, or the entries were pruned: start over
+            else:
+                changed = [tourist_id for tourist_id, in db.execute(CHANGED_TOURISTS_SQL, (since, until))]
+                if None in changed: # A payment deleted on its own no longer names its tourist
+                    changed = None
+        if changed is None:
+            self.clear()
+            return
+        if changed:
+            self.invalidate(*changed)
+        with self._lock:
+            self._change_id = until
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(size=self.size, entries=len(self._rows), hits=self.hits, misses=self.misses,
+                        hit_rate=self.hits / lookups if lookups else 0.0, evictions=self.evictions,
+                        invalidations=self.invalidations)
+
+profiles = ProfileCache()
+
+def load_profile(tourist_id):
+    with connection() as db:
+        return db.execute(receipts_by_id_sql(1), (tourist_id,)).fetchone()
+
+def fetch_profile(tourist_id): # The receipt row for a tourist (SELECT * FROM tourists columns first), or None
+    return profiles.get(tourist_id, load_profile)
+
+def profile_item_ids(row): # The selection item IDs in a receipt row
+    return [int(item_id) for item_id in row[8].split(",")] if row and row[8] else []
+
+# Receipts
+RECEIPT_ID_BATCH = 500 # Tourist IDs per query when exporting receipts for an ID list (well under SQLite's variable limit)
+
+def receipt_from_row(row, catalog): # Turn one receipt row into a dict (the shape written by the JSON export)
+    (tourist_id, name, age, sex, nationality, contact_number, entry_date, exit_date, item_ids,
+     payment_id, payment_method, amount_paid, payment_date) = row
+    selections = []
+    for item_id in map(int, item_ids.split(",")) if item_ids else ():
+        category, choice, _ = catalog.items[item_id]
+        selections.append({"category": category, "choice": choice})
+    return {
+        "tourist_id": tourist_id, "name": name, "age": age, "sex": sex, "nationality": nationality,
+        "contact_number": contact_number, "entry_date": entry_date, "exit_date": exit_date,
+        "selections": selections,
+        "payment": None if payment_id is None else {
+            "payment_id": payment_id, "payment_method": payment_method,
+            "amount_paid": amount_paid, "payment_date": payment_date,
+        },
+    }
+
+def fetch_receipt(tourist_id): # A single tourist's receipt from the profile cache (or one query), or None if the tourist does not exist
+    row = fetch_profile(tourist_id)
+    return receipt_from_row(row, get_catalog()) if row else None
+
+def iter_receipts(date_from=None, date_to=None, tourist_ids=None): # Stream receipts by payment date window or ID list
+    catalog = get_catalog()
+    with connection() as db:
+        if tourist_ids is not None:
+            tourist_ids = list(tourist_ids)
+            for start in range(0, len(tourist_ids), RECEIPT_ID_BATCH): # One query per batch of IDs
+                batch = tourist_ids[start:start + RECEIPT_ID_BATCH]
+                for row in db.execute(receipts_by_id_sql(len(batch)), batch):
+                    yield receipt_from_row(row, catalog)
+        else:
+            window = (day_number(date_from, "from") if date_from else 0, day_number(date_to, "to") if date_to else date.max.toordinal())
+            for row in db.execute(RECEIPTS_BY_PAYMENT_DATE_SQL, window):
+                yield receipt_from_row(row, catalog)
+
+def receipt_lines(receipt, color=True): # The receipt as lines of text, with or without ANSI colors
+    label = (lambda text: f"\033[1;33m{text}: \033[0m") if color else (lambda text: f"{text}: ")
+    heading = (lambda text: f"\n\033[1;36m{text}:\033[0m") if color else (lambda text: f"\n{text}:")
+    warning = (lambda text: f"\033[1;31m{text}\033[0m") if color else (lambda text: text)
+    lines = [
+        "=" * 80,
+        ("\033[1;35m" + " " * 30 + "===== Tourist Receipt =====" + "\033[0m") if color else " " * 30 + "===== Tourist Receipt =====",
+        "=" * 80,
+        # Tourist Info with formatting
+        label("Tourist ID") + str(receipt["tourist_id"]).zfill(4),
+        label("Name") + str(receipt["name"]),
+        label("Age") + str(receipt["age"]),
+        label("Sex") + str(receipt["sex"]),
+        label("Nationality") + str(receipt["nationality"]),
+        label("Contact") + str(receipt["contact_number"]),
+        label("Entry Date") + str(receipt["entry_date"]),
+        label("Exit Date") + str(receipt["exit_date"]),
+        # Display Selections
+        heading("Selections"),
+        "=" * 80,
+    ]
+    for selection in receipt["selections"]:
+        lines.append((f"\033[1;34m{selection['category']}: \033[0m" if color else f"{selection['category']}: ") + selection["choice"])
+    if not receipt["selections"]:
+        lines.append(warning("No selections made yet."))
+    # Display Payment Information
+    lines += [heading("Payment Details"), "=" * 80]
+    payment = receipt["payment"]
+    if payment:
+        lines.append(label("Payment Method") + str(payment["payment_method"]))
+        lines.append(label("Amount Paid") + f"₱{payment['amount_paid']:,.2f}")
+        lines.append(label("Payment Date") + str(payment["payment_date"]))
+    else:
+        lines.append(warning("No payment information found."))
+    lines.append("=" * 80)
+    return lines
+
+def proceed_to_reservation(tourist_id):
+    print("\n\033[1;36m" + " " * 30 + "Generating Receipt..." "\033[0m\n")
+    with traced_flow("receipt"):
+        receipt = fetch_receipt(tourist_id) # Tourist, selections and payment in a single query
+    if receipt is None:
+        print("\033[1;31mTourist not found.\033[0m")
+        return
+    print("\n".join(receipt_lines(receipt, color=resolve_output_format(tabular=False) == "color")))
+    # Footer Message
+    print("\033[1;32mThank you for your reservation! We hope you have a great time at Puerto Galera! 🌞\033[0m")
+
+def export_receipts(path, output_format="text", date_from=None, date_to=None, tourist_ids=None):
+    # Stream receipts to a text or JSON file without holding them in memory; returns (receipts written, seconds taken)
+    import json
+    started = time.perf_counter()
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if output_format == "json":
+            f.write("[")
+        for receipt in iter_receipts(date_from, date_to, tourist_ids):
+            if output_format == "json":
+                f.write((",\n" if count else "\n") + json.dumps(receipt, ensure_ascii=False))
+            else:
+                f.write("\n".join(receipt_lines(receipt, color=False)) + "\n\n")
+            count += 1
+        if output_format == "json":
+            f.write("\n]\n")
+    return count, time.perf_counter() - started
+
+def print_export_summary(path, count, seconds):
+    rate = count / seconds if seconds else 0
+    print(f"\033[1;32m✅ Exported {count} receipts to {path} in {seconds:.2f}s ({rate:,.0f} receipts/s).\033[0m")
+
+def export_receipts_menu():
+    print("\033[1;36m" + " " * 28 + "🧾 Export Receipts\033[0m")
+    print("=" * 80)
+    ids = input("Tourist IDs, comma separated (press Enter to export by payment date instead): ").strip()
+    try:
+        if ids:
+            tourist_ids = [int(tourist_id) for tourist_id in ids.split(",") if tourist_id.strip()]
+            date_from = date_to = None
+        else:
+            tourist_ids = None
+            date_from = input("📅 Paid on or after (YYYY-MM-DD, Enter for all): ").strip()
+            date_from = parse_date(date_from, "Start date") if date_from else None
+            date_to = input("📅 Paid on or before (YYYY-MM-DD, Enter for all): ").strip()
+            date_to = parse_date(date_to, "End date") if date_to else None
+    except ValueError as e:
+        print(f"\033[1;31m{e}\033[0m")
+        return
+    output_format = "json" if input("Format, text or json [text]: ").strip().lower() == "json" else "text"
+    path = input(f"Output file [receipts.{'json' if output_format == 'json' else 'txt'}]: ").strip() \
+        or f"receipts.{'json' if output_format == 'json' else 'txt'}"
+    try:
+        count, seconds = export_receipts(path, output_format, date_from, date_to, tourist_ids)
+    except OSError as e:
+        print(f"\033[1;31mCould not write {path}: {e}\033[0m")
+        return
+    print_export_summary(path, count, seconds)
+    print("=" * 80)
+
+def login():
+    print("\033[1;36m" + " " * 33 + "🔒 Admin Login\033[0m")
+    print("=" * 80)
+    
+     # Prompt user for email and password input
+    email = input("\033[1;33m📧 Enter email: \033[0m")
+    password = input("\033[1;33m🔑 Enter password: \033[0m")
+    
+    # Retry mechanism in case of incorrect credentials
+    retry_count = 3
+    while retry_count > 0: # Check credentials and grant access
+        if email == "admin@galeragate.com" and password == "admin123":
+            print("\n\033[1;32m✅ Login successful! Redirecting to Admin Panel... 🌟\033[0m")
+            admin_menu()
+            break
+        else:
+            retry_count -= 1
+            if retry_count > 0:
+                print(f"\033[1;31m❌ Invalid email or password. {retry_count} attempts left. Please try again. 🔄\033[0m")
+                email = input("\033[1;33m📧 Enter email: \033[0m")
+                password = input("\033[1;33m🔑 Enter password: \033[0m")
+            else:
+                print("\033[1;31m❌ Too many failed attempts. Please try again later. 🔒\033[0m")
+                break
+            
+def count_tourist(): # Query to count the total number of tourists in the database
+    print_report_age()
+    with report_connection() as db:
+        result = db.execute(COUNT_TOURISTS_SQL).fetchone()
+    total = result[0] if result else 0
+    print("\033[1;32m" + " " * 20 + "🎉 Total Number of Tourists: \033[1;33m" + str(total) + "\033[0m")
+    print("=" * 80)
+        
+def dashboard_data(top=10): # Totals straight from the trigger-maintained summary tables
+    with report_connection() as db:
+        result = db.execute(COUNT_TOURISTS_SQL).fetchone()
+        nationalities = db.execute(DASHBOARD_NATIONALITIES_SQL, (top,)).fetchall()
+        payments = db.execute(DASHBOARD_PAYMENTS_SQL).fetchall()
+        arrivals = db.execute(DASHBOARD_ARRIVALS_SQL, (top,)).fetchall()
+    return {
+        "tourists": result[0] if result else 0,
+        "nationalities": [{"nationality": nationality, "tourists": tourists} for nationality, tourists in nationalities],
+        "payments": [{"payment_method": payment_method, "total_amount": total_amount, "transactions": transactions}
+                     for payment_method, total_amount, transactions in payments],
+        "arrivals": [{"arrival_date": arrival_date, "tourists": tourists} for arrival_date, tourists in arrivals],
+    }
+
+def dashboard(top=10):
+    data = dashboard_data(top)
+    print_report_age()
+    print_dashboard(data, top)
+
+def print_dashboard(data, top): # dashboard_data() or AnalyticsSnapshot.dashboard() output
+    window = f" {data['date_from'] or '...'} to {data['date_to'] or '...'}" if data.get("date_from") or data.get("date_to") else ""
+    print("\033[1;35m" + " " * 30 + "📊 Dashboard" + window + "\033[0m")
+    print("=" * 80)
+    print("\033[1;32mTotal Number of Tourists: \033[1;33m" + str(data["tourists"]) + "\033[0m")
+    print("-" * 80)
+    print(f"\033[1;36mTop {top} Nationalities:\033[0m")
+    for row in data["nationalities"]:
+        print(f"  {row['nationality'] or 'Unknown':<30} {row['tourists']:>8}")
+    print("-" * 80)
+    print("\033[1;36mPayments by Method:\033[0m")
+    for row in data["payments"]:
+        print(f"  {row['payment_method'] or 'Unknown':<30} ₱{row['total_amount']:>14,.2f}  ({row['transactions']} Transactions)")
+    print("-" * 80)
+    print(f"\033[1;36mArrivals (latest {top} days):\033[0m")
+    for row in data["arrivals"]:
+        print(f"  {row['arrival_date'] or 'Unknown':<30} {row['tourists']:>8}")
+    if "popular" in data:
+        print("-" * 80)
+        print(f"\033[1;36mTop {top} Options:\033[0m")
+        for row in data["popular"]:
+            print(f"  {(row['category'] or 'Unknown') + ': ' + (row['choice'] or 'Unknown'):<50} {row['selections']:>8}")
+    print("=" * 80)
+
+def reset_tables():
+    print("=" * 80)
+    print("\033[1;31m🧹 Resetting tables... ⚠️ This will delete all data and reset IDs.\033[0m")  # Print a message warning the user about resetting the tables and deleting all data
+    confirm = input("\033[1;33mAre you sure? Type 'yes' to confirm: \033[0m").strip().lower()
+    
+    if confirm == 'yes':
+        print("\n\033[1;36m🔄 Resetting tables...\033[0m")
+        
+        clear_tables() # Truncates the tables and resets AUTOINCREMENT in one transaction
+        print("\n\033[1;32m✅ Tables cleared and IDs reset successfully! 🎉\033[0m")
+        print_compact_summary(*compact_database()) # Give the emptied pages back to the filesystem
+    else:
+        print("\n\033[1;31m❌ Reset canceled. No changes made.\033[0m")
+    print("=" * 80)
+
+# Visitor trends
+def sweep_occupancy(stays, first_day, last_day): # Pure-Python sweep; returns (daily occupancy, arrivals, nights stayed by arrivals)
+    # Each stay adds an arrival event on its first day in the window and a departure event the day after its last,
+    # so one pass over the stays plus one running sum over the days replaces a per-day scan of every stay.
+    events = [0] * (last_day - first_day + 2)
+    arrivals = {}
+    nights = []
+    for entry_day, exit_day, nationality in stays:
+        events[max(entry_day, first_day) - first_day] += 1
+        events[min(exit_day, last_day) - first_day + 1] -= 1
+        if entry_day >= first_day: # Arrived inside the window
+            arrivals[nationality] = arrivals.get(nationality, 0) + 1
+            nights.append(exit_day - entry_day)
+    occupancy, present = [], 0
+    for change in events[:-1]:
+        present += change
+        occupancy.append(present)
+    return occupancy, arrivals, nights
+
+SWEEP_CHUNK_SIZE = 65536 # Rows converted to arrays at a time by the NumPy sweep, which bounds its memory use
+
+def sweep_occupancy_numpy(stays, first_day, last_day): # Same sweep, vectorized with NumPy one chunk of rows at a time
+    import itertools
+    from collections import Counter
+    import numpy
+    span = last_day - first_day + 2
+    events = numpy.zeros(span, dtype=numpy.int64)
+    arrivals = Counter()
+    nights = []
+    while True:
+        chunk = stays.fetchmany(SWEEP_CHUNK_SIZE)
+        if not chunk:
+            break
+        entry_column, exit_column, nationality_column = zip(*chunk)
+        entry_days = numpy.array(entry_column, dtype=numpy.int64)
+        exit_days = numpy.array(exit_column, dtype=numpy.int64)
+        events += numpy.bincount(numpy.maximum(entry_days, first_day) - first_day, minlength=span)
+        events -= numpy.bincount(numpy.minimum(exit_days, last_day) - first_day + 1, minlength=span)
+        arrived = entry_days >= first_day
+        arrivals.update(itertools.compress(nationality_column, arrived.tolist()))
+        nights.extend((exit_days[arrived] - entry_days[arrived]).tolist())
+    return numpy.cumsum(events[:-1]).tolist(), dict(arrivals), nights
+
+def visitor_trends(date_from, date_to, top=5, use_numpy=None): # Occupancy, arrivals and stay length over a date window
+    first_day = date.fromisoformat(date_from).toordinal()
+    last_day = date.fromisoformat(date_to).toordinal()
+    if last_day < first_day:
+        raise ValueError("The end date is before the start date")
+    if use_numpy is None: # Use NumPy when it is installed
+        try:
+            import numpy  # noqa: F401
+            use_numpy = True
+        except ImportError:
+            use_numpy = False
+    sweep = sweep_occupancy_numpy if use_numpy else sweep_occupancy
+
+    with report_connection() as db:
+        stays = db.execute(STAYS_IN_WINDOW_SQL, (last_day, first_day))
+        occupancy, arrivals, nights = sweep(stays, first_day, last_day)
+
+    daily = [(date.fromordinal(first_day + offset).isoformat(), present) for offset, present in enumerate(occupancy)]
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "occupancy": daily,
+        "peak_days": sorted(daily, key=lambda day: (-day[1], day[0]))[:top],
+        "arrivals": sum(arrivals.values()),
+        "arrivals_by_nationality": sorted(arrivals.items(), key=lambda item: (-item[1], item[0] or "")),
+        "average_stay_nights": sum(nights) / len(nights) if nights else 0.0,
+    }
+
+def print_visitor_trends(trends, max_days=31):
+    print("\033[1;35m" + " " * 22 + f"📈 Visitor Trends {trends['date_from']} to {trends['date_to']}\033[0m")
+    print_report_age()
+    print("=" * 80)
+    print(f"\033[1;32mArrivals: \033[1;33m{trends['arrivals']}\033[0m    "
+          f"\033[1;32mAverage stay: \033[1;33m{trends['average_stay_nights']:.1f} nights\033[0m")
+    print("-" * 80)
+    print("\033[1;36mPeak days:\033[0m")
+    for day, present in trends["peak_days"]:
+        print(f"  {day}  {present:>8} on island")
+    print("-" * 80)
+    print("\033[1;36mArrivals by nationality:\033[0m")
+    for nationality, arrivals in trends["arrivals_by_nationality"][:10]:
+        print(f"  {nationality or 'Unknown':<30} {arrivals:>8}")
+    if len(trends["occupancy"]) <= max_days: # Longer windows are better read from `python galeragate.py trends --json`
+        print("-" * 80)
+        print("\033[1;36mDaily occupancy:\033[0m")
+        busiest = max((present for _, present in trends["occupancy"]), default=0) or 1
+        for day, present in trends["occupancy"]:
+            print(f"  {day}  {present:>8}  " + "█" * round(present / busiest * 40))
+    print("=" * 80)
+
+def visitor_trends_menu():
+    today = date.today()
+    try:
+        date_from = input(f"📅 From (YYYY-MM-DD) [{date.fromordinal(today.toordinal() - 29)}]: ").strip()
+        date_from = parse_date(date_from, "Start date") if date_from else date.fromordinal(today.toordinal() - 29).isoformat()
+        date_to = input(f"📅 To (YYYY-MM-DD) [{today}]: ").strip()
+        date_to = parse_date(date_to, "End date") if date_to else today.isoformat()
+        trends = visitor_trends(date_from, date_to)
+    except ValueError as e:
+        print(f"\033[1;31m{e}\033[0m")
+        return
+    print("=" * 80)
+    print_visitor_trends(trends)
+
+# Analytics snapshot: tourists, selections and payments held in memory as typed arrays, one per column, with the
+# strings (nationality, payment method) dictionary-encoded as array codes. The snapshot answers filtered group-by and
+# top-N dashboard queries that the summary tables cannot (a date window, popular options). It loads once and then
+# catches up by reading only change_log entries newer than the last one it applied, re-reading just those rows.
+SNAPSHOT_RELOAD_SHARE = 0.1 # Reload from scratch rather than patch when more than this share of rows changed
+SNAPSHOT_RELOAD_MIN = 10_000 # ...and more than this many
+ITEM_KEY_SPAN = 1 << 32 # Selections are keyed by tourist_id * ITEM_KEY_SPAN + item_id
+DAY_SQL = "IFNULL({}, 0)" # Stored day number, or 0 if missing
+# Snapshot -> (table, {column: (array typecode, or "str" for dictionary-encoded, SQL expression over the table as t)})
+SNAPSHOT_TABLES = {
+    "tourists": ("tourists", {
+        "nationality": ("str", "t.nationality"),
+        "age": ("i", "CAST(IFNULL(t.age, 0) AS INTEGER)"),
+        "entry_day": ("i", DAY_SQL.format("t.entry_date")),
+        "exit_day": ("i", DAY_SQL.format("t.exit_date")),
+    }),
+    "selections": ("selections", {"tourist_id": ("q", "t.tourist_id"), "item_id": ("i", "t.item_id")}),
+    "payments": ("payment_methods", {
+        "tourist_id": ("q", "IFNULL(t.tourist_id, 0)"),
+        "payment_method": ("str", "t.payment_method"),
+        "amount": ("d", "IFNULL(t.amount_paid, 0) / 100.0"),
+        "payment_day": ("i", DAY_SQL.format("t.payment_date")),
+    }),
+}
+
+def snapshot_rows_sql(name): # Every row of a snapshot table as (row_id, item_id, columns...), in key order
+    table, columns = SNAPSHOT_TABLES[name]
+    row_id, item_id = CHANGE_LOG_TABLES[table]
+    return f"""
+    SELECT t.{row_id}, {f't.{item_id}' if item_id else 'NULL'}, {', '.join(expression for _, expression in columns.values())}
+    FROM {table} AS t ORDER BY t.{row_id}{f', t.{item_id}' if item_id else ''}
+    """
+
+def snapshot_changes_sql(name): # Rows changed in a (since, until] change_id window, with a flag for whether they still exist
+    table, columns = SNAPSHOT_TABLES[name]
+    row_id, item_id = CHANGE_LOG_TABLES[table]
+    return f"""
+    SELECT c.row_id, c.item_id, t.{row_id} IS NOT NULL, {', '.join(expression for _, expression in columns.values())}
+    FROM (
+        SELECT DISTINCT row_id, item_id FROM change_log WHERE change_id > ? AND change_id <= ? AND table_name = '{table}'
+    ) AS c
+    LEFT JOIN {table} AS t ON t.{row_id} = c.row_id{' AND t.item_id = c.item_id' if item_id else ''}
+    """
+
+class StringDictionary: # Distinct strings and the codes standing in for them in a column
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class ColumnTable: # One table's rows as parallel typed arrays, kept sorted by key so lookups are a binary search
+    def __init__(self, columns):
+        self.keys = array("q")
+        self.columns = {name: array("I" if kind == "str" else kind) for name, (kind, _) in columns.items()}
+        self.dictionaries = {name: StringDictionary() for name, (kind, _) in columns.items() if kind == "str"}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def encode(self, row):
+        return [self.dictionaries[name].code(value) if name in self.dictionaries else value
+                for name, value in zip(self.columns, row)]
+
+    def append(self, key, row): # Rows must arrive in key order
+        self.keys.append(key)
+        for column, value in zip(self.columns.values(), self.encode(row)):
+            column.append(value)
+
+    def upsert(self, key, row):
+        position = bisect.bisect_left(self.keys, key)
+        values = self.encode(row)
+        if position < len(self.keys) and self.keys[position] == key:
+            for column, value in zip(self.columns.values(), values):
+                column[position] = value
+        else:
+            self.keys.insert(position, key)
+            for column, value in zip(self.columns.values(), values):
+                column.insert(position, value)
+
+    def delete(self, key):
+        position = bisect.bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+            for column in self.columns.values():
+                del column[position]
+
+    def nbytes(self): # Array buffers plus the distinct strings
+        return (sum(column.itemsize * len(column) for column in (self.keys, *self.columns.values()))
+                + sum(sys.getsizeof(value) for dictionary in self.dictionaries.values() for value in dictionary.values))
+
+class AnalyticsSnapshot: # See get_snapshot(); every method takes the snapshot's lock, so threads can share one
+    def __init__(self):
+        self.tables = {}
+        self.change_id = None # Last change_log entry applied; None until loaded
+        self.loads = 0
+        self._lock = threading.Lock()
+
+    def rows(self):
+        return sum(len(table) for table in self.tables.values())
+
+    def nbytes(self):
+        return sum(table.nbytes() for table in self.tables.values())
+
+    def _load(self, db, until):
+        tables = {name: ColumnTable(columns) for name, (_, columns) in SNAPSHOT_TABLES.items()}
+        for name, table in tables.items():
+            for row_id, item_id, *row in db.execute(snapshot_rows_sql(name)):
+                table.append(row_id if item_id is None else row_id * ITEM_KEY_SPAN + item_id, row)
+        self.tables, self.change_id = tables, until
+        self.loads += 1
+
+    def refresh(self): # Apply what changed since the last refresh; returns the number of change_log entries read
+        with self._lock, connection() as db:
+            db.execute("BEGIN") # Read the log and the rows it points at from one snapshot
+            try:
+                until, since = last_change_id(db), self.change_id
+                if since is not None and until == since:
+                    return 0
+                # Reload after a large batch, or when entries we have not applied were pruned (pruning leaves a gap)
+                if (since is None or until - since > max(SNAPSHOT_RELOAD_MIN, SNAPSHOT_RELOAD_SHARE * self.rows())
+                        or db.execute("SELECT COUNT(*) FROM change_log WHERE change_id > ?", (since,)).fetchone()[0] != until - since):
+                    self._load(db, until)
+                else:
+                    for name, table in self.tables.items():
+                        for row_id, item_id, present, *row in db.execute(snapshot_changes_sql(name), (since, until)):
+                            key = row_id if item_id is None else row_id * ITEM_KEY_SPAN + item_id
+                            if present:
+                                table.upsert(key, row)
+                            else:
+                                table.delete(key)
+                    self.change_id = until
+                return until - (since or 0)
+            finally:
+                db.rollback()
+
+    def dashboard(self, top=10, date_from=None, date_to=None, use_numpy=None):
+        # Totals, top nationalities, payments by method, latest arrival days and most selected options, for tourists
+        # arriving and payments made within [date_from, date_to] (either bound optional)
+        if use_numpy is None: # Use NumPy when it is installed
+            try:
+                import numpy  # noqa: F401
+                use_numpy = True
+            except ImportError:
+                use_numpy = False
+        window = (date.fromisoformat(date_from).toordinal() if date_from else 1,
+                  date.fromisoformat(date_to).toordinal() if date_to else date.max.toordinal()) if date_from or date_to else None
+        with self._lock:
+            tourists, nationalities, arrivals, payments, items = (snapshot_groups_numpy if use_numpy else snapshot_groups)(self.tables, window)
+            nationality_names = self.tables["tourists"].dictionaries["nationality"].values
+            method_names = self.tables["payments"].dictionaries["payment_method"].values
+        catalog = get_catalog()
+        by_count = lambda groups: sorted(groups.items(), key=lambda group: (-group[1], group[0]))
+        return {
+            "date_from": date_from,
+            "date_to": date_to,
+            "tourists": tourists,
+            "nationalities": [{"nationality": nationality_names[code], "tourists": count}
+                              for code, count in by_count(nationalities)[:top]],
+            "payments": [{"payment_method": method_names[code], "total_amount": total, "transactions": count}
+                         for code, (total, count) in sorted(payments.items(), key=lambda group: -group[1][0])],
+            "arrivals": [{"arrival_date": date.fromordinal(day).isoformat() if day else None, "tourists": arrivals[day]}
+                         for day in sorted(arrivals, reverse=True)[:top]],
+            "popular": [{"category": catalog.items[item_id][0] if item_id in catalog.items else None,
+                         "choice": catalog.items[item_id][1] if item_id in catalog.items else None, "selections": count}
+                        for item_id, count in by_count(items)[:top]],
+        }
+
+def snapshot_groups(tables, window): # Pure-Python group-bys; returns (tourists, {nationality code: n}, {day: n}, {method code: (total, n)}, {item: n})
+    from collections import Counter
+    tourists, selections, payments = tables["tourists"], tables["selections"], tables["payments"]
+    first, last = window or (None, None)
+    in_window = (lambda day: first <= day <= last) if window else (lambda day: True)
+    nationalities, arrivals, selected = Counter(), Counter(), Counter()
+    arrived = set() if window else None
+    for tourist_id, nationality, day in zip(tourists.keys, tourists.columns["nationality"], tourists.columns["entry_day"]):
+        if in_window(day):
+            nationalities[nationality] += 1
+            arrivals[day] += 1
+            if window:
+                arrived.add(tourist_id)
+    method_totals = {}
+    for method, amount, day in zip(payments.columns["payment_method"], payments.columns["amount"], payments.columns["payment_day"]):
+        if in_window(day):
+            total, count = method_totals.get(method, (0.0, 0))
+            method_totals[method] = (total + amount, count + 1)
+    for tourist_id, item_id in zip(selections.columns["tourist_id"], selections.columns["item_id"]):
+        if arrived is None or tourist_id in arrived:
+            selected[item_id] += 1
+    return sum(nationalities.values()), dict(nationalities), dict(arrivals), method_totals, dict(selected)
+
+def snapshot_groups_numpy(tables, window): # Same group-bys vectorized over zero-copy NumPy views of the arrays
+    import numpy
+    view = lambda column: numpy.frombuffer(column, dtype=column.typecode)
+    tourists, selections, payments = tables["tourists"], tables["selections"], tables["payments"]
+    entry_days, payment_days = view(tourists.columns["entry_day"]), view(payments.columns["payment_day"])
+    arrived = (entry_days >= window[0]) & (entry_days <= window[1]) if window else slice(None)
+    paid = (payment_days >= window[0]) & (payment_days <= window[1]) if window else slice(None)
+
+    nationality_codes = view(tourists.columns["nationality"])[arrived]
+    nationalities = numpy.bincount(nationality_codes, minlength=len(tourists.dictionaries["nationality"].values))
+    days, day_counts = numpy.unique(entry_days[arrived], return_counts=True)
+    methods = view(payments.columns["payment_method"])[paid]
+    size = len(payments.dictionaries["payment_method"].values)
+    method_totals = numpy.bincount(methods, weights=view(payments.columns["amount"])[paid], minlength=size)
+    method_counts = numpy.bincount(methods, minlength=size)
+    item_ids = view(selections.columns["item_id"])
+    if window: # Keep the selections whose tourist arrived in the window: find each tourist's row by binary search
+        keys, selection_tourists = view(tourists.keys), view(selections.columns["tourist_id"])
+        rows = numpy.minimum(numpy.searchsorted(keys, selection_tourists), max(len(keys) - 1, 0))
+        item_ids = item_ids[(keys[rows] == selection_tourists) & arrived[rows]] if len(keys) else item_ids[:0]
+    item_counts = numpy.bincount(item_ids)
+    return (len(nationality_codes),
+            {code: int(count) for code, count in enumerate(nationalities.tolist()) if count},
+            dict(zip(days.tolist(), day_counts.tolist())),
+            {code: (float(method_totals[code]), int(method_counts[code])) for code in range(size) if method_counts[code]},
+            {item_id: count for item_id, count in enumerate(item_counts.tolist()) if count})
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+def get_snapshot(): # The process-wide snapshot, loaded on first use and brought up to date on every call
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = AnalyticsSnapshot()
+        snapshot = _snapshot
+    snapshot.refresh()
+    return snapshot
+
+def invalidate_snapshot(): # Drop the snapshot; the next get_snapshot() loads a new one
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+def print_snapshot_footer(snapshot):
+    print(f"\033[2mSnapshot: {snapshot.rows():,} rows in {snapshot.nbytes() / 1e6:,.1f} MB, up to change {snapshot.change_id}.\033[0m")
+
+def analytics_menu():
+    try:
+        date_from = input("📅 Arrived/paid on or after (YYYY-MM-DD, Enter for all): ").strip()
+        date_from = parse_date(date_from, "Start date") if date_from else None
+        date_to = input("📅 Arrived/paid on or before (YYYY-MM-DD, Enter for all): ").strip()
+        date_to = parse_date(date_to, "End date") if date_to else None
+    except ValueError as e:
+        print(f"\033[1;31m{e}\033[0m")
+        return
+    snapshot = get_snapshot()
+    print_dashboard(snapshot.dashboard(10, date_from, date_to), 10)
+    print_snapshot_footer(snapshot)
+
+# Tourist search
+SEARCH_LIMIT = 20 # Results shown per search
+SEARCH_FUZZY_TERMS = 20 # Most similar indexed terms tried in place of a term that may be misspelled
+SEARCH_RANKED_MAX = 5000 # Rank matches by relevance only when about this many tourists match or fewer
+
+def edit_distance(a, b, limit): # Optimal string alignment distance (typos: insert, delete, substitute, swap), or limit + 1 once over it
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+def prefix_range(prefix): # (low, high) bounds for "starts with prefix" as a range on an index
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def similar_terms(db, term): # Indexed terms within a typo or two of `term` (same first letter), as (term, tourists), most common first
+    limit = 1 if len(term) <= 4 else 2
+    matches = []
+    for candidate, tourists in db.execute(SEARCH_TERMS_SQL, prefix_range(term[0])):
+        # A partly typed word counts too: compare with the start of the candidate, at one extra typo
+        distance = min(edit_distance(term, candidate, limit), edit_distance(term, candidate[:len(term)], limit) + 1)
+        if distance <= limit:
+            matches.append((distance, -tourists, candidate))
+    return [(candidate, -tourists) for _, tourists, candidate in sorted(matches)[:SEARCH_FUZZY_TERMS]]
+
+def search_row(row, match):
+    tourist_id, name, nationality, contact_number, entry_date, exit_date = row
+    return {"tourist_id": tourist_id, "name": name, "nationality": nationality, "contact_number": contact_number,
+            "entry_date": entry_date, "exit_date": exit_date, "match": match}
+
+def search_tourists(text, limit=SEARCH_LIMIT): # Find tourists by contact number prefix, or by name/nationality words
+    import re
+    text = text.strip()
+    number = re.sub(r"[\s().-]", "", text)
+    with report_connection() as db:
+        if re.fullmatch(r"\+?\d{3,}", number): # Looks like a phone number: match it as a prefix, normalized or as typed
+            normalized, digits = contact_prefixes(number)
+            params = prefix_range(normalized) + prefix_range(digits) + (limit,)
+            return [search_row(row, "contact") for row in db.execute(SEARCH_BY_CONTACT_SQL, params)]
+
+        terms = re.findall(r"\w+", text.lower())
+        if not terms:
+            return []
+        # Every word must match the start of a name or nationality word ("mar san" finds Maria Santos)
+        term_tourists = {term: db.execute(SEARCH_TERM_DOCS_SQL, prefix_range(term)).fetchone()[0] for term in terms}
+        sql = SEARCH_BY_NAME_SQL if min(term_tourists.values()) <= SEARCH_RANKED_MAX else SEARCH_BY_NAME_NEWEST_SQL
+        results = [search_row(row, "prefix")
+                   for row in db.execute(sql, (" AND ".join(f'"{term}"*' for term in terms), limit))]
+        if len(results) < limit: # Fill up with tourists whose words are a typo or two away from what was typed
+            groups, matches = [], []
+            for term in terms:
+                similar = similar_terms(db, term)
+                matches.append(term_tourists[term] + sum(tourists for _, tourists in similar))
+                groups.append("(" + " OR ".join([f'"{term}"*'] + [f'"{candidate}"' for candidate, _ in similar]) + ")")
+            sql = SEARCH_BY_NAME_SQL if min(matches) <= SEARCH_RANKED_MAX else SEARCH_BY_NAME_NEWEST_SQL
+            found = {result["tourist_id"] for result in results}
+            for row in db.execute(sql, (" AND ".join(groups), limit + len(found))):
+                if row[0] not in found and len(results) < limit:
+                    results.append(search_row(row, "similar"))
+        return results
+
+def print_search_results(results):
+    if not results:
+        print("\033[1;31mNo matching tourists found.\033[0m")
+        return
+    with ReportWriter(SEARCH_HEADERS, search_record, heading=search_heading) as report:
+        for result in results:
+            report.write([result[header] for header in SEARCH_HEADERS])
+
+def search_tourists_menu():
+    print("\033[1;36m" + " " * 28 + "🔎 Search Tourists\033[0m")
+    print("=" * 80)
+    text = input("Name, nationality or contact number: ").strip()
+    if text:
+        print_report_age()
+        print("-" * 80)
+        print_search_results(search_tourists(text))
+    print("=" * 80)
+
+# Paginated tourist report
+REPORT_PAGE_SIZE = 20 # Tourists shown per page in the View All report
+
+def tourist_report_query(nationality=None, date_from=None, date_to=None): # Build the report SQL and its filter parameters
+    conditions, params = [], []
+    if nationality:
+        conditions.append("t.nationality = ?")
+        params.append(nationality)
+    if date_from: # Stays that overlap the window: still on the island on or after date_from...
+        conditions.append("t.exit_date >= ?")
+        params.append(day_number(date_from, "from"))
+    if date_to: # ...and arrived on or before date_to
+        conditions.append("t.entry_date <= ?")
+        params.append(day_number(date_to, "to"))
+    query = f"""
+    SELECT t.tourist_id, t.name, t.age, t.nationality, t.contact_number, {display_value("t.entry_date")}, {display_value("t.exit_date")},
+           (SELECT GROUP_CONCAT(c.name || ': ' || i.name, '; ')
+            FROM selections s
+            JOIN catalog_items i ON i.item_id = s.item_id
+            JOIN categories c ON c.category_id = i.category_id
+            WHERE s.tourist_id = t.tourist_id) AS selections
+    FROM tourists t
+    WHERE t.tourist_id > ? {"".join(" AND " + condition for condition in conditions)}
+    ORDER BY t.tourist_id
+    LIMIT ?
+    """
+    return query, params
+
+def tourist_report_pages(nationality=None, date_from=None, date_to=None, page_size=REPORT_PAGE_SIZE):
+    # Yield pages of tourists (with their selections folded into one column), paging by tourist_id.
+    # Each page seeks straight past the last ID seen instead of using OFFSET, so later pages cost the same as the first.
+    query, params = tourist_report_query(nationality, date_from, date_to)
+    last_id = 0
+    while True:
+        with report_connection() as db: # Only hold a connection while fetching, not while the admin reads the page
+            page = db.execute(query, [last_id] + params + [page_size]).fetchmany(page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1][0]
+
+def view_all_tourists():
+    print("\n\033[1;32mAll Tourists:\033[0m")
+    print("=" * 80)
+    print("\033[1;33mFilters (press Enter to skip):\033[0m")
+    nationality_filter = input("🌍 Nationality: ").strip() or None
+    try:
+        date_from = input("📅 Staying on or after (YYYY-MM-DD): ").strip()
+        date_from = parse_date(date_from, "Start date") if date_from else None
+        date_to = input("📅 Staying on or before (YYYY-MM-DD): ").strip()
+        date_to = parse_date(date_to, "End date") if date_to else None
+    except ValueError as e:
+        print(f"\033[1;31m{e}\033[0m")
+        return
+    print_report_age()
+    print("=" * 80)
+
+    shown = 0
+    with ReportWriter(TOURIST_REPORT_HEADERS, tourist_record) as report:
+        for page in tourist_report_pages(nationality_filter, date_from, date_to, REPORT_PAGE_SIZE):
+            for row in page:
+                report.write(row)
+            shown += len(page)
+            if len(page) == REPORT_PAGE_SIZE:
+                report.flush()
+                more = input(f"\033[1;37m{shown} shown. Press Enter for the next page or 'q' to stop: \033[0m").strip().lower()
+                if more == "q":
+                    break
+    if shown == 0:
+        print("\033[1;31mNo tourists found.\033[0m")
+        print("=" * 80)
+
+# Bulk manifest import
+IMPORT_CHUNK_SIZE = 500 # Rows written per transaction during a bulk import
+MAX_AMOUNT_PAID = 100_000_000 # Largest payment accepted, in pesos; anything larger is a typo
+MAX_AGE = 150 # Oldest age accepted from a manifest or the API
+MANIFEST_FIELDS = ["name", "age", "sex", "nationality", "contact_number", "entry_date", "exit_date",
+                   "selections", "payment_method", "amount_paid", "payment_date"]
+
+def read_manifest(path): # Stream a CSV or JSONL manifest as (line number, row, error) triples, one row at a time
+    import csv, json  # Imported on use to keep `import galeragate` fast (see check-import)
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_no, None, f"invalid JSON: {e}"
+                    continue
+                if isinstance(row, dict):
+                    yield line_no, row, None
+                else:
+                    yield line_no, None, "expected a JSON object"
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row, None
+
+def parse_date(value, field): # Validate a YYYY-MM-DD date and return it in canonical form
+    try:
+        return date.fromisoformat(str(value).strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"{field} must be a date in YYYY-MM-DD format, got {value!r}")
+
+def parse_amount(value, field): # Validate an amount in pesos: a finite number from 0 to MAX_AMOUNT_PAID
+    try:
+        amount = float(value) if not isinstance(value, bool) else math.nan
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    if not (math.isfinite(amount) and 0 <= amount <= MAX_AMOUNT_PAID): # float() also accepts "nan", "inf" and "1e400"
+        raise ValueError(f"{field} must be between 0 and {MAX_AMOUNT_PAID:,}, got {value!r}")
+    return amount
+
+def parse_manifest_selections(value): # Accept "Resort=Mermaid Resort|Places=White Beach" or a JSON list of pairs/objects; returns item IDs
+    if value is None:
+        return []
+    if isinstance(value, str):
+        items = [item.split("=", 1) for item in value.split("|") if item.strip()]
+    elif isinstance(value, list): # JSON values, so anything else in the list is a per-row error, not a crash
+        items = [(item.get("category"), item.get("choice")) if isinstance(item, dict) else item for item in value]
+    else:
+        raise ValueError(f"selections must be text or a list, got {value!r}")
+    selections = []
+    for item in items:
+        if not isinstance(item, (list, tuple)) or len(item) != 2 or not all(isinstance(part, str) for part in item):
+            raise ValueError(f"invalid selection {item!r}, expected Category=Choice")
+        category, choice = (str(part).strip() for part in item)
+        item_id = get_catalog().ids.get((category, choice))
+        if item_id is None:
+            raise ValueError(f"unknown selection {category}: {choice}")
+        selections.append(item_id)
+    return selections
+
+def parse_manifest_row(row): # Validate one manifest row and return (tourist values, selections, payment values or None)
+    name = str(row.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    try:
+        age = int(str(row.get("age")).strip())
+    except ValueError:
+        raise ValueError(f"age must be a number, got {row.get('age')!r}")
+    if not 0 < age <= MAX_AGE: # Also keeps huge JSON numbers from overflowing SQLite's INTEGER
+        raise ValueError(f"age must be between 1 and {MAX_AGE}, got {age}")
+    entry_date = parse_date(row.get("entry_date"), "entry_date")
+    exit_date = parse_date(row.get("exit_date"), "exit_date")
+    if exit_date < entry_date:
+        raise ValueError("exit_date is before entry_date")
+    tourist = (name, age, str(row.get("sex") or "").strip(), str(row.get("nationality") or "").strip(),
+               normalize_contact(row.get("contact_number")), entry_date, exit_date)
+
+    selections = parse_manifest_selections(row.get("selections"))
+    return tourist, selections, parse_payment(row)
+
+def parse_payment(row): # Validate payment_method/amount_paid/payment_date; returns the payment values, or None without a method
+    payment_method = str(row.get("payment_method") or "").strip()
+    if not payment_method:
+        return None
+    if payment_method not in PAYMENT_METHODS.values():
+        raise ValueError(f"unknown payment method {payment_method!r}")
+    return payment_method, parse_amount(row.get("amount_paid"), "amount_paid"), parse_date(row.get("payment_date"), "payment_date")
+
+def insert_manifest_chunk(chunk): # Write a chunk of parsed rows in one transaction and return the assigned tourist IDs
+    flush_writes() # The sequence arithmetic below only holds if the chunk's IDs follow every check-in queued before it
+    with transaction() as db:
+        db.executemany(INSERT_TOURIST_SQL, [stored_tourist(tourist) for _, tourist, _, _ in chunk])
+        # The write lock is held until commit, so the chunk received consecutive IDs ending at the sequence value
+        last_id = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tourists'").fetchone()[0]
+        tourist_ids = range(last_id - len(chunk) + 1, last_id + 1)
+
+        db.executemany(INSERT_SELECTION_SQL,
+                           [(tourist_id, item_id)
+                            for tourist_id, (_, _, selections, _) in zip(tourist_ids, chunk)
+                            for item_id in selections])
+        db.executemany(INSERT_PAYMENT_SQL,
+                           [(tourist_id,) + stored_payment(payment)
+                            for tourist_id, (_, _, _, payment) in zip(tourist_ids, chunk) if payment])
+    return list(tourist_ids)
+
+def import_manifest(path, chunk_size=IMPORT_CHUNK_SIZE): # Bulk-register tourists from a manifest; returns (tourist IDs, [(line, error)])
+    tourist_ids = []
+    errors = []
+    chunk = []
+
+    def flush():
+        try:
+            tourist_ids.extend(insert_manifest_chunk(chunk))
+        except sqlite3.Error as e: # The whole chunk was rolled back, so report every row in it
+            errors.extend((line_no, f"database error: {e}") for line_no, _, _, _ in chunk)
+        chunk.clear()
+
+    for line_no, row, error in read_manifest(path):
+        if error is None:
+            try:
+                chunk.append((line_no,) + parse_manifest_row(row))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            errors.append((line_no, error))
+        elif len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return tourist_ids, errors
+
+def print_import_summary(tourist_ids, errors, max_errors=20):
+    print(f"\033[1;32m✅ Imported {len(tourist_ids)} tourists.\033[0m")
+    if tourist_ids:
+        print(f"\033[1;33mTourist IDs: \033[0m{str(tourist_ids[0]).zfill(4)} - {str(tourist_ids[-1]).zfill(4)}")
+    if errors:
+        print(f"\033[1;31m❌ {len(errors)} rows were skipped:\033[0m")
+        for line_no, error in errors[:max_errors]:
+            print(f"  Line {line_no}: {error}")
+        if len(errors) > max_errors:
+            print(f"  ... and {len(errors) - max_errors} more")
+
+def bulk_import_menu():
+    print("\033[1;36m" + " " * 25 + "📥 Bulk Import Manifest\033[0m")
+    print("=" * 80)
+    print("Columns: " + ", ".join(MANIFEST_FIELDS))
+    path = input("\033[1;33mEnter manifest path (.csv or .jsonl): \033[0m").strip()
+    try:
+        tourist_ids, errors = import_manifest(path)
+    except OSError as e:
+        print(f"\033[1;31mCould not read manifest: {e}\033[0m")
+    else:
+        print_import_summary(tourist_ids, errors)
+    print("=" * 80)
+
+# Change-data export: streams tourists, selections and payments to one file per table, either every row or only the
+# rows changed since a consumer's watermark. Changed rows come from the change log, collapsed to the latest change per
+# row and joined to the row's current values; a row that no longer exists is written as a delete with just its key.
+EXPORT_FORMATS = ["ndjson", "csv", "parquet"] # Parquet needs pyarrow; the other two only the standard library
+EXPORT_NAME = "analytics" # Default watermark name; each downstream consumer can keep its own
+EXPORT_BATCH_ROWS = 10000 # Rows per Parquet row group
+CHANGE_LOG_RETENTION = 1_000_000 # change_log entries kept whether or not any consumer has seen them (as in change_log_retention)
+# Export -> (table, column -> type); category and choice are looked up in the catalog rather than stored in selections
+EXPORT_TABLES = {
+    "tourists": ("tourists", {"tourist_id": "int", "name": "text", "age": "int", "sex": "text", "nationality": "text",
+                              "contact_number": "text", "entry_date": "text", "exit_date": "text"}),
+    "selections": ("selections", {"tourist_id": "int", "item_id": "int", "category": "text", "choice": "text"}),
+    "payments": ("payment_methods", {"payment_id": "int", "tourist_id": "int", "payment_method": "text",
+                                     "amount_paid": "float", "payment_date": "text"}),
+}
+CATALOG_NAME_COLUMNS = ("category", "choice")
+
+def export_table_columns(name): # The columns an export reads from its table; the row key comes first
+    return [column for column in EXPORT_TABLES[name][1] if column not in CATALOG_NAME_COLUMNS]
+
+def export_rows_sql(name): # Every row of an export's table, in key order
+    table, _ = EXPORT_TABLES[name]
+    row_id, item_id = CHANGE_LOG_TABLES[table]
+    return f"SELECT {', '.join(map(display_value, export_table_columns(name)))} FROM {table} ORDER BY {row_id}{f', {item_id}' if item_id else ''}"
+
+def changed_rows_sql(name): # Rows changed in a (since, until] change_id window with their latest change; deleted rows join to NULLs
+    table, _ = EXPORT_TABLES[name]
+    row_id, item_id = CHANGE_LOG_TABLES[table]
+    # With MAX(), SQLite takes the bare operation column from the row holding the maximum, i.e. the latest change
+    return f"""
+    SELECT c.change_id, c.operation, c.row_id, c.item_id, {', '.join(display_value('t.' + column) for column in export_table_columns(name))}
+    FROM (
+        SELECT row_id, item_id, MAX(change_id) AS change_id, operation FROM change_log
+        WHERE change_id > ? AND change_id <= ? AND table_name = '{table}'
+        GROUP BY row_id, item_id
+    ) AS c
+    LEFT JOIN {table} AS t ON t.{row_id} = c.row_id{' AND t.item_id = c.item_id' if item_id else ''}
+    ORDER BY c.change_id
+    """
+
+def iter_export_records(db, name, since, until, catalog): # (operation, change_id, values) for one export; since=None exports every row
+    table, columns = EXPORT_TABLES[name]
+    with_names = "category" in columns
+    if since is None:
+        rows = ((until, None, None, None, *row) for row in db.execute(export_rows_sql(name)))
+    else:
+        rows = db.execute(changed_rows_sql(name), (since, until))
+    for change_id, logged, row_id, item_id, *values in rows:
+        operation = "upsert"
+        if values[0] is None: # No longer in the table: report its key, and whether it was deleted or archived
+            operation = "archive" if logged == "archive" else "delete"
+            values[0] = row_id
+            if CHANGE_LOG_TABLES[table][1]:
+                values[1] = item_id
+        if with_names:
+            category, choice, _ = catalog.items.get(values[1], (None, None, None))
+            values += [category, choice]
+        yield operation, change_id, values
+
+def last_change_id(db): # The newest change_id handed out, even if pruned since
+    return (db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone() or (0,))[0]
+
+def trim_change_log(db, keep=None): # Keep only the newest `keep` change_log entries; returns the number removed
+    # Consumers whose watermark falls behind the trimmed entries get a full export next time (see export_changes)
+    return db.execute(TRIM_CHANGE_LOG_SQL, (CHANGE_LOG_RETENTION if keep is None else keep,)).rowcount
+
+def change_log_complete(db, since, until): # Whether every change in (since, until] is still logged
+    # Pruning and trimming only ever remove the oldest entries, so the log is complete from its first entry on
+    oldest = db.execute("SELECT MIN(change_id) FROM change_log").fetchone()[0]
+    return since >= until or oldest is not None and oldest <= since + 1
+
+def parquet_value(value, kind): # Coerce a SQLite value to its Parquet column type
+    if value is None or kind == "int" and not str(value).lstrip("-").isdigit():
+        return None
+    return int(value) if kind == "int" else float(value) if kind == "float" else str(value)
+
+class ExportFile: # One export's records, written to a temporary file that commit() renames into place
+    def __init__(self, path, name, output_format):
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.kinds = {"_op": "text", "_change_id": "int", **EXPORT_TABLES[name][1]}
+        self.output_format = output_format
+        self.count = 0
+        self.batch = []
+        if output_format == "parquet":
+            import pyarrow, pyarrow.parquet
+            types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "text": pyarrow.string()}
+            self.schema = pyarrow.schema([(column, types[kind]) for column, kind in self.kinds.items()])
+            self.writer = pyarrow.parquet.ParquetWriter(self.temp_path, self.schema)
+        else:
+            import csv
+            self.file = open(self.temp_path, "w", encoding="utf-8", newline="")
+            if output_format == "csv":
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(self.kinds)
+
+    def write(self, operation, change_id, values):
+        self.count += 1
+        self.batch.append([operation, change_id] + values)
+        if len(self.batch) >= (EXPORT_BATCH_ROWS if self.output_format == "parquet" else REPORT_CHUNK_ROWS):
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        if self.output_format == "parquet":
+            import pyarrow
+            columns = [[parquet_value(value, kind) for value in column] for column, kind in zip(zip(*self.batch), self.kinds.values())]
+            self.writer.write_table(pyarrow.Table.from_arrays([pyarrow.array(column, type=field.type)
+                                                               for column, field in zip(columns, self.schema)], schema=self.schema))
+        elif self.output_format == "csv":
+            self.writer.writerows(self.batch)
+        else:
+            import json
+            names = list(self.kinds)
+            self.file.write("".join(json.dumps(dict(zip(names, record)), ensure_ascii=False) + "\n" for record in self.batch))
+        self.batch = []
+
+    def close(self):
+        self.flush()
+        (self.writer if self.output_format == "parquet" else self.file).close()
+
+    def commit(self): # Publish the file only once every export in the run is complete
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+def export_changes(directory, output_format="ndjson", name=EXPORT_NAME, full=False):
+    # Write the rows changed since watermark `name` (every row with full=True, or on the first export under that name)
+    # to <export>-<since>-<until>.<format> files in `directory`, then advance the watermark and prune the change log
+    # below the oldest watermark. A watermark older than the retained change log also gets every row, as the changes
+    # in between are gone. Returns (since or None, until, {export: records}, seconds taken).
+    if output_format == "parquet":
+        try:
+            import pyarrow.parquet # noqa: F401 -- checked up front so nothing is half-written without it
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow); use ndjson or csv instead")
+    started = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    catalog = get_catalog()
+    files = []
+    try:
+        with connection() as db:
+            db.execute("BEGIN") # One read snapshot, so the watermark and every table agree
+            try:
+                until = last_change_id(db)
+                since = None if full else (db.execute(WATERMARK_SQL, (name,)).fetchone() or (None,))[0]
+                if since is not None and not change_log_complete(db, since, until):
+                    since = None
+                for export in EXPORT_TABLES:
+                    path = os.path.join(directory, f"{export}-{'full' if since is None else since}-{until}.{output_format}")
+                    files.append(ExportFile(path, export, output_format))
+                    for record in iter_export_records(db, export, since, until, catalog):
+                        files[-1].write(*record)
+                    files[-1].close()
+            finally:
+                db.rollback()
+    except BaseException:
+        for export_file in files:
+            export_file.discard()
+        raise
+    for export_file in files:
+        export_file.commit()
+    # Advance the watermark only after the files are in place: a crash in between re-exports the same changes next time
+    with transaction() as db:
+        db.execute(SET_WATERMARK_SQL, (name, until))
+        db.execute(PRUNE_CHANGE_LOG_SQL)
+    return since, until, {export: export_file.count for export, export_file in zip(EXPORT_TABLES, files)}, time.perf_counter() - started
+
+def print_change_export_summary(directory, since, until, counts, seconds):
+    window = "all rows" if since is None else f"changes {since + 1}-{until}" if until > since else "no new changes"
+    print(f"\033[1;32m✅ Exported {window} to {directory} in {seconds:.2f}s: "
+          + ", ".join(f"{count:,} {export}" for export, count in counts.items()) + ".\033[0m")
+
+# Archival: tourists whose stay ended before a cutoff move, with their selections and payments, into an archive
+# database attached next to the main one, a batch per transaction so kiosks only ever wait for one batch. Archived
+# rows get their own archive_id because a table reset reuses tourist and payment IDs. The hot tables, their indexes
+# and the summaries then hold only the active set; compact_database() hands the freed pages back to the filesystem.
+ARCHIVE_PATH = os.environ.get("GALERAGATE_ARCHIVE") # None archives to <database>-archive.db next to the database
+ARCHIVE_AFTER_DAYS = 30 # Default cutoff: tourists who left more than this many days ago
+ARCHIVE_BATCH_SIZE = 1000 # Tourists moved per transaction
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archive.tourists (
+        archive_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tourist_id INTEGER NOT NULL,
+        name VARCHAR (300) NOT NULL,
+        age INTEGER,
+        sex VARCHAR (10),
+        nationality VARCHAR (100),
+        contact_number TEXT, -- TEXT keeps any leading zero the active table still has
+        entry_date DATE,
+        exit_date DATE,
+        archived_at TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_tourists_id ON tourists (tourist_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_tourists_exit ON tourists (exit_date)",
+    # Catalog names are copied too, since an option can be removed from the catalog once no active tourist has it
+    """
+    CREATE TABLE IF NOT EXISTS archive.selections (
+        archive_id INTEGER NOT NULL REFERENCES tourists(archive_id),
+        item_id INTEGER NOT NULL,
+        category VARCHAR (100),
+        choice VARCHAR (100),
+        PRIMARY KEY (archive_id, item_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS archive.payment_methods (
+        archive_id INTEGER NOT NULL REFERENCES tourists(archive_id),
+        payment_id INTEGER NOT NULL,
+        payment_method VARCHAR (100),
+        amount_paid REAL,
+        payment_date DATE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_payments ON payment_methods (archive_id)",
+    "CREATE TEMP TABLE IF NOT EXISTS archive_batch (tourist_id INTEGER PRIMARY KEY, archive_id INTEGER)",
+]
+
+def archive_path(): # Where archive_departed() writes by default
+    if ARCHIVE_PATH:
+        return ARCHIVE_PATH
+    path = (pool or init_db()).path
+    if path == ":memory:": # An archive next to it would be in memory too, and gone with the process
+        raise ValueError("the database is in memory; give an archive file to archive to")
+    return os.path.splitext(path)[0] + "-archive.db"
+
+def archive_batch(db, archive, cutoff, batch_size, archived_at):
+    # Move one batch: `archive` (a second connection to the database, with the archive attached) copies it and commits,
+    # then `db`, which holds the write lock (BEGIN IMMEDIATE), deletes it. Returns (tourists, selections, payments)
+    # copied, or None once no tourist left before `cutoff`.
+    import json
+    tourist_ids = db.execute(ARCHIVE_CANDIDATES_SQL, (day_number(cutoff, "cutoff"), batch_size)).fetchall()
+    if not tourist_ids:
+        return None
+    archive.execute("BEGIN") # Sees the rows as db does: db has the write lock and has not written yet
+    try:
+        archive.execute("DELETE FROM temp.archive_batch")
+        archive.executemany("INSERT INTO temp.archive_batch (tourist_id) VALUES (?)", tourist_ids)
+        archive.execute(ARCHIVE_SKIP_COPIED_SQL)
+        first_archive_id = (archive.execute("SELECT seq FROM archive.sqlite_sequence WHERE name = 'tourists'").fetchone() or (0,))[0] + 1
+        tourists = archive.execute(ARCHIVE_TOURISTS_SQL, (archived_at,)).rowcount
+        archive.execute(ARCHIVE_IDS_SQL, (first_archive_id,))
+        selections = archive.execute(ARCHIVE_SELECTIONS_SQL).rowcount
+        payments = archive.execute(ARCHIVE_PAYMENTS_SQL).rowcount
+        archive.commit()
+    except BaseException:
+        archive.rollback()
+        raise
+    before_delete = last_change_id(db)
+    db.execute(ARCHIVE_DELETE_SQL, (json.dumps([tourist_id for tourist_id, in tourist_ids]),)) # Cascades
+    # Tell change-data exports these rows moved to the archive rather than being deleted
+    db.execute("UPDATE change_log SET operation = 'archive' WHERE change_id > ?", (before_delete,))
+    return tourists, selections, payments
+
+def archive_departed(cutoff, path=None, batch_size=ARCHIVE_BATCH_SIZE):
+    # Archive every tourist whose exit_date is before `cutoff` (YYYY-MM-DD); returns the counts moved and seconds taken.
+    # SQLite commits a transaction over attached WAL databases one file at a time, so a crash could keep one half of
+    # it: a batch deleted but never copied. Instead each batch commits its copy in the archive (synchronous = FULL, so
+    # it is on disk) before its delete commits in the database. A crash in between leaves the batch in both, and the
+    # next run deletes it without copying it again.
+    live_path = (pool or init_db()).path
+    if live_path == ":memory:": # The copying connection could not see it
+        raise ValueError("the database is in memory; archiving needs a database file")
+    path = path or archive_path()
+    if path == ":memory:":
+        raise ValueError("archiving to memory would discard the archived tourists; give an archive file")
+    started = time.perf_counter()
+    archived_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    totals = {"tourists": 0, "selections": 0, "payments": 0, "batches": 0}
+    flush_writes() # A departed tourist's queued edit would otherwise land after the tourist had moved
+    archive = open_connection(live_path)
+    try:
+        archive.execute("ATTACH DATABASE ? AS archive", (path,))
+        archive.execute("PRAGMA archive.journal_mode = WAL").fetchone() # As for the main database: no rollback journal per batch
+        archive.execute("PRAGMA archive.synchronous = FULL")
+        for statement in ARCHIVE_SCHEMA:
+            archive.execute(statement)
+        while True:
+            with transaction() as db:
+                moved = archive_batch(db, archive, cutoff, batch_size, archived_at)
+            profiles.clear()
+            if moved is None:
+                break
+            totals["batches"] += 1
+            for key, count in zip(("tourists", "selections", "payments"), moved):
+                totals[key] += count
+    finally:
+        archive.close()
+    with transaction() as db: # Each archived row added change_log entries; keep the log bounded even with no consumers
+        trim_change_log(db)
+    expire_replica() # Reports should not keep showing a whole archive run's tourists as active
+    return dict(totals, path=path, seconds=time.perf_counter() - started)
+
+def clear_tables(): # Empty tourists, selections and payments in one transaction and restart their IDs at 1
+    flush_writes() # Nothing queued before the reset may land in the emptied tables
+    with connection() as db:
+        # Without triggers or foreign key checks, SQLite truncates a table instead of deleting row by row. The pragma
+        # cannot change inside a transaction, and the triggers are dropped and recreated inside this one.
+        db.execute("PRAGMA foreign_keys = OFF")
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                triggers = db.execute(f"""
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'trigger' AND tbl_name IN ({', '.join('?' * len(CHANGE_LOG_TABLES))})
+                """, list(CHANGE_LOG_TABLES)).fetchall()
+                if db.execute("SELECT 1 FROM export_watermarks LIMIT 1").fetchone():
+                    for table, (row_id, item_id) in CHANGE_LOG_TABLES.items(): # One statement per table, not a trigger per row
+                        db.execute(f"""
+                        INSERT INTO change_log (table_name, row_id, item_id, operation)
+                        SELECT '{table}', {row_id}, {item_id or 'NULL'}, 'delete' FROM {table}
+                        """)
+                else: # No consumer has exported yet, and a first export is always a full one
+                    db.execute("DELETE FROM change_log")
+                    # Skip a change_id, so the analytics snapshot sees a gap (as after pruning) and reloads
+                    db.execute("UPDATE sqlite_sequence SET seq = seq + 1 WHERE name = 'change_log'")
+                for name, _ in triggers:
+                    db.execute(f"DROP TRIGGER {name}")
+                for table in CHANGE_LOG_TABLES:
+                    db.execute(f"DELETE FROM {table}")
+                db.execute("INSERT INTO tourist_search (tourist_search) VALUES ('delete-all')")
+                rebuild_summaries(db)
+                db.execute(f"DELETE FROM sqlite_sequence WHERE name IN ({', '.join('?' * len(CHANGE_LOG_TABLES))})",
+                           list(CHANGE_LOG_TABLES))
+                for _, sql in triggers:
+                    db.execute(sql)
+            except BaseException:
+                db.rollback()
+                raise
+            db.commit()
+        finally:
+            db.execute("PRAGMA foreign_keys = ON")
+    profiles.clear()
+    expire_replica()
+
+def database_bytes(db):
+    return db.execute("PRAGMA page_count").fetchone()[0] * db.execute("PRAGMA page_size").fetchone()[0]
+
+def compact_database(): # Rewrite the database without its free pages; returns (bytes before, bytes after)
+    with connection() as db:
+        before = database_bytes(db)
+        trim_change_log(db) # Before VACUUM, so the trimmed entries' pages are reclaimed too
+        db.execute("INSERT INTO tourist_search (tourist_search) VALUES ('optimize')") # Merge the index's segments
+        db.execute("VACUUM")
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone() # VACUUM wrote the whole database to the WAL
+        db.execute("PRAGMA optimize").fetchall()
+        return before, database_bytes(db)
+
+def print_archive_summary(result):
+    rate = result["tourists"] / result["seconds"] if result["seconds"] else 0
+    print(f"\033[1;32m✅ Archived {result['tourists']:,} tourists, {result['selections']:,} selections and "
+          f"{result['payments']:,} payments to {result['path']} in {result['seconds']:.2f}s "
+          f"({result['batches']} batches, {rate:,.0f} tourists/s).\033[0m")
+
+def print_compact_summary(before, after):
+    print(f"\033[1;32m✅ Compacted the database from {before / 1e6:,.1f} MB to {after / 1e6:,.1f} MB.\033[0m")
+
+def archive_menu():
+    print("\033[1;36m" + " " * 24 + "🗄️ Archive Departed Tourists\033[0m")
+    print("=" * 80)
+    default = date.fromordinal(date.today().toordinal() - ARCHIVE_AFTER_DAYS).isoformat()
+    cutoff = input(f"📅 Archive tourists who left before (YYYY-MM-DD) [{default}]: ").strip()
+    try:
+        cutoff = parse_date(cutoff, "Cutoff date") if cutoff else default
+    except ValueError as e:
+        print(f"\033[1;31m{e}\033[0m")
+        return
+    try:
+        print_archive_summary(archive_departed(cutoff))
+    except ValueError as e:
+        print(f"\033[1;31m{e}\033[0m")
+        return
+    if input("\033[1;33mCompact the database now? (y/N): \033[0m").strip().lower() == "y":
+        print_compact_summary(*compact_database())
+    print("=" * 80)
+
+# Report replica: with --report-replica (or GALERAGATE_REPORT_REPLICA=1), admin reports read a copy of the database
+# instead of the live file the kiosks write to. The copy is taken with SQLite's online backup API, REPLICA_PAGES_PER_STEP
+# pages at a time with a pause between steps, inside one read transaction on the live database: in WAL mode that never
+# blocks a writer, and it pins the snapshot being copied so kiosk commits cannot restart the copy. The finished copy
+# is switched to a rollback journal and renamed over the previous one, which reports still reading it keep reading.
+# A background thread refreshes it every half REPLICA_MAX_AGE_SECONDS; a report that finds it older refreshes it first.
+REPORT_REPLICA = os.environ.get("GALERAGATE_REPORT_REPLICA") == "1"
+REPLICA_PATH = os.environ.get("GALERAGATE_REPLICA") # None keeps the replica in <database>-replica.db next to the database
+REPLICA_MAX_AGE_SECONDS = 60 # Staleness bound: reports never read a copy older than this
+REPLICA_PAGES_PER_STEP = 64 # Pages copied per backup step (256 KiB at the default page size)
+REPLICA_STEP_PAUSE_MS = 1 # Pause between steps, so the copy leaves the disk and the GIL to kiosk threads
+
+class ReportReplica: # A read-only copy of the database for reports; see report_connection()
+    def __init__(self, source, path, max_age):
+        self.source = source
+        self.path = path
+        self.max_age = max_age
+        self.taken_at = None # time.time() when the current copy's snapshot was taken; None until the first copy
+        self.refreshes = 0
+        self.copy_seconds = 0.0 # How long the latest copy took
+        self.pages = 0 # Pages in the latest copy
+        self.failures = 0
+        self._lock = threading.Lock() # One copy at a time
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="galeragate-report-replica", daemon=True)
+        self._thread.start()
+
+    def age(self): # Seconds since the current copy's snapshot was taken, or None without one
+        return None if self.taken_at is None else time.time() - self.taken_at
+
+    def fresh_age(self): # Refresh the copy if it is past the staleness bound; returns its age
+        age = self.age()
+        if age is None or age > self.max_age:
+            with self._lock:
+                age = self.age() # Another thread may have refreshed it while this one waited for the lock
+                if age is None or age > self.max_age:
+                    self._copy()
+                    age = self.age()
+        return age
+
+    def refresh(self):
+        with self._lock:
+            self._copy()
+
+    def expire(self): # Make the next report take a new copy, e.g. after a bulk change it should not miss
+        self.taken_at = None
+
+    def _copy(self):
+        begin = time.perf_counter()
+        temp_path = self.path + ".tmp"
+        if os.path.exists(temp_path): # Left over from a copy that was interrupted
+            os.remove(temp_path)
+        source = sqlite3.connect(self.source, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        target = sqlite3.connect(temp_path, isolation_level=None)
+        try:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone() # Starts the read transaction, fixing the snapshot
+            taken_at = time.time()
+            source.backup(target, pages=REPLICA_PAGES_PER_STEP,
+                          progress=lambda status, remaining, total: time.sleep(REPLICA_STEP_PAUSE_MS / 1000))
+            source.rollback()
+            target.execute("PRAGMA journal_mode = DELETE").fetchone() # A WAL file cannot be opened read-only without its -shm
+            pages = target.execute("PRAGMA page_count").fetchone()[0]
+            target.close()
+            os.replace(temp_path, self.path)
+        except BaseException:
+            target.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            source.close()
+        self.taken_at = taken_at
+        self.refreshes += 1
+        self.pages = pages
+        self.copy_seconds = time.perf_counter() - begin
+
+    def _run(self): # Keep the copy younger than half the staleness bound, so reports rarely wait for one
+        while not self._stop.is_set():
+            age = self.age()
+            if age is None or age >= self.max_age / 2:
+                try:
+                    self.refresh()
+                except (sqlite3.Error, OSError):
+                    self.failures += 1 # The next report retries the copy itself and reports the error
+                age = 0
+            self._stop.wait(self.max_age / 2 - age)
+
+    @contextmanager
+    def connection(self): # A read-only connection to a copy no older than max_age
+        self.fresh_age()
+        uri = "file:" + self.path.replace("%", "%25").replace("?", "%3f").replace("#", "%23")
+        db = sqlite3.connect(uri + "?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        traced = TracedConnection(db) if tracer.enabled else None
+        try:
+            yield traced or db
+        finally:
+            if traced:
+                traced.finish()
+            db.close()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def stats(self):
+        age = self.age()
+        return {"path": self.path, "max_age_seconds": self.max_age, "age_seconds": age, "refreshes": self.refreshes,
+                "pages": self.pages, "copy_seconds": self.copy_seconds, "failures": self.failures}
+
+replica = None # Started by get_replica() on the first report in reporting mode
+_replica_lock = threading.Lock()
+
+def get_replica(): # The report replica in reporting mode, or None when reports read the live database
+    global replica
+    if not REPORT_REPLICA:
+        return None
+    with _replica_lock:
+        if replica is None:
+            path = (pool or init_db()).path
+            if path == ":memory:": # Nothing outside this connection can read an in-memory database
+                return None
+            replica = ReportReplica(path, REPLICA_PATH or os.path.splitext(path)[0] + "-replica.db", REPLICA_MAX_AGE_SECONDS)
+        return replica
+
+def stop_replica(): # Stop refreshing the replica, e.g. before the database is closed
+    global replica
+    with _replica_lock:
+        current, replica = replica, None
+    if current is not None:
+        current.close()
+
+def expire_replica(): # Make the next report read a fresh copy
+    if replica is not None:
+        replica.expire()
+
+@contextmanager
+def report_connection(): # Where admin reports read: the replica in reporting mode, otherwise a pooled live connection
+    report_replica = get_replica()
+    with (report_replica.connection() if report_replica else connection()) as db:
+        yield db
+
+def report_age(): # Age in seconds of the copy reports read (refreshing it if it is too old), or None when they read live
+    report_replica = get_replica()
+    return None if report_replica is None else round(report_replica.fresh_age(), 1)
+
+def print_report_age(stream=None): # The report header line saying how old the data is, in reporting mode
+    report_replica = get_replica()
+    if report_replica is not None:
+        print(f"\033[2m📸 Snapshot taken {report_replica.fresh_age():.0f} s ago "
+              f"(at most {report_replica.max_age:g} s old)\033[0m", file=stream or sys.stdout)
+
+# Query stats
+def print_trace_stats(stats, top=15, slow=5):
+    print(f"\033[1;36mTracing: {'on' if stats['enabled'] else 'off'}   Slow-query threshold: {stats['slow_ms']:g} ms\033[0m")
+    print("-" * 80)
+    print(f"\033[1;33m{'Slowest queries by total time':<44}{'count':>7}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>11}\033[0m")
+    queries = sorted(stats["queries"].items(), key=lambda item: -item[1]["total_ms"])[:top]
+    for sql, histogram in queries:
+        print(f"{sql[:43]:<44}{histogram['count']:>7}{histogram['p50_ms']:>9.2f}{histogram['p99_ms']:>9.2f}{histogram['max_ms']:>11.2f}")
+    if not queries:
+        print("No statements recorded yet.")
+    print("-" * 80)
+    print(f"\033[1;33m{'Database time per flow':<35}{'runs':>6}{'statements':>11}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>10}\033[0m")
+    for name, histogram in sorted(stats["flows"].items()):
+        print(f"{name[:34]:<35}{histogram['count']:>6}{histogram['statements']:>11}{histogram['p50_ms']:>9.2f}"
+              f"{histogram['p99_ms']:>9.2f}{histogram['max_ms']:>10.2f}")
+    print("-" * 80)
+    print(f"\033[1;31mSlow queries (latest {slow} of {len(stats['slow_queries'])}):\033[0m")
+    for entry in stats["slow_queries"][-slow:]:
+        print(f"{entry['at']}  {entry['ms']:.1f} ms  {entry['flow'] or '-'}")
+        print(f"  {entry['sql'][:76]}")
+        for line in entry["plan"]:
+            print(f"    {line}")
+    print("=" * 80)
+
+def print_profile_cache_stats(stats):
+    print(f"\033[1;36mProfile cache: {stats['entries']:,}/{stats['size']:,} profiles   {stats['hits']:,} hits   "
+          f"{stats['misses']:,} misses ({stats['hit_rate']:.0%} hit rate)   {stats['evictions']:,} evicted   "
+          f"{stats['invalidations']:,} invalidated\033[0m")
+    print("=" * 80)
+
+def print_writer_stats(stats):
+    print(f"\033[1;36mGroup commits: {stats['groups']:,} groups   {stats['writes']:,} writes "
+          f"({stats['writes_per_group']:.1f} per group, largest {stats['largest_group']:,})   "
+          f"{stats['failed']:,} failed   {stats['queued']:,} queued\033[0m")
+    print("=" * 80)
+
+def print_replica_stats(stats):
+    age = "no copy yet" if stats["age_seconds"] is None else f"taken {stats['age_seconds']:.0f} s ago"
+    print(f"\033[1;36mReport replica: {age} (max {stats['max_age_seconds']:g} s)   {stats['refreshes']:,} refreshes   "
+          f"last copy {stats['pages']:,} pages in {stats['copy_seconds']:.2f} s   {stats['failures']:,} failed\033[0m")
+    print("=" * 80)
+
+def query_stats_menu():
+    print("\033[1;36m" + " " * 30 + "⏱️ Query Stats\033[0m")
+    print("=" * 80)
+    print_trace_stats(tracer.snapshot())
+    print_profile_cache_stats(profiles.stats())
+    if writer is not None:
+        print_writer_stats(writer.stats())
+    if replica is not None:
+        print_replica_stats(replica.stats())
+    print(f"\033[1;32m[1] {'Disable' if tracer.enabled else 'Enable'} tracing\033[0m")
+    print("\033[1;33m[2] Set slow-query threshold\033[0m")
+    print("\033[1;34m[3] Dump stats to a file\033[0m")
+    print("\033[1;31m[4] Reset stats\033[0m")
+    print("\033[1;35m[5] Back\033[0m")
+    option = input("Enter your choice: ").strip()
+    if option == "1":
+        disable_tracing() if tracer.enabled else enable_tracing()
+        print(f"\033[1;32mTracing {'enabled' if tracer.enabled else 'disabled'}.\033[0m")
+    elif option == "2":
+        value = input(f"Slow-query threshold in ms [{tracer.slow_ms:g}]: ").strip()
+        try:
+            tracer.slow_ms = float(value) if value else tracer.slow_ms
+        except ValueError:
+            print("\033[1;31mPlease enter a number of milliseconds.\033[0m")
+    elif option == "3":
+        path = input("File to write (JSON): ").strip()
+        try:
+            dump_trace_stats(path)
+        except OSError as e:
+            print(f"\033[1;31mCould not write stats: {e}\033[0m")
+        else:
+            print(f"\033[1;32mStats written to {path} ✅\033[0m")
+    elif option == "4":
+        tracer.reset()
+        print("\033[1;32mStats cleared.\033[0m")
+    print("=" * 80)
+
+# Admin panel: each action is a handler in a command table, dispatched from one loop so that
+# nothing from one action (result rows, cursors) outlives it
+def prompt_tourist_id(prompt): # Read a tourist ID, or None if the input is not a number
+    value = input(prompt).strip()
+    if not value.isdigit():
+        print("\033[1;31mPlease enter a numeric Tourist ID. ❌\033[0m")
+        return None
+    return int(value)
+
+def update_tourist_command():
+    tourist_id = prompt_tourist_id("\033[1;33mEnter Tourist ID to update: \033[0m")
+    if tourist_id is not None:
+        edit_personal_info(tourist_id)
+
+def delete_tourist_command():
+    tourist_id = prompt_tourist_id("\033[1;31mEnter Tourist ID to delete: \033[0m")
+    if tourist_id is None:
+        return
+    # Delete the tourist record (its selections and payments cascade), after any of its writes still queued
+    commit_write(lambda db: db.execute(DELETE_TOURIST_SQL, (tourist_id,)), tourist_id=tourist_id)
+    print("\n\033[1;31mTourist deleted successfully. 🗑️\033[0m")
+
+def payment_report():
+    # Display payment records   
+    print("\033[1;32m" + " " * 30 + "All Payment Records: " + "\033[0m")
+    print_report_age()
+    print("-" * 80)
+    with report_connection() as db, ReportWriter(PAYMENT_REPORT_HEADERS, payment_record) as report:
+        for payment in db.execute(PAYMENT_REPORT_SQL): # Rows stream from the cursor into the report's buffer
+            report.write(payment) # Detailed payment record together with its per-method totals
+
+def write_report(name, nationality=None, date_from=None, date_to=None, stream=None): # A whole report without pages or prompts
+    if name == "tourists":
+        with ReportWriter(TOURIST_REPORT_HEADERS, tourist_record, stream) as report:
+            for page in tourist_report_pages(nationality, date_from, date_to, REPORT_CHUNK_ROWS):
+                for row in page:
+                    report.write(row)
+    else:
+        with report_connection() as db, ReportWriter(PAYMENT_REPORT_HEADERS, payment_record, stream) as report:
+            for payment in db.execute(PAYMENT_REPORT_SQL):
+                report.write(payment)
+    return report.rows
+
+# Menu choice -> (color, title, handler); a handler of None leaves the panel
+ADMIN_COMMANDS = {
+    "1": ("\033[1;33m", "👀 View All Tourists", view_all_tourists),
+    "2": ("\033[1;34m", "✏️ Update Tourist Info", update_tourist_command),
+    "3": ("\033[1;35m", "🧑 Count All Tourists", count_tourist),
+    "4": ("\033[1;31m", "🗑️ Delete Tourist", delete_tourist_command),
+    "5": ("\033[1;32m", "💳 View Payment Methods", payment_report),
+    "6": ("\033[1;36m", "🔄 Reset Tables", reset_tables),
+    "7": ("\033[1;33m", "📥 Bulk Import Manifest", bulk_import_menu),
+    "8": ("\033[1;34m", "📊 Dashboard", dashboard),
+    "9": ("\033[1;35m", "📈 Visitor Trends", visitor_trends_menu),
+    "10": ("\033[1;36m", "🗂️ Attraction Catalog", catalog_menu),
+    "11": ("\033[1;33m", "🧾 Export Receipts", export_receipts_menu),
+    "12": ("\033[1;34m", "⏱️ Query Stats", query_stats_menu),
+    "13": ("\033[1;35m", "🔎 Search Tourists", search_tourists_menu),
+    "14": ("\033[1;36m", "🗄️ Archive Departed Tourists", archive_menu),
+    "15": ("\033[1;33m", "🧮 Analytics Snapshot", analytics_menu),
+}
+ADMIN_EXIT = str(len(ADMIN_COMMANDS) + 1) # Always the last number, as Back is in the FAQ
+
+def admin_menu():
+    while True:
+        print("\n" + "=" * 80)
+        print("\033[1;35m"+ " " * 30 + "✨ Admin Panel ✨\033[0m")
+        print("=" * 80)
+        for number, (color, title, _) in ADMIN_COMMANDS.items():
+            print(f"{color}[{number}] {title}\033[0m")
+        print(f"\033[1;32m[{ADMIN_EXIT}] 🚪 Exit\033[0m")
+        choice = input("\nEnter your choice: ").strip()
+        print("=" * 80)
+
+        if choice == ADMIN_EXIT:
+            print("\033[1;36mGoodbye! 👋\033[0m")
+            return
+        if choice not in ADMIN_COMMANDS:
+            print("\033[1;31mInvalid choice. Please try again. ❌\033[0m")
+            continue
+        _, title, handler = ADMIN_COMMANDS[choice]
+        with traced_flow("admin: " + title.split(" ", 1)[1]): # Titles start with an icon
+            handler()
+
+# FAQ: menu choice -> (label, question, answer)
+FAQ_ENTRIES = {
+    "1": ("\033[1;33m", "How do I register as a tourist?",
+          "To register as a tourist, simply choose the 'Tourist' option from the main menu\nand provide your personal information (Name, Age, Sex, Nationality, etc.).\nOnce you submit, you'll receive a unique Tourist ID for your records."),
+    "2": ("\033[1;34m", "What is the Tourist ID and how is it generated?",
+          "The Tourist ID is a unique identifier assigned to each tourist.\nIt is generated automatically when you register with your\ndetails, ensuring no two tourists have the same ID."),
+    "3": ("\033[1;35m", "How do I make selections for resorts, restaurants, and activities?",
+          "Once you're registered, you'll be able to choose from different categories\nlike Resorts, Restaurants, Activities, and Places. Simply\nselect your preferred options, and they will be saved to your profile."),
+    "4": ("\033[1;32m", "Can I edit my personal information after registration?",
+          "Yes! You can always edit your personal information after registration.\nJust visit the 'Edit Personal Information' section and\n update any details like name, age, contact number, etc."),
+    "5": ("\033[1;31m", "How do I delete my selections?",
+          "To delete any selection, simply go to your overall selections and\nchoose the 'Delete Selection' option. You can remove resorts,\nrestaurants, or activities you no longer wish to select."),
+    "6": ("\033[1;37m", "How can I view my reservation and selections?",
+          "You can view your reservation and overall selections by selecting\n'Overall Selection' from the menu. This will show all the\nresorts, restaurants, activities, and places you have chosen."),
+    "7": ("\033[1;36m", "What should I do if I forgot my Tourist ID?",
+          "If you forgot your Tourist ID, you can always contact the admin. They can look you up\nby your name or contact number, even if it is misspelled, and tell you your ID.\nYou can also check any emails or messages confirming your registration."),
+}
+FAQ_BACK = "8"
+
+def faq():
+    while True:
+        print("\033[1;36m"+ " " * 20 + "💬 Frequently Asked Questions (FAQ) 💬" + "\033[0m")
+        print("=" * 80)
+        for number, (color, question, _) in FAQ_ENTRIES.items():
+            print(f"{color}[{number}] {question}\033[0m")
+        print(f"\033[38;5;208m[{FAQ_BACK}] Back to Main Menu ↩️\033[0m")
+        print("=" * 80)
+
+        choice = input("Enter the number of your question: ").strip()
+
+        if choice == FAQ_BACK:
+            print("\nReturning to Main Menu...\n")
+            return  # Goes back to the main menu or previous function
+        if choice in FAQ_ENTRIES:
+            _, question, answer = FAQ_ENTRIES[choice]
+            print(f"\n\033[1;36m{question}\033[0m")
+            print("=" * 80)
+            print(answer)
+        else:
+            print("\033[1;31mInvalid selection. Please choose a valid question number.\033[0m")
+
+        # Prompt user if they want to check more FAQs
+        more_faq = input("\n\033[1;33m" + " " * 15 + "Would you like to see more FAQs? (y/n): " + "\033[0m").strip().lower()
+        if more_faq != "y":
+            print("\033[1;32m" + " " * 15 + "Thank you for using the FAQ service! 😊" + "\033[0m")
+            return
+        
+def main():
+# Main program
+    while True:
+        choice = welcome_screen()
+        if choice == "1":
+            with traced_flow("registration"):
+                tourist_id = tourist_menu()
+            while True:
+                print("=" * 80)
+                print("\033[1;33m[1] 🚪 Proceed to Selection\033[0m")
+                print("\033[1;34m[2] ✏️ Edit My Personal Information\033[0m")
+                print("\033[1;32m[3] ↩️ Back to Main Menu\033[0m")
+                sub_choice = input("Enter your choice: ").strip()
+                print("=" * 80)
+            
+                if sub_choice == "1":
+                    with traced_flow("selection"):
+                        category_selection(tourist_id)
+                elif sub_choice == "2":
+                    with traced_flow("edit personal info"):
+                        edit_personal_info(tourist_id)
+                elif sub_choice == "3":
+                    break
+                else:
+                    print("\033[1;31mInvalid choice, please try again. ❌\033[0m")
+    
+        elif choice == "2":
+            login()
+        
+        elif choice == "3":
+            faq()
+        
+        elif choice == "4":
+            print("\033[1;32m" + " " * 20 +"Thank you for using GaleraGate! Goodbye! 👋" + "\033[0m")
+            print("=" * 80)
+            break
+        else:
+            print("\033[1;31mInvalid option. Please choose a valid option. ❌\033[0m")
+            
+# HTTP/JSON API: an asyncio server parses requests and writes responses, while every handler (and so every
+# database call) runs on a thread pool sized to the connection pool, so a slow query never blocks other kiosks
+API_HOST = "127.0.0.1"
+API_PORT = 8080
+API_MAX_BODY = 1 << 20 # Largest request body accepted, in bytes
+API_REPORT_LIMIT = 100 # Default and maximum rows per page for the admin list endpoints
+API_TRENDS_MAX_DAYS = 3660 # Widest /admin/trends window; the sweep keeps a counter per day of it
+MAX_ROW_ID = (1 << 63) - 1 # SQLite's largest INTEGER; bigger IDs overflow before the query even runs
+HTTP_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+def api_limit(query): # The ?limit= of a list endpoint, capped at API_REPORT_LIMIT
+    value = query.get("limit", str(API_REPORT_LIMIT))
+    if not value.isdigit() or int(value) <= 0:
+        raise ValueError(f"limit must be a positive number, got {value!r}")
+    return min(int(value), API_REPORT_LIMIT)
+
+def api_row_id(value, field): # A tourist or item ID from the path, query or body, as an int SQLite can bind
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdecimal() or int(value) > MAX_ROW_ID:
+        raise ValueError(f"{field} must be a positive ID, got {value!r}")
+    return int(value)
+
+def api_list(body, field): # A JSON list field of the body; missing or null is an empty list
+    value = body.get(field)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"{field} must be a list, got {value!r}")
+    return value
+
+def api_catalog(match, query, body):
+    catalog = get_catalog()
+    return 200, {category: [{"item_id": item_id, "name": catalog.items[item_id][1]} for item_id in item_ids]
+                 for category, item_ids in catalog.categories.items()}
+
+def api_register(match, query, body): # Same fields and validation as a manifest row; selections and payment are optional
+    tourist, selections, payment = parse_manifest_row(body)
+    # Hand the write back unfinished: the server waits for its commit without tying up a worker thread
+    return submit_write(insert_tourist, tourist, selections, payment), lambda tourist_id: (201, fetch_receipt(tourist_id))
+
+def api_receipt(match, query, body):
+    receipt = fetch_receipt(api_row_id(match.group(1), "tourist ID"))
+    return (200, receipt) if receipt else (404, {"error": "tourist not found"})
+
+def api_reserve(match, query, body): # Stage selections (item IDs or Category/Choice pairs) and a payment, then commit them together
+    tourist_id = api_row_id(match.group(1), "tourist ID")
+    if fetch_profile(tourist_id) is None:
+        return 404, {"error": "tourist not found"}
+    catalog = get_catalog()
+    selections = api_list(body, "selections")
+    is_id = lambda value: isinstance(value, int) and not isinstance(value, bool) # JSON true/false arrive as bools, which are ints
+    add = [selection for selection in selections if is_id(selection)]
+    add += parse_manifest_selections([selection for selection in selections if not is_id(selection)])
+    remove = api_list(body, "remove")
+    if not all(map(is_id, remove)):
+        raise ValueError(f"remove must be a list of item IDs, got {remove!r}")
+    unknown = [item_id for item_id in add + remove if item_id not in catalog.items]
+    if unknown:
+        raise ValueError(f"unknown item IDs: {unknown}")
+    payment = body.get("payment") or {}
+    if not isinstance(payment, dict):
+        raise ValueError(f"payment must be an object, got {payment!r}")
+    payment = parse_payment(payment)
+    if payment is None: # As at the kiosk, selections are only kept once they are paid for
+        raise ValueError("payment is required")
+    reservation = Reservation(tourist_id)
+    for item_id in add:
+        reservation.add_selection(item_id)
+    for item_id in remove:
+        reservation.remove_selection(item_id)
+    reservation.set_payment(*payment)
+    reservation.commit()
+    return 200, fetch_receipt(tourist_id)
+
+def api_dashboard(match, query, body):
+    return 200, dict(dashboard_data(api_limit({"limit": query.get("top", "10")})), snapshot_age_seconds=report_age())
+
+def api_tourists(match, query, body): # One keyset page of the tourist report; pass next_after back as ?after= for the next page
+    after = api_row_id(query.get("after", "0"), "after")
+    limit = api_limit(query)
+    sql, params = tourist_report_query(query.get("nationality"),
+                                       query.get("from") and parse_date(query["from"], "from"),
+                                       query.get("to") and parse_date(query["to"], "to"))
+    with report_connection() as db:
+        rows = db.execute(sql, [after] + params + [limit]).fetchall()
+    columns = ("tourist_id", "name", "age", "nationality", "contact_number", "entry_date", "exit_date", "selections")
+    return 200, {"tourists": [dict(zip(columns, row)) for row in rows],
+                 "next_after": rows[-1][0] if len(rows) == limit else None, "snapshot_age_seconds": report_age()}
+
+def api_payments(match, query, body): # The latest payments with their per-method totals
+    with report_connection() as db:
+        rows = db.execute(PAYMENT_REPORT_SQL).fetchmany(api_limit(query))
+    columns = ("payment_id", "name", "amount_paid", "payment_method", "payment_date", "total_for_method", "transactions_for_method")
+    return 200, {"payments": [dict(zip(columns, row)) for row in rows], "snapshot_age_seconds": report_age()}
+
+def api_search(match, query, body): # ?q= name/nationality words or a contact number prefix
+    if not query.get("q", "").strip():
+        raise ValueError("q is required")
+    return 200, {"results": search_tourists(query["q"], api_limit({"limit": query.get("limit", str(SEARCH_LIMIT))})),
+                 "snapshot_age_seconds": report_age()}
+
+def api_trends(match, query, body):
+    if "from" not in query or "to" not in query:
+        raise ValueError("from and to are required")
+    date_from, date_to = parse_date(query["from"], "from"), parse_date(query["to"], "to")
+    if date.fromisoformat(date_to).toordinal() - date.fromisoformat(date_from).toordinal() >= API_TRENDS_MAX_DAYS:
+        raise ValueError(f"the window can be at most {API_TRENDS_MAX_DAYS} days")
+    return 200, dict(visitor_trends(date_from, date_to),
+                     snapshot_age_seconds=report_age())
+
+def api_analytics(match, query, body): # The dashboard from the analytics snapshot, optionally for a ?from=&to= window
+    return 200, get_snapshot().dashboard(api_limit({"limit": query.get("top", "10")}),
+                                         query.get("from") and parse_date(query["from"], "from"),
+                                         query.get("to") and parse_date(query["to"], "to"))
+
+# Handlers take (path match, query dict, JSON body) and return (status, payload), or, for a queued write, (Future of its
+# result, function turning that result into (status, payload)); the server runs the function once the Future is done
+API_ROUTES = [ # (method, path pattern, handler)
+    ("GET", r"/catalog", api_catalog),
+    ("POST", r"/tourists", api_register),
+    ("GET", r"/tourists/(\d+)/receipt", api_receipt),
+    ("POST", r"/tourists/(\d+)/reservation", api_reserve),
+    ("GET", r"/admin/dashboard", api_dashboard),
+    ("GET", r"/admin/tourists", api_tourists),
+    ("GET", r"/admin/payments", api_payments),
+    ("GET", r"/admin/search", api_search),
+    ("GET", r"/admin/trends", api_trends),
+    ("GET", r"/admin/analytics", api_analytics),
+]
+
+def handle_api_request(method, target, body): # Route one request and run its handler; returns (status, payload) or a queued write. Runs on a worker thread.
+    import json, re
+    from concurrent.futures import Future
+    from urllib.parse import parse_qsl, urlsplit
+    url = urlsplit(target)
+    allowed = []
+    for route_method, pattern, handler in API_ROUTES:
+        match = re.fullmatch(pattern, url.path.rstrip("/") or "/")
+        if match is None:
+            continue
+        if route_method != method:
+            allowed.append(route_method)
+            continue
+        flow = f"api: {method} " + pattern.replace(r"(\d+)", "{id}")
+        def call():
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise ValueError("the request body must be a JSON object")
+            return handler(match, dict(parse_qsl(url.query)), payload)
+        status, payload = api_call(flow, call)
+        if isinstance(status, Future): # A queued write: respond once it has committed, with the same error handling
+            future, respond = status, payload
+            return future, lambda: api_call(flow, lambda: respond(future.result()))
+        return status, payload
+    if allowed:
+        return 405, {"error": f"use {' or '.join(allowed)}"}
+    return 404, {"error": f"no route for {url.path}"}
+
+def api_call(flow, call): # Run call() as a traced flow, turning its errors into (status, payload)
+    try:
+        with traced_flow(flow):
+            return call()
+    except ValueError as e: # Bad input, including malformed JSON
+        return 400, {"error": str(e)}
+    except sqlite3.OperationalError as e: # Typically the database stayed locked past busy_timeout
+        return 503, {"error": str(e)}
+    except sqlite3.Error as e:
+        return 500, {"error": str(e)}
+    except Exception: # A handler bug: answer 500 rather than let the worker drop the connection
+        import traceback
+        traceback.print_exc()
+        return 500, {"error": "internal error"}
+
+async def api_connection(reader, writer): # Serve requests on one connection, keeping it open between requests (HTTP/1.1)
+    import asyncio, json
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, version = request_line.decode("latin-1").split(maxsplit=2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            keep_alive = version.strip() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            if length > API_MAX_BODY:
+                status, payload, keep_alive = 413, {"error": f"body larger than {API_MAX_BODY} bytes"}, False
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await loop.run_in_executor(None, handle_api_request, method, target, body)
+                if callable(payload): # The handler queued a write; wait for its group commit off the worker threads
+                    await asyncio.wait([asyncio.wrap_future(status)])
+                    status, payload = await loop.run_in_executor(None, payload)
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                         f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError): # Client went away or sent something that is not HTTP
+        pass
+    finally:
+        writer.close()
+
+async def start_api_server(host=API_HOST, port=API_PORT): # Start listening; the caller runs the loop
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    workers = init_db().size # One worker per pooled connection, so no handler waits for a connection
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(workers, thread_name_prefix="galeragate-api"))
+    return await asyncio.start_server(api_connection, host, port)
+
+def serve_api(host=API_HOST, port=API_PORT): # Run the API until interrupted
+    import asyncio
+    async def serve():
+        server = await start_api_server(host, port)
+        bound_host, bound_port = server.sockets[0].getsockname()[:2]
+        print(f"GaleraGate API listening on http://{bound_host}:{bound_port}", flush=True)
+        async with server:
+            await server.serve_forever()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+# Query plan check
+def planned_queries(): # Every lookup/report query the app issues, with a label for the check output
+    yield "tourist by id", TOURIST_BY_ID_SQL
+    yield "update tourist", UPDATE_TOURIST_SQL
+    yield "delete tourist", DELETE_TOURIST_SQL
+    yield "selections by tourist", SELECTIONS_BY_TOURIST_SQL
+    yield "delete selection", DELETE_SELECTION_SQL
+    yield "catalog", CATALOG_SQL
+    yield "catalog version", CATALOG_VERSION_SQL
+    yield "catalog item", CATALOG_ITEM_SQL
+    yield "receipt by tourist", receipts_by_id_sql(1)
+    yield "receipts by tourist list", receipts_by_id_sql(3)
+    yield "receipts by payment date", RECEIPTS_BY_PAYMENT_DATE_SQL
+    yield "count tourists", COUNT_TOURISTS_SQL
+    yield "payment report", PAYMENT_REPORT_SQL
+    yield "dashboard nationalities", DASHBOARD_NATIONALITIES_SQL
+    yield "dashboard payments", DASHBOARD_PAYMENTS_SQL
+    yield "dashboard arrivals", DASHBOARD_ARRIVALS_SQL
+    yield "stays in window", STAYS_IN_WINDOW_SQL
+    yield "search by name", SEARCH_BY_NAME_SQL
+    yield "search by name (newest)", SEARCH_BY_NAME_NEWEST_SQL
+    yield "search by contact", SEARCH_BY_CONTACT_SQL
+    yield "search terms", SEARCH_TERMS_SQL
+    yield "export watermark", WATERMARK_SQL
+    yield "prune change log", PRUNE_CHANGE_LOG_SQL
+    yield "trim change log", TRIM_CHANGE_LOG_SQL
+    yield "archive candidates", ARCHIVE_CANDIDATES_SQL
+    yield "archive delete", ARCHIVE_DELETE_SQL
+    yield "changed tourists", CHANGED_TOURISTS_SQL
+    for name in SNAPSHOT_TABLES: # The full load reads every row on purpose
+        yield f"snapshot {name} changes", snapshot_changes_sql(name)
+    for export in EXPORT_TABLES: # Full exports read every row on purpose, so only the incremental queries are checked
+        yield f"export {export} changes", changed_rows_sql(export)
+    for nationality in (None, "Filipino"): # Every filter combination of the View All report
+        for date_from in (None, "2024-01-01"):
+            for date_to in (None, "2024-12-31"):
+                filters = [name for name, value in (("nationality", nationality), ("from", date_from), ("to", date_to)) if value]
+                yield "tourist report" + (f" ({', '.join(filters)})" if filters else ""), tourist_report_query(nationality, date_from, date_to)[0]
+
+def full_scans(db, sql): # Return the plan lines that read a whole table without an index
+    plan = [row[3] for row in db.execute("EXPLAIN QUERY PLAN " + sql, [None] * sql.count("?"))]
+    subqueries = {line.split(" ", 1)[1] for line in plan if line.startswith(("MATERIALIZE ", "CO-ROUTINE "))}
+    exempt = subqueries.union(SUMMARY_TABLES, CATALOG_TABLES) # Small by construction: one row per group or catalog option
+    return [line for line in plan
+            if line.startswith("SCAN ") and " USING " not in line
+            and line[5:] not in exempt and not line[5:].startswith(("(subquery", "CONSTANT ROW"))
+            and not (" VIRTUAL TABLE INDEX " in line and " INDEX 0:" not in line)] # A virtual table searching by its own index
+
+def check_query_plans(db, verbose=True): # EXPLAIN every planned query; returns the (label, plan line) pairs that scan a full table
+    problems = []
+    for label, sql in planned_queries():
+        scans = full_scans(db, sql)
+        problems.extend((label, line) for line in scans)
+        if verbose:
+            status = "\033[1;31mFULL SCAN\033[0m" if scans else "\033[1;32mok\033[0m"
+            print(f"{label:<45} {status}")
+            for line in scans:
+                print(f"    {line}")
+    return problems
+
+# Import time check
+IMPORT_TIME_BUDGET_MS = 25 # Cold-start budget for `import galeragate`, enforced by `python galeragate.py check-import`
+
+def measure_import_time(runs=5): # Median cold import time in ms, plus any files the import left in an empty working directory
+    import statistics, subprocess, tempfile
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [module_dir, os.environ.get("PYTHONPATH")])))
+    env.pop("GALERAGATE_DB", None)
+    env.pop("PYTHONDONTWRITEBYTECODE", None) # Measure a normal start from cached bytecode, not a recompile every run
+    script = "import time; start = time.perf_counter(); import galeragate; print((time.perf_counter() - start) * 1000)"
+    timings = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs + 1): # A fresh interpreter each time; the first run only warms the bytecode cache
+            result = subprocess.run([sys.executable, "-c", script], cwd=workdir, env=env,
+                                    capture_output=True, text=True, check=True)
+            timings.append(float(result.stdout))
+        stray_files = os.listdir(workdir)
+    return statistics.median(timings[1:]), stray_files
+
+def run_command(argv): # Non-interactive entry points, e.g. `python galeragate.py import manifest.csv`
+    global OUTPUT_FORMAT, WRITE_BEHIND, REPORT_REPLICA, REPLICA_MAX_AGE_SECONDS
+    import argparse
+    parser = argparse.ArgumentParser(prog="galeragate.py")
+    parser.add_argument("--db", help=f"database file to use (default: {DB_PATH}; ':memory:' for a throwaway database)")
+    parser.add_argument("--output", choices=OUTPUT_FORMATS,
+                        help="report format (default: color on a terminal, otherwise TSV for tables and plain text for receipts)")
+    parser.add_argument("--trace", action="store_true", help="record query and flow latencies (see admin option 12)")
+    parser.add_argument("--slow-ms", type=float, default=SLOW_QUERY_MS, help="slow-query log threshold while tracing")
+    parser.add_argument("--trace-dump", metavar="FILE", help="write the query stats to FILE as JSON on exit (implies --trace)")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="commit registrations, reservations and edits in group commits on a background writer thread")
+    parser.add_argument("--report-replica", action="store_true",
+                        help="run admin reports on a periodically refreshed copy of the database instead of the live file")
+    parser.add_argument("--replica-max-age", type=float, metavar="SECONDS", default=REPLICA_MAX_AGE_SECONDS,
+                        help=f"oldest copy a report may read with --report-replica (default: {REPLICA_MAX_AGE_SECONDS})")
+    commands = parser.add_subparsers(dest="command") # No command starts the interactive menus
+    import_parser = commands.add_parser("import", help="bulk-register tourists from a CSV/JSONL manifest")
+    import_parser.add_argument("manifest")
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    commands.add_parser("migrate", help="apply pending schema migrations")
+    commands.add_parser("check-plans", help="fail if any query the app issues scans a full table")
+    commands.add_parser("rebuild-summaries", help="recompute the dashboard summary tables from scratch")
+    receipts_parser = commands.add_parser("receipts", help="export receipts by payment date window or tourist IDs")
+    receipts_parser.add_argument("output", help="file to write")
+    receipts_parser.add_argument("--format", choices=["text", "json"], default="text")
+    receipts_parser.add_argument("--from", dest="date_from", help="first payment date (YYYY-MM-DD)")
+    receipts_parser.add_argument("--to", dest="date_to", help="last payment date (YYYY-MM-DD)")
+    receipts_parser.add_argument("--ids", help="comma-separated tourist IDs instead of a date window")
+    trends_parser = commands.add_parser("trends", help="daily occupancy, arrivals and stay length over a date window")
+    trends_parser.add_argument("date_from", metavar="FROM")
+    trends_parser.add_argument("date_to", metavar="TO")
+    trends_parser.add_argument("--top", type=int, default=5, help="number of peak days to list")
+    trends_parser.add_argument("--json", metavar="FILE", help="write the full result to FILE as JSON instead of printing it")
+    trends_parser.add_argument("--no-numpy", action="store_true", help="use the pure-Python sweep even if NumPy is installed")
+    report_parser = commands.add_parser("report", help="write the full tourist or payment report to stdout")
+    report_parser.add_argument("report", choices=["tourists", "payments"])
+    report_parser.add_argument("--nationality", help="tourists report: only this nationality")
+    report_parser.add_argument("--from", dest="date_from", help="tourists report: staying on or after (YYYY-MM-DD)")
+    report_parser.add_argument("--to", dest="date_to", help="tourists report: staying on or before (YYYY-MM-DD)")
+    search_parser = commands.add_parser("search", help="find tourists by name, nationality or contact number")
+    search_parser.add_argument("text", metavar="QUERY")
+    search_parser.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    export_parser = commands.add_parser("export-changes", help="export tourists, selections and payments changed since the last export")
+    export_parser.add_argument("directory", help="directory to write one file per table to")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export_parser.add_argument("--name", default=EXPORT_NAME, help=f"watermark to export from and advance (default: {EXPORT_NAME})")
+    export_parser.add_argument("--full", action="store_true", help="export every row, not just the changes since the watermark")
+    analytics_parser = commands.add_parser("analytics", help="dashboard over a date window from the in-memory analytics snapshot")
+    analytics_parser.add_argument("--from", dest="date_from", help="arrived/paid on or after (YYYY-MM-DD)")
+    analytics_parser.add_argument("--to", dest="date_to", help="arrived/paid on or before (YYYY-MM-DD)")
+    analytics_parser.add_argument("--top", type=int, default=10)
+    analytics_parser.add_argument("--json", metavar="FILE", help="write the result to FILE as JSON instead of printing it")
+    analytics_parser.add_argument("--no-numpy", action="store_true", help="use the pure-Python group-bys even if NumPy is installed")
+    archive_parser = commands.add_parser("archive", help="move departed tourists and their selections and payments to the archive database")
+    archive_parser.add_argument("--before", help=f"exit date cutoff, YYYY-MM-DD (default: {ARCHIVE_AFTER_DAYS} days ago)")
+    archive_parser.add_argument("--archive", help="archive database file (default: GALERAGATE_ARCHIVE or <database>-archive.db)")
+    archive_parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    archive_parser.add_argument("--compact", action="store_true", help="compact the database afterwards")
+    commands.add_parser("compact", help="reclaim free space in the database file")
+    serve_parser = commands.add_parser("serve", help="serve the tourist and admin flows as a JSON API over HTTP")
+    serve_parser.add_argument("--host", default=API_HOST)
+    serve_parser.add_argument("--port", type=int, default=API_PORT)
+    import_time_parser = commands.add_parser("check-import", help="fail if importing galeragate is slow or touches the disk")
+    import_time_parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    if args.command == "check-import": # Runs in child interpreters, so it must not open a database here
+        import_ms, stray_files = measure_import_time()
+        print(f"Cold import: {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        if stray_files:
+            print(f"\033[1;31mImport created files: {', '.join(stray_files)}\033[0m")
+        return 1 if import_ms > args.budget_ms or stray_files else 0
+    OUTPUT_FORMAT = args.output or OUTPUT_FORMAT
+    WRITE_BEHIND = args.write_behind or WRITE_BEHIND
+    REPORT_REPLICA = args.report_replica or REPORT_REPLICA
+    REPLICA_MAX_AGE_SECONDS = args.replica_max_age
+    init_db(args.db)
+    if args.trace or args.trace_dump:
+        enable_tracing(args.slow_ms)
+    try:
+        return run_database_command(args)
+    finally:
+        if args.trace_dump:
+            dump_trace_stats(args.trace_dump)
+        stop_writer() # Pending writes are committed before the process exits
+        stop_replica()
+
+def run_database_command(args): # The commands that need the database, after run_command() has opened it
+    if args.command is None:
+        main()
+        return 0
+    elif args.command == "import":
+        tourist_ids, errors = import_manifest(args.manifest, args.chunk_size)
+        print_import_summary(tourist_ids, errors)
+        return 1 if errors else 0
+    elif args.command == "migrate":
+        with connection() as db:
+            print(f"Schema version {migrate(db)} of {MIGRATIONS[-1][0]}")
+        return 0
+    elif args.command == "trends":
+        trends = visitor_trends(parse_date(args.date_from, "FROM"), parse_date(args.date_to, "TO"), args.top,
+                                use_numpy=False if args.no_numpy else None)
+        if args.json:
+            import json
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(trends, f, indent=2)
+        else:
+            print_visitor_trends(trends)
+        return 0
+    elif args.command == "receipts":
+        tourist_ids = [int(tourist_id) for tourist_id in args.ids.split(",") if tourist_id.strip()] if args.ids else None
+        count, seconds = export_receipts(args.output, args.format,
+                                         args.date_from and parse_date(args.date_from, "--from"),
+                                         args.date_to and parse_date(args.date_to, "--to"), tourist_ids)
+        print_export_summary(args.output, count, seconds)
+        return 0
+    elif args.command == "report":
+        print_report_age(sys.stderr) # Keeps stdout to the report itself
+        write_report(args.report, args.nationality, args.date_from and parse_date(args.date_from, "--from"),
+                     args.date_to and parse_date(args.date_to, "--to"))
+        return 0
+    elif args.command == "search":
+        print_report_age(sys.stderr)
+        print_search_results(search_tourists(args.text, args.limit))
+        return 0
+    elif args.command == "export-changes":
+        print_change_export_summary(args.directory, *export_changes(args.directory, args.format, args.name, args.full))
+        return 0
+    elif args.command == "analytics":
+        snapshot = get_snapshot()
+        data = snapshot.dashboard(args.top, args.date_from and parse_date(args.date_from, "--from"),
+                                  args.date_to and parse_date(args.date_to, "--to"), use_numpy=False if args.no_numpy else None)
+        if args.json:
+            import json
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        else:
+            print_dashboard(data, args.top)
+            print_snapshot_footer(snapshot)
+        return 0
+    elif args.command == "archive":
+        cutoff = parse_date(args.before, "--before") if args.before else \
+            date.fromordinal(date.today().toordinal() - ARCHIVE_AFTER_DAYS).isoformat()
+        print_archive_summary(archive_departed(cutoff, args.archive, args.batch_size))
+        if args.compact:
+            print_compact_summary(*compact_database())
+        return 0
+    elif args.command == "compact":
+        print_compact_summary(*compact_database())
+        return 0
+    elif args.command == "serve":
+        serve_api(args.host, args.port)
+        return 0
+    elif args.command == "rebuild-summaries":
+        with transaction() as db:
+            drifted = rebuild_summaries(db)
+        print(f"Summary tables rebuilt ({drifted} rows corrected).")
+        return 0
+    elif args.command == "check-plans":
+        with connection() as db:
+            problems = check_query_plans(db)
+        if problems:
+            print(f"\033[1;31m{len(problems)} full table scans found.\033[0m")
+        return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(run_command(sys.argv[1:]))
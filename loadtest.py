@@ -0,0 +1,141 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks import latency_summary
+
+# Load test for `python galeragate.py serve`: each client replays kiosk sessions (browse the catalog, register,
+# reserve and pay, fetch the receipt) over one keep-alive connection, and every few sessions reads the admin reports
+ADMIN_EVERY = 4 # Sessions between admin report reads, per client
+
+def kiosk_session(request, catalog, n): # One tourist's trip through the kiosk; `request` times and records each call
+    tourist = request("POST", "/tourists", {"name": f"Load Test {n}", "age": 30, "sex": "Female", "nationality": "Filipino",
+                                            "contact_number": "09120000000", "entry_date": "2024-05-01", "exit_date": "2024-05-04"})
+    if tourist is None:
+        return
+    tourist_id = tourist["tourist_id"]
+    selections = [item_ids[n % len(item_ids)]["item_id"] for item_ids in catalog.values()]
+    request("POST", f"/tourists/{tourist_id}/reservation",
+            {"selections": selections, "payment": {"payment_method": "Cash", "amount_paid": 1500, "payment_date": "2024-05-01"}},
+            label="POST /tourists/{id}/reservation")
+    request("GET", f"/tourists/{tourist_id}/receipt", label="GET /tourists/{id}/receipt")
+
+def admin_reads(request):
+    request("GET", "/admin/dashboard")
+    request("GET", "/admin/tourists?limit=20", label="GET /admin/tourists")
+    request("GET", "/admin/payments?limit=20", label="GET /admin/payments")
+
+def run_client(url, sessions, client_id, samples, errors):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+
+    def request(method, path, body=None, label=None):
+        data = json.dumps(body).encode() if body is not None else None
+        begin = time.perf_counter()
+        conn.request(method, path, body=data, headers={"Content-Type": "application/json"} if data else {})
+        response = conn.getresponse()
+        payload = response.read()
+        samples.append((label or f"{method} {path}", time.perf_counter() - begin))
+        if response.status >= 400:
+            errors.append(f"{method} {path}: {response.status} {payload[:200]!r}")
+            return None
+        return json.loads(payload)
+
+    try:
+        catalog = request("GET", "/catalog")
+        for session in range(sessions):
+            kiosk_session(request, catalog, client_id * sessions + session)
+            if session % ADMIN_EVERY == ADMIN_EVERY - 1:
+                admin_reads(request)
+    except (OSError, http.client.HTTPException) as e:
+        errors.append(f"client {client_id}: {e}")
+    finally:
+        conn.close()
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(db_path): # Run `galeragate.py serve` on a scratch database in its own process; returns (process, url)
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "galeragate.py"),
+                               "--db", db_path, "serve", "--port", str(port)],
+                              stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline() # The server prints its address once it is listening
+    if "listening" not in line:
+        server.kill()
+        raise RuntimeError(f"server did not start: {line!r}")
+    return server, f"http://127.0.0.1:{port}"
+
+def run_load_test(url, clients, sessions):
+    samples, errors = [], [] # list.append is atomic, so the client threads share these without a lock
+    threads = [threading.Thread(target=run_client, args=(url, sessions, client_id, samples, errors))
+               for client_id in range(clients)]
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - begin
+
+    endpoints = {}
+    for label, seconds in samples:
+        endpoints.setdefault(label, []).append(seconds)
+    return {
+        "clients": clients,
+        "requests": len(samples),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_sec": len(samples) / elapsed,
+        **latency_summary([seconds for _, seconds in samples]),
+        "endpoints": {label: dict(requests=len(latencies), **latency_summary(latencies))
+                      for label, latencies in sorted(endpoints.items())},
+        "first_errors": errors[:10],
+    }
+
+def print_report(report):
+    print(f"{report['requests']:,} requests from {report['clients']} clients in {report['seconds']:.2f} s "
+          f"({report['errors']} errors)")
+    print(f"  {report['requests_per_sec']:,.0f} req/s   p50 {report['p50_ms']:.2f} ms   p99 {report['p99_ms']:.2f} ms")
+    print(f"\n  {'endpoint':<36} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, stats in report["endpoints"].items():
+        print(f"  {label:<36} {stats['requests']:>9,} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+    for error in report["first_errors"]:
+        print(f"  error: {error}")
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="loadtest.py", description="Load-test the GaleraGate JSON API.")
+    parser.add_argument("--url", help="API to test, e.g. http://127.0.0.1:8080 (default: start a server on a scratch database)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent kiosk clients (default: 16)")
+    parser.add_argument("--sessions", type=int, default=100, help="kiosk sessions per client (default: 100)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results to FILE as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = None
+        url = args.url
+        if url is None:
+            server, url = start_server(os.path.join(workdir, "loadtest.db"))
+        try:
+            report = run_load_test(url, args.clients, args.sessions)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,123 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+import galeragate  # noqa: E402
+
+CUTOFF = "2025-01-01" # After every stay in the checked-in database
+
+# Archiving a migrated copy of the checked-in galeragate.db into an archive file next to it
+class ArchiveDepartedTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "galeragate.db")
+        shutil.copyfile(os.path.join(ROOT, "galeragate.db"), self.path)
+        galeragate.init_db(self.path)
+        self.archive_path = galeragate.archive_path()
+
+    def tearDown(self):
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def archived(self, sql):
+        archive = sqlite3.connect(self.archive_path)
+        try:
+            return archive.execute(sql).fetchall()
+        finally:
+            archive.close()
+
+    def test_interrupted_batch_is_not_archived_twice(self):
+        with galeragate.connection() as db:
+            tourist_ids = [row[0] for row in db.execute("SELECT tourist_id FROM tourists ORDER BY exit_date")]
+        # The first batch's copy commits, then its delete fails, as if the process died between the two commits
+        with mock.patch.object(galeragate, "ARCHIVE_DELETE_SQL", "DELETE FROM no_such_table WHERE ?"):
+            with self.assertRaises(sqlite3.OperationalError):
+                galeragate.archive_departed(CUTOFF, batch_size=2)
+        self.assertEqual(self.archived("SELECT tourist_id FROM tourists"), [(tourist_id,) for tourist_id in tourist_ids[:2]])
+        with galeragate.connection() as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM tourists").fetchone(), (len(tourist_ids),))
+
+        moved = galeragate.archive_departed(CUTOFF, batch_size=2)
+        self.assertEqual(moved["tourists"], len(tourist_ids) - 2) # The interrupted batch is only deleted this time
+        self.assertEqual(sorted(self.archived("SELECT tourist_id FROM tourists")), [(tourist_id,) for tourist_id in sorted(tourist_ids)])
+        self.assertEqual(self.archived("SELECT archive_id FROM selections EXCEPT SELECT archive_id FROM tourists"), [])
+        with galeragate.connection() as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM tourists").fetchone(), (0,))
+
+    def test_archive_must_be_a_file(self):
+        with self.assertRaises(ValueError):
+            galeragate.archive_departed(CUTOFF, ":memory:")
+        galeragate.close_db()
+        galeragate.init_db(":memory:")
+        with self.assertRaises(ValueError): # The default archive would be in memory too
+            galeragate.archive_path()
+        with self.assertRaises(ValueError):
+            galeragate.archive_departed(CUTOFF, os.path.join(self.workdir, "archive.db"))
+
+ORPHANS_SQL = """
+SELECT 'selections', tourist_id FROM selections WHERE tourist_id NOT IN (SELECT tourist_id FROM tourists)
+UNION ALL
+SELECT 'payment_methods', tourist_id FROM payment_methods WHERE tourist_id NOT IN (SELECT tourist_id FROM tourists)
+"""
+
+# Cascading deletes and archiving on generated tourists
+class DeleteAndArchiveTest(unittest.TestCase):
+    cutoff = "2024-07-01" # Roughly the first half of the generated stays
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        galeragate.init_db(os.path.join(self.workdir, "galeragate.db"))
+        benchmarks.generate_dataset(500, seed=3)
+
+    def tearDown(self):
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def rows(self, sql, *params):
+        with galeragate.connection() as db:
+            return db.execute(sql, params).fetchall()
+
+    def test_cascade_delete_leaves_no_orphans(self):
+        self.assertTrue(self.rows("SELECT 1 FROM selections WHERE tourist_id = 1"))
+        galeragate.commit_write(lambda db: db.execute(galeragate.DELETE_TOURIST_SQL, (1,)), tourist_id=1)
+        with galeragate.transaction() as db:
+            db.execute("DELETE FROM tourists WHERE tourist_id % 3 = 0")
+        self.assertEqual(self.rows(ORPHANS_SQL), [])
+        self.assertEqual(self.rows("PRAGMA foreign_key_check"), [])
+        self.assertEqual(self.rows("SELECT COUNT(*) FROM tourists"), [(500 - 1 - 500 // 3,)])
+
+    def test_archive_moves_departed_tourists(self):
+        cutoff = galeragate.day_number(self.cutoff)
+        departed = self.rows("SELECT tourist_id FROM tourists WHERE exit_date < ? ORDER BY tourist_id", cutoff)
+        staying = self.rows("SELECT tourist_id FROM tourists WHERE exit_date >= ? OR exit_date IS NULL ORDER BY tourist_id", cutoff)
+        selections = self.rows("SELECT tourist_id, item_id FROM selections WHERE tourist_id IN "
+                               "(SELECT tourist_id FROM tourists WHERE exit_date < ?) ORDER BY 1, 2", cutoff)
+        payments = self.rows("SELECT payment_id, tourist_id, payment_method, amount_paid / 100.0 FROM payment_methods "
+                             "WHERE tourist_id IN (SELECT tourist_id FROM tourists WHERE exit_date < ?) ORDER BY 1", cutoff)
+        self.assertTrue(departed and staying and selections and payments)
+
+        moved = galeragate.archive_departed(self.cutoff, batch_size=100)
+        self.assertEqual((moved["tourists"], moved["selections"], moved["payments"]), (len(departed), len(selections), len(payments)))
+        self.assertEqual(self.rows("SELECT tourist_id FROM tourists ORDER BY tourist_id"), staying)
+        self.assertEqual(self.rows(ORPHANS_SQL), [])
+        archive = sqlite3.connect(moved["path"])
+        try:
+            self.assertEqual(archive.execute("SELECT tourist_id FROM tourists ORDER BY tourist_id").fetchall(), departed)
+            self.assertEqual(archive.execute("SELECT t.tourist_id, s.item_id FROM selections AS s "
+                                             "JOIN tourists AS t USING (archive_id) ORDER BY 1, 2").fetchall(), selections)
+            self.assertEqual(archive.execute("SELECT p.payment_id, t.tourist_id, p.payment_method, p.amount_paid "
+                                             "FROM payment_methods AS p JOIN tourists AS t USING (archive_id) "
+                                             "ORDER BY 1").fetchall(), payments)
+        finally:
+            archive.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+import galeragate  # noqa: E402
+
+# The synthetic data generator and the headless flow benchmark, at a scale small enough for every test run
+class BenchmarkSuiteTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def generated(self, name, seed):
+        benchmarks.use_database(os.path.join(self.workdir, name))
+        dataset = benchmarks.generate_dataset(200, seed)
+        with galeragate.connection() as db:
+            rows = [db.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+                    for table in ("tourists", "selections", "payment_methods")]
+        return dataset, rows
+
+    def test_generator_is_deterministic(self):
+        dataset, rows = self.generated("a.db", 9)
+        self.assertEqual(dataset["tourists"], 200)
+        self.assertEqual((len(rows[1]), len(rows[2])), (dataset["selections"], dataset["payments"]))
+        self.assertEqual(self.generated("b.db", 9)[1], rows)
+        self.assertNotEqual(self.generated("c.db", 10)[1], rows)
+
+    def test_flows_write_machine_readable_results(self):
+        path = os.path.join(self.workdir, "results.json")
+        self.assertEqual(benchmarks.main(["flows", "--scale", "200", "--json", path]), 0)
+        with open(path, encoding="utf-8") as file:
+            results = json.load(file)["results"]["flows"]
+        self.assertEqual(results["dataset"]["tourists"], 200)
+        for flow in ("registration", "selection_and_payment", "receipt", "admin_view_all_first_page", "admin_count",
+                     "admin_payments", "reset_tables"):
+            self.assertGreater(results[flow]["calls"], 0, flow)
+            self.assertLessEqual(results[flow]["p50_ms"], results[flow]["p99_ms"], flow)
+
+if __name__ == "__main__":
+    unittest.main()
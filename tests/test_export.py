@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+import galeragate  # noqa: E402
+
+# Incremental change-data export: after a full export, the next one holds exactly the rows changed since
+class ChangeExportTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.exports = os.path.join(self.workdir, "exports")
+        galeragate.init_db(os.path.join(self.workdir, "galeragate.db"))
+        benchmarks.generate_dataset(100, seed=5)
+
+    def tearDown(self):
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def export(self): # {export: {row key: (_op, record)}} from one export_changes() run
+        since, until, counts, _ = galeragate.export_changes(self.exports)
+        records = {}
+        for export in galeragate.EXPORT_TABLES:
+            with open(os.path.join(self.exports, f"{export}-{'full' if since is None else since}-{until}.ndjson"),
+                      encoding="utf-8") as file:
+                rows = [json.loads(line) for line in file]
+            self.assertEqual(len(rows), counts[export])
+            key = ("payment_id",) if export == "payments" else ("tourist_id", "item_id") if export == "selections" else ("tourist_id",)
+            records[export] = {tuple(row[column] for column in key): (row["_op"], row) for row in rows}
+        return since, records
+
+    def test_incremental_export_has_exactly_the_changed_rows(self):
+        since, full = self.export()
+        self.assertIsNone(since)
+        self.assertEqual(len(full["tourists"]), 100)
+
+        catalog = galeragate.get_catalog()
+        item_ids = sorted(catalog.items)[:2]
+        added = galeragate.commit_write(galeragate.insert_tourist, ("New", 30, "Female", "Filipino", "09171234567",
+                                                                    "2025-03-01", "2025-03-04"),
+                                        item_ids, ("Cash", "100", "2025-03-01"))
+        with galeragate.transaction() as db:
+            db.execute("UPDATE tourists SET nationality = 'Japanese' WHERE tourist_id = 10")
+            deleted_selections = db.execute("SELECT tourist_id, item_id FROM selections WHERE tourist_id = 20").fetchall()
+            deleted_payments = db.execute("SELECT payment_id FROM payment_methods WHERE tourist_id = 20").fetchall()
+            db.execute("DELETE FROM tourists WHERE tourist_id = 20") # Cascades to its selections and payments
+        self.assertTrue(deleted_selections and deleted_payments)
+
+        since, changed = self.export()
+        self.assertIsNotNone(since)
+        self.assertEqual({key: op for key, (op, _) in changed["tourists"].items()},
+                         {(added,): "upsert", (10,): "upsert", (20,): "delete"})
+        self.assertEqual(changed["tourists"][(10,)][1]["nationality"], "Japanese")
+        self.assertEqual(changed["tourists"][(added,)][1]["entry_date"], "2025-03-01")
+        self.assertEqual({key: op for key, (op, _) in changed["selections"].items()},
+                         {**{(added, item_id): "upsert" for item_id in item_ids},
+                          **{key: "delete" for key in deleted_selections}})
+        payments = {key: op for key, (op, _) in changed["payments"].items()}
+        self.assertEqual({key for key, op in payments.items() if op == "delete"}, set(deleted_payments))
+        upserts = [row for op, row in changed["payments"].values() if op == "upsert"]
+        self.assertEqual([(row["tourist_id"], row["amount_paid"]) for row in upserts], [(added, 100.0)])
+
+        since, unchanged = self.export()
+        self.assertEqual(unchanged, {export: {} for export in galeragate.EXPORT_TABLES})
+
+if __name__ == "__main__":
+    unittest.main()
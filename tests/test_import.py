@@ -0,0 +1,31 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import galeragate  # noqa: E402
+
+# Importing galeragate must stay cheap and touch no files; the database opens on first use, once per process
+class LazyInitTest(unittest.TestCase):
+    def tearDown(self):
+        galeragate.close_db()
+
+    def test_import_is_fast_and_side_effect_free(self): # What `python galeragate.py check-import` enforces
+        import_ms, stray_files = galeragate.measure_import_time(runs=3)
+        self.assertEqual(stray_files, [])
+        self.assertLess(import_ms, galeragate.IMPORT_TIME_BUDGET_MS)
+
+    def test_init_db_runs_once(self):
+        pool = galeragate.init_db(":memory:")
+        self.assertIs(galeragate.init_db(), pool)
+        self.assertIs(galeragate.init_db(":memory:"), pool)
+        with self.assertRaises(ValueError): # Switching databases needs close_db() first
+            galeragate.init_db("other.db")
+        self.assertFalse(os.path.exists("other.db"))
+        with galeragate.connection() as db:
+            self.assertEqual(db.execute("PRAGMA user_version").fetchone(), (galeragate.MIGRATIONS[-1][0],))
+
+if __name__ == "__main__":
+    unittest.main()
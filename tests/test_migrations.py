@@ -0,0 +1,176 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import galeragate  # noqa: E402
+
+# Upgrading the checked-in galeragate.db (schema version 0: TEXT dates, REAL amounts, selections by category/choice
+# names) through every migration, including the table rebuilds of the catalog and typed-storage migrations
+class MigrateShippedDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "galeragate.db")
+        shutil.copyfile(os.path.join(ROOT, "galeragate.db"), self.path)
+        legacy = sqlite3.connect(self.path)
+        self.tourists = legacy.execute("SELECT * FROM tourists ORDER BY tourist_id").fetchall()
+        self.selections = sorted(legacy.execute("SELECT tourist_id, category, choice FROM selections"))
+        self.payments = legacy.execute("SELECT * FROM payment_methods ORDER BY payment_id").fetchall()
+        legacy.close()
+        self.db = sqlite3.connect(self.path, isolation_level=None) # migrate() issues its own BEGIN IMMEDIATE
+        self.assertEqual(galeragate.migrate(self.db), galeragate.MIGRATIONS[-1][0])
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.workdir)
+
+    def test_rows_survive(self):
+        self.assertTrue(self.tourists and self.selections and self.payments)
+        for table, rows in (("tourists", self.tourists), ("selections", self.selections), ("payment_methods", self.payments)):
+            self.assertEqual(self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], len(rows), table)
+        self.assertEqual(sorted(self.db.execute("""
+            SELECT s.tourist_id, c.name, i.name FROM selections s
+            JOIN catalog_items i ON i.item_id = s.item_id JOIN categories c ON c.category_id = i.category_id
+            """)), self.selections)
+
+    def test_tourists_are_typed(self):
+        migrated = self.db.execute("SELECT * FROM tourists ORDER BY tourist_id").fetchall()
+        for before, after in zip(self.tourists, migrated):
+            tourist_id, name, age, sex, nationality, contact, entry_date, exit_date = before
+            self.assertEqual(after[:5], (tourist_id, name, age, sex, nationality))
+            self.assertEqual(after[5], "+63" + contact[1:]) # Local 09... numbers get the Philippine country code
+            self.assertEqual(after[6:], (date.fromisoformat(entry_date).toordinal(), date.fromisoformat(exit_date).toordinal()))
+
+    def test_payments_are_typed(self):
+        migrated = self.db.execute("SELECT * FROM payment_methods ORDER BY payment_id").fetchall()
+        for before, after in zip(self.payments, migrated):
+            payment_id, tourist_id, method, amount_paid, payment_date = before
+            self.assertEqual(after, (payment_id, tourist_id, method, round(amount_paid * 100),
+                                     date.fromisoformat(payment_date).toordinal()))
+            self.assertIsInstance(after[3], int)
+
+    def test_database_is_consistent(self):
+        self.assertEqual(self.db.execute("PRAGMA integrity_check").fetchall(), [("ok",)])
+        self.assertEqual(self.db.execute("PRAGMA foreign_key_check").fetchall(), [])
+        self.db.execute("BEGIN")
+        try:
+            self.assertEqual(galeragate.rebuild_summaries(self.db), 0) # The summaries match the migrated rows
+        finally:
+            self.db.rollback()
+        self.assertEqual(self.db.execute("SELECT DISTINCT typeof(arrival_date) FROM daily_arrivals").fetchall(), [("integer",)])
+
+def migrate_to(db, version): # Apply only the migrations up to `version`, as an older release would have
+    with mock.patch.object(galeragate, "MIGRATIONS", [entry for entry in galeragate.MIGRATIONS if entry[0] <= version]):
+        return galeragate.migrate(db)
+
+def schema(db):
+    return sorted(db.execute("SELECT type, name, tbl_name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+
+# sha256 of the schema each migration leaves on an empty database. Migrations that have shipped must never change
+# (databases stopped at any version upgrade from there), so these only ever gain entries.
+SCHEMA_AT_VERSION = {
+    1: "a6e8f695e276befe07d763f05a88d33caa06a30617c7c7fb9c2baecf9135d7a8",
+    2: "6c4888300924e51fe56968478cf5d4b2a3c337e1d611fd7e75d2aac69ff7b8a1",
+    3: "1bf161e2c377742da739b3d1e0a427c23067d0655a7968b2d563e1ff6e6e760b",
+    4: "1bf161e2c377742da739b3d1e0a427c23067d0655a7968b2d563e1ff6e6e760b",
+    5: "2871b1e8f66a056d91ac6fe92327949a85dc187d970ab544ec1078a32b586395",
+    6: "ffae6f4df9dfb99d8055d431dc159b9aa08acef51e2a045c535be006362e8854",
+    7: "c52256d8d5967830fd6dc4ccf68730adb029b1d454d5e0db1bad282ad53e5fb1",
+    8: "c5f75c04f3e1d895929969c5dc20e76ed2ad55de39eedf2895ad73c44b58ea8a",
+    9: "c07ceb77de0e1e6a0fd6bbe723465a13b5619a23a6a0f19fabbbfe61feb84667",
+    10: "ad727f1a12d889e9b4a8ca3bde68c058f34c36295d53326e4cbc85c31de5518e",
+    11: "b2466edba72641c0eea6d43debc7a703bc9bf75f2ed9395a5280d1d598bac172",
+    12: "ef758b67c43a3a80def9a70819eac951bc72d030cf0926b1d1b1f2c41f5cdaa5",
+    13: "4a01d0f633b914514238621882ac62be2172f9b21db9ed5de56fdff132be7530",
+    14: "bea41e2d4192bbb8940c6a4bad0177781c70627dcf5088361280da250036a0f8",
+}
+
+# A database stopped at each earlier version, written to in that version's layout, then upgraded the rest of the way
+class MigrateFromEveryVersionTest(unittest.TestCase):
+    latest = galeragate.MIGRATIONS[-1][0]
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def open_copy(self, name):
+        path = os.path.join(self.workdir, name)
+        shutil.copyfile(os.path.join(ROOT, "galeragate.db"), path)
+        return sqlite3.connect(path, isolation_level=None)
+
+    def write_rows(self, db, version): # Add, change and delete tourists the way code at `version` stored them
+        typed = version >= 12
+        day = (lambda text: date.fromisoformat(text).toordinal()) if typed else (lambda text: text)
+        tourist_id = db.execute("INSERT INTO tourists (name, age, sex, nationality, contact_number, entry_date, exit_date) "
+                                "VALUES ('Ana Reyes', 41, 'Female', 'Filipino', ?, ?, ?)",
+                                ("+639171234567" if typed else "09171234567", day("2025-01-10"), day("2025-01-14"))).lastrowid
+        db.execute("INSERT INTO tourists (name, age, nationality, entry_date) VALUES ('No Dates', 30, 'Korean', NULL)")
+        if version >= 8:
+            item_id = db.execute("SELECT item_id FROM catalog_items JOIN categories USING (category_id) "
+                                 "WHERE categories.name = 'Places' AND catalog_items.name = 'White Beach'").fetchone()[0]
+            db.execute("INSERT INTO selections (tourist_id, item_id) VALUES (?, ?)", (tourist_id, item_id))
+        else:
+            db.execute("INSERT INTO selections (tourist_id, category, choice) VALUES (?, 'Places', 'White Beach')", (tourist_id,))
+        db.execute("INSERT INTO payment_methods (tourist_id, payment_method, amount_paid, payment_date) VALUES (?, 'Cash', ?, ?)",
+                   (tourist_id, 150050 if typed else 1500.5, day("2025-01-10")))
+        db.execute("UPDATE tourists SET nationality = 'Japanese', entry_date = ? WHERE tourist_id = 2", (day("2024-12-03"),))
+        if version < 11: # No cascade yet
+            db.execute("DELETE FROM selections WHERE tourist_id = 4")
+            db.execute("DELETE FROM payment_methods WHERE tourist_id = 4")
+        db.execute("DELETE FROM tourists WHERE tourist_id = 4")
+        return tourist_id
+
+    def test_upgrade_from_each_version(self):
+        reference = self.open_copy("reference.db")
+        galeragate.migrate(reference)
+        expected_schema = schema(reference)
+        reference.close()
+        for version in range(self.latest):
+            with self.subTest(version=version):
+                db = self.open_copy(f"v{version}.db")
+                try:
+                    self.assertEqual(migrate_to(db, version), version)
+                    tourist_id = self.write_rows(db, version)
+                    self.assertEqual(galeragate.migrate(db), self.latest)
+                    self.assertEqual(schema(db), expected_schema)
+                    self.assertEqual(db.execute("PRAGMA integrity_check").fetchall(), [("ok",)])
+                    self.assertEqual(db.execute("PRAGMA foreign_key_check").fetchall(), [])
+                    self.assertEqual(db.execute("SELECT tourist_id FROM tourists WHERE tourist_id IN (2, 4)").fetchall(), [(2,)])
+                    self.assertEqual(db.execute("SELECT contact_number, entry_date, exit_date FROM tourists WHERE tourist_id = ?",
+                                                (tourist_id,)).fetchone(),
+                                     ("+639171234567", date(2025, 1, 10).toordinal(), date(2025, 1, 14).toordinal()))
+                    self.assertEqual(db.execute("SELECT amount_paid, payment_date FROM payment_methods WHERE tourist_id = ?",
+                                                (tourist_id,)).fetchall(), [(150050, date(2025, 1, 10).toordinal())])
+                    self.assertEqual(db.execute("SELECT c.name, i.name FROM selections s JOIN catalog_items i USING (item_id) "
+                                                "JOIN categories c USING (category_id) WHERE s.tourist_id = ?",
+                                                (tourist_id,)).fetchall(), [("Places", "White Beach")])
+                    self.assertEqual(db.execute("SELECT COUNT(*) FROM selections WHERE tourist_id = 4").fetchone(), (0,))
+                    self.assertEqual(db.execute("SELECT tourists FROM daily_arrivals WHERE arrival_date IS NULL").fetchone(), (1,))
+                    db.execute("BEGIN")
+                    try:
+                        self.assertEqual(galeragate.rebuild_summaries(db), 0)
+                    finally:
+                        db.rollback()
+                finally:
+                    db.close()
+
+    def test_existing_migrations_are_unchanged(self):
+        for version, digest in SCHEMA_AT_VERSION.items():
+            with self.subTest(version=version):
+                db = sqlite3.connect(":memory:", isolation_level=None)
+                migrate_to(db, version)
+                self.assertEqual(hashlib.sha256(repr(schema(db)).encode()).hexdigest(), digest)
+                db.close()
+
+if __name__ == "__main__":
+    unittest.main()
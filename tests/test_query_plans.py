@@ -0,0 +1,42 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+import galeragate  # noqa: E402
+
+# `python galeragate.py check-plans`: no query the app issues may scan a whole table, on the migrated checked-in
+# database or on one holding generated tourists
+class QueryPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.workdir, "galeragate.db")
+        shutil.copyfile(os.path.join(ROOT, "galeragate.db"), self.path)
+
+    def tearDown(self):
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def assertNoFullScans(self):
+        with galeragate.connection() as db:
+            self.assertEqual(galeragate.check_query_plans(db, verbose=False), [])
+
+    def test_migrated_database(self):
+        galeragate.init_db(self.path)
+        self.assertNoFullScans()
+
+    def test_generated_tourists(self):
+        galeragate.init_db(self.path)
+        benchmarks.generate_dataset(2000, seed=7)
+        self.assertNoFullScans()
+
+    def test_check_plans_command(self):
+        self.assertEqual(galeragate.run_command(["--db", self.path, "check-plans"]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+import galeragate  # noqa: E402
+
+# Reporting mode: admin reports read a backup-API copy of the database, refreshed within the staleness bound
+class ReportReplicaTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        patches = [mock.patch.object(galeragate, "REPORT_REPLICA", True),
+                   mock.patch.object(galeragate, "REPLICA_MAX_AGE_SECONDS", 3600)] # Only refreshed when the test asks
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        galeragate.init_db(os.path.join(self.workdir, "galeragate.db"))
+        benchmarks.generate_dataset(200, seed=13)
+
+    def tearDown(self):
+        galeragate.stop_replica()
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def report_count(self):
+        with galeragate.report_connection() as db:
+            return db.execute(galeragate.COUNT_TOURISTS_SQL).fetchone()[0]
+
+    def test_reports_read_the_copy_until_it_is_refreshed(self):
+        self.assertEqual(self.report_count(), 200)
+        self.assertLess(galeragate.report_age(), 3600)
+        galeragate.commit_write(galeragate.insert_tourist, ("Late", 40, "Male", "Korean", None, "2025-02-01", "2025-02-03"))
+        self.assertEqual(self.report_count(), 200) # Within the staleness bound the copy is not retaken
+        galeragate.expire_replica()
+        self.assertEqual(self.report_count(), 201)
+        self.assertEqual(galeragate.get_replica().path, os.path.join(self.workdir, "galeragate-replica.db"))
+
+    def test_replica_query_plans(self): # The copy keeps every index, so reports on it scan no full table either
+        with galeragate.report_connection() as db:
+            self.assertEqual(galeragate.check_query_plans(db, verbose=False), [])
+
+if __name__ == "__main__":
+    unittest.main()
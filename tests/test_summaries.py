@@ -0,0 +1,60 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+import galeragate  # noqa: E402
+
+# The trigger-maintained summary tables must always equal what rebuild_summaries() computes from the base tables
+class SummaryTablesTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        galeragate.init_db(os.path.join(self.workdir, "galeragate.db"))
+        benchmarks.generate_dataset(300, seed=11)
+
+    def tearDown(self):
+        galeragate.close_db()
+        shutil.rmtree(self.workdir)
+
+    def assertNoDrift(self):
+        with galeragate.connection() as db:
+            db.execute("BEGIN")
+            try:
+                self.assertEqual(galeragate.rebuild_summaries(db), 0)
+            finally:
+                db.rollback()
+
+    def test_inserts(self):
+        self.assertNoDrift()
+        for nationality, entry_date in (("Filipino", "2025-03-01"), ("Martian", "2025-03-01"), (None, None)):
+            galeragate.commit_write(galeragate.insert_tourist, ("New", 30, "Female", nationality, None, entry_date, None),
+                                    [], ("GCash", "250.75", "2025-03-01"))
+        self.assertNoDrift()
+
+    def test_updates(self):
+        with galeragate.transaction() as db:
+            db.execute("UPDATE tourists SET nationality = 'Martian' WHERE tourist_id % 7 = 0")
+            db.execute("UPDATE tourists SET entry_date = entry_date + 3 WHERE tourist_id % 5 = 0")
+            db.execute("UPDATE tourists SET nationality = NULL, entry_date = NULL WHERE tourist_id % 11 = 0")
+            db.execute("UPDATE payment_methods SET amount_paid = amount_paid + 100 WHERE payment_id % 3 = 0")
+            db.execute("UPDATE payment_methods SET payment_method = 'Martian Credits' WHERE payment_id % 4 = 0")
+        self.assertNoDrift()
+
+    def test_deletes(self):
+        with galeragate.transaction() as db:
+            db.execute("DELETE FROM payment_methods WHERE payment_id % 3 = 0")
+            db.execute("DELETE FROM tourists WHERE tourist_id % 4 = 0") # Their payments go with them
+            # The only tourist of a nationality and of an arrival day
+            db.execute("UPDATE tourists SET nationality = 'Martian', entry_date = 1 WHERE tourist_id = 1")
+            db.execute("DELETE FROM tourists WHERE tourist_id = 1")
+        self.assertNoDrift()
+        galeragate.clear_tables()
+        self.assertNoDrift()
+
+if __name__ == "__main__":
+    unittest.main()